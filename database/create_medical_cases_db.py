@@ -8,12 +8,158 @@ The database structure includes:
 - Cases (CASE_ID) 
 - Sections (different types like Instruction_for_doc, etc.)
 - Subsections (SCENARIO, SUMMARY, etc.)
+
+Ingest is incremental: each case stores a hash of its parsed content and a
+version number. Re-running the script skips unchanged cases, and replaces the
+sections of changed cases in one transaction while bumping their version, so
+re-runs never duplicate rows and downstream caches can key on the version.
+
+Loading is bulk and streamed: cases go from the parser to executemany in
+batches, in a single transaction per file, and large loads drop the
+secondary indexes and rebuild them at the end. The build runs with journal_mode=WAL,
+synchronous=OFF, a larger page cache and foreign key checks off, and the
+previous settings are restored afterwards.
+
+Usage:
+    python create_medical_cases_db.py                          # shipped case files
+    python create_medical_cases_db.py --db /tmp/big.db big.txt  # any files, reports cases/sec
 """
 
+import argparse
+import time
+from contextlib import contextmanager
+
+import hashlib
+import itertools
 import sqlite3
+import subprocess
+import sys
 import re
 import os
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
+
+# Subsection tags, in the order subsections are listed for a section
+SUBSECTION_TYPES = [
+    'INSTRUCTION', 'SCENARIO', 'SUMMARY', 'EXAMINATION_FINDINGS', 'SPECIFIC_QUESTIONS', 'EXAMINATION',
+    'DIAGNOSIS', 'INVESTIGATION', 'TREATMENT', 'MANAGEMENT', 'COMMENTARY', 'PITFALL',
+]
+_SUBSECTION_ORDER = {name: index for index, name in enumerate(SUBSECTION_TYPES)}
+
+# Secondary indexes, dropped and rebuilt once a load has changed BULK_INDEX_THRESHOLD cases
+INDEXES = {
+    'idx_cases_category': "CREATE INDEX IF NOT EXISTS idx_cases_category ON cases(category_id)",
+    'idx_sections_case': "CREATE INDEX IF NOT EXISTS idx_sections_case ON sections(case_id)",
+    'idx_subsections_section': "CREATE INDEX IF NOT EXISTS idx_subsections_section ON subsections(section_id)",
+}
+BULK_INDEX_THRESHOLD = 1000
+INSERT_BATCH_CASES = 1000
+
+# One alternation for every tag; a bare '[' still ends subsection text
+_TAG_PATTERN = re.compile(
+    r'\[(?:'
+    r'CASE_ID: (?P<case_id>[^\]]+)\]'
+    r'|SECTION_ID: (?P<category>[^\]]+)\]'
+    r'|SECTION: (?P<section>[^\]]+)\]'
+    r'|(?P<section_break>SECTION:)'
+    r'|CASE_TYPE:(?P<case_type>[^\]]+)\]'
+    r'|(?i:(?P<subsection>' + '|'.join(SUBSECTION_TYPES) + r'))\]'
+    r')?'
+)
+
+
+class _CaseParser:
+    """Incremental state machine turning tagged text into case dictionaries"""
+    
+    def __init__(self):
+        self.case = None
+        self.section_type = None
+        self.section_parts = []
+        self.subsection = None
+        self.subsections = []
+        self.case_types = []
+    
+    def feed(self, text: str) -> Iterator[Dict]:
+        """Consume a chunk of text (whole lines), yielding cases completed by it"""
+        position = 0
+        for match in _TAG_PATTERN.finditer(text):
+            if match.start() > position:
+                self._text(text[position:match.start()])
+            position = match.end()
+            if match.group('case_id') is not None:
+                finished = self._end_case()
+                if finished:
+                    yield finished
+                self.case = {'case_id': match.group('case_id').strip(), 'category': None, 'sections': []}
+            elif self.case is not None:
+                self._tag(match)
+        if position < len(text):
+            self._text(text[position:])
+    
+    def close(self) -> Iterator[Dict]:
+        """Finish the last case"""
+        finished = self._end_case()
+        if finished:
+            yield finished
+    
+    def _text(self, text: str):
+        if self.section_type is not None:
+            self.section_parts.append(text)
+            if self.subsection is not None:
+                self.subsection[2].append(text)
+    
+    def _tag(self, match):
+        if match.group('section') is not None or match.group('section_break') is not None:
+            self._end_section()
+            if match.group('section') is not None:
+                self.section_type = match.group('section').strip()
+            return
+        
+        if match.group('category') is not None and self.case['category'] is None:
+            self.case['category'] = match.group('category')
+        if self.section_type is None:
+            return
+        
+        # Any other tag belongs to the section text and ends the open subsection
+        self.section_parts.append(match.group(0))
+        self._end_subsection()
+        if match.group('subsection') is not None:
+            order = _SUBSECTION_ORDER[match.group('subsection').upper()]
+            self.subsection = (order, match.group('subsection'), [])
+        elif match.group('case_type') is not None:
+            content = match.group('case_type').strip()
+            if content:
+                self.case_types.append({'subsection_type': 'CASE_TYPE', 'content': content})
+    
+    def _end_subsection(self):
+        if self.subsection is not None:
+            order, subsection_type, parts = self.subsection
+            content = ''.join(parts).strip()
+            if content:
+                self.subsections.append((order, {'subsection_type': subsection_type, 'content': content}))
+            self.subsection = None
+    
+    def _end_section(self):
+        if self.section_type is None:
+            return
+        self._end_subsection()
+        self.subsections.sort(key=lambda item: item[0])  # Stable: document order within a type
+        self.case['sections'].append({
+            'section_type': self.section_type,
+            'content': ''.join(self.section_parts).strip(),
+            'subsections': [subsection for _, subsection in self.subsections] + self.case_types
+        })
+        self.section_type = None
+        self.section_parts = []
+        self.subsections = []
+        self.case_types = []
+    
+    def _end_case(self) -> Optional[Dict]:
+        if self.case is None:
+            return None
+        self._end_section()
+        finished, self.case = self.case, None
+        return finished
+
 
 class MedicalCasesDatabase:
     def __init__(self, db_path: str = "medical_cases.db"):
@@ -43,10 +189,20 @@ class MedicalCasesDatabase:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 case_id TEXT UNIQUE NOT NULL,
                 category_id INTEGER,
+                content_hash TEXT,
+                version INTEGER NOT NULL DEFAULT 1,
                 FOREIGN KEY (category_id) REFERENCES categories (id)
             )
         """)
         
+        # Databases created before incremental ingest lack the hash and version columns
+        cursor.execute("PRAGMA table_info(cases)")
+        columns = {row[1] for row in cursor.fetchall()}
+        if 'content_hash' not in columns:
+            cursor.execute("ALTER TABLE cases ADD COLUMN content_hash TEXT")
+        if 'version' not in columns:
+            cursor.execute("ALTER TABLE cases ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        
         # Sections table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS sections (
@@ -70,151 +226,199 @@ class MedicalCasesDatabase:
         """)
         
         # Create indexes for better performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_cases_category ON cases(category_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sections_case ON sections(case_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_subsections_section ON subsections(section_id)")
+        for statement in INDEXES.values():
+            cursor.execute(statement)
+        
+        self.conn.commit()
+    
+    @contextmanager
+    def build_pragmas(self, cache_mib: int = 256):
+        """
+        Use WAL journaling without fsyncs, a larger page cache and no per-row foreign key
+        checks while building (insert_data writes parents first), restoring the previous
+        settings after
         
+        Args:
+            cache_mib: Page cache size during the build, in MiB
+        """
+        journal_mode = self.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        synchronous = self.conn.execute("PRAGMA synchronous").fetchone()[0]
+        cache_size = self.conn.execute("PRAGMA cache_size").fetchone()[0]
+        foreign_keys = self.conn.execute("PRAGMA foreign_keys").fetchone()[0]
         self.conn.commit()
+        self.conn.execute("PRAGMA foreign_keys = OFF")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.execute(f"PRAGMA cache_size = {-cache_mib * 1024}")
+        try:
+            yield
+        finally:
+            self.conn.commit()
+            self.conn.execute(f"PRAGMA cache_size = {int(cache_size)}")
+            self.conn.execute(f"PRAGMA synchronous = {int(synchronous)}")
+            self.conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+            self.conn.execute(f"PRAGMA foreign_keys = {int(foreign_keys)}")
         
     def parse_text_file(self, file_path: str) -> List[Dict]:
         """Parse a text file and extract structured data"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Split content by case blocks
-        case_blocks = re.split(r'\[CASE_ID: ([^\]]+)\]', content)
-        
-        cases = []
-        for i in range(1, len(case_blocks), 2):
-            if i + 1 < len(case_blocks):
-                case_id = case_blocks[i].strip()
-                case_content = case_blocks[i + 1]
-                
-                # Extract category
-                category_match = re.search(r'\[SECTION_ID: ([^\]]+)\]', case_content)
-                category = category_match.group(1) if category_match else None
-                
-                # Extract sections
-                sections = self._extract_sections(case_content)
-                
-                cases.append({
-                    'case_id': case_id,
-                    'category': category,
-                    'sections': sections
-                })
-        
-        return cases
+        return list(self.iter_cases(file_path))
     
-    def _extract_sections(self, case_content: str) -> List[Dict]:
-        """Extract sections and their subsections from case content"""
-        sections = []
+    def iter_cases(self, file_path: str) -> Iterator[Dict]:
+        """
+        Parse a text file incrementally, yielding one case at a time
         
-        # Find all section markers
-        section_pattern = r'\[SECTION: ([^\]]+)\](.*?)(?=\[SECTION:|$)'
-        section_matches = re.finditer(section_pattern, case_content, re.DOTALL)
-        
-        for match in section_matches:
-            section_type = match.group(1).strip()
-            section_content = match.group(2).strip()
-            
-            # Extract subsections
-            subsections = self._extract_subsections(section_content)
-            
-            sections.append({
-                'section_type': section_type,
-                'content': section_content,
-                'subsections': subsections
-            })
-        
-        return sections
+        The file is read line by line and every bracket tag is recognized in a
+        single scan, so memory stays flat and time linear on large files. Tags
+        are expected on one line. The rules are:
+        - a case runs from its CASE_ID tag to the next one;
+        - its category is the first SECTION_ID tag;
+        - a section runs from its SECTION tag to the next SECTION tag or case;
+        - a subsection runs from its tag to the next '[' in the section.
+        Subsections are listed in SUBSECTION_TYPES order, then CASE_TYPE values.
+        """
+        parser = _CaseParser()
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield from parser.feed(line)
+        yield from parser.close()
     
-    def _extract_subsections(self, section_content: str) -> List[Dict]:
-        """Extract subsections from section content"""
-        subsections = []
-        
-        # Common subsection patterns
-        subsection_patterns = [
-            r'\[INSTRUCTION\](.*?)(?=\[|$)',
-            r'\[SCENARIO\](.*?)(?=\[|$)',
-            r'\[SUMMARY\](.*?)(?=\[|$)',
-            r'\[EXAMINATION_FINDINGS\](.*?)(?=\[|$)',
-            r'\[SPECIFIC_QUESTIONS\](.*?)(?=\[|$)',
-            r'\[EXAMINATION\](.*?)(?=\[|$)',
-            r'\[DIAGNOSIS\](.*?)(?=\[|$)',
-            r'\[INVESTIGATION\](.*?)(?=\[|$)',
-            r'\[TREATMENT\](.*?)(?=\[|$)',
-            r'\[MANAGEMENT\](.*?)(?=\[|$)',
-            r'\[COMMENTARY\](.*?)(?=\[|$)',
-            r'\[PITFALL\](.*?)(?=\[|$)',
-        ]
-        
-        for pattern in subsection_patterns:
-            matches = re.finditer(pattern, section_content, re.DOTALL | re.IGNORECASE)
-            for match in matches:
-                subsection_type = match.group(0).split(']')[0][1:]  # Extract type from [TYPE]
-                content = match.group(1).strip()
-                if content:  # Only add if there's content
-                    subsections.append({
-                        'subsection_type': subsection_type,
-                        'content': content
-                    })
+    @staticmethod
+    def content_hash(case: Dict) -> str:
+        """Hash of a parsed case's category and sections (subsections derive from section content)"""
+        digest = hashlib.sha256((case['category'] or '').encode('utf-8'))
+        for section in case['sections']:
+            digest.update(b'\x1e' + section['section_type'].encode('utf-8'))
+            digest.update(b'\x1f' + section['content'].encode('utf-8'))
+        return digest.hexdigest()
+    
+    def insert_data(self, cases: Iterable[Dict], batch_size: int = INSERT_BATCH_CASES) -> Dict[str, int]:
+        """
+        Insert parsed data into the database, skipping cases whose content is unchanged
         
-        # Special handling for CASE_TYPE which has a different format
-        case_type_matches = re.finditer(r'\[CASE_TYPE:([^\]]+)\]', section_content)
-        for match in case_type_matches:
-            content = match.group(1).strip()
-            if content:
-                subsections.append({
-                    'subsection_type': 'CASE_TYPE',
-                    'content': content
-                })
+        Cases are consumed in batches, so iter_cases can be passed straight in and
+        memory stays flat however large the file is. Changed cases get new sections
+        and subsections and their version bumped; their old rows are deleted at the
+        end. Everything is applied in one transaction, with rows batched through
+        executemany. Once BULK_INDEX_THRESHOLD cases have changed, the secondary
+        indexes are dropped and rebuilt at the end.
         
-        return subsections
-    
-    def insert_data(self, cases: List[Dict]):
-        """Insert parsed data into the database"""
+        Args:
+            cases: Parsed cases, e.g. from iter_cases; a repeated case id keeps its last content
+            batch_size: Cases written per executemany batch
+            
+        Returns:
+            Dictionary with inserted, updated and unchanged case counts
+        """
         cursor = self.conn.cursor()
+        cursor.execute("SELECT case_id, content_hash FROM cases")
+        current = dict(cursor.fetchall())  # Hash each case will have once this load commits
+        outcome = {}  # case_id -> 'inserted', 'updated' or 'unchanged'
+        written = set()  # Cases already written (and version-bumped) by this load
+        changed_count = 0
+        bulk = False
         
-        for case in cases:
-            # Insert category
-            if case['category']:
-                cursor.execute(
-                    "INSERT OR IGNORE INTO categories (name) VALUES (?)",
-                    (case['category'],)
-                )
-                
-                # Get category ID
-                cursor.execute(
-                    "SELECT id FROM categories WHERE name = ?",
-                    (case['category'],)
-                )
-                category_id = cursor.fetchone()[0]
-            else:
-                category_id = None
+        cases = iter(cases)
+        with self.conn:
+            if not self.conn.in_transaction:
+                cursor.execute("BEGIN")
             
-            # Insert case
-            cursor.execute(
-                "INSERT OR REPLACE INTO cases (case_id, category_id) VALUES (?, ?)",
-                (case['case_id'], category_id)
-            )
+            cursor.execute("SELECT name, id FROM categories")
+            category_ids = dict(cursor.fetchall())
             
-            # Insert sections
-            for section in case['sections']:
-                cursor.execute(
-                    "INSERT INTO sections (case_id, section_type, content) VALUES (?, ?, ?)",
-                    (case['case_id'], section['section_type'], section['content'])
-                )
+            # Rows older than keep_from are superseded and deleted once everything is written
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS superseded (case_id TEXT PRIMARY KEY, keep_from INTEGER)")
+            cursor.execute("DELETE FROM temp.superseded")
+            
+            # Section ids are assigned here so subsections can reference them without a lastrowid round trip
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'sections'")
+            row = cursor.fetchone()
+            cursor.execute("SELECT MAX(id) FROM sections")
+            section_id = max(row[0] if row else 0, cursor.fetchone()[0] or 0) + 1
+            
+            while True:
+                batch = list(itertools.islice(cases, batch_size))
+                if not batch:
+                    break
+                
+                pending = {}
+                for case in batch:
+                    case_id = case['case_id']
+                    content_hash = self.content_hash(case)
+                    if current.get(case_id) == content_hash:
+                        outcome.setdefault(case_id, 'unchanged')
+                        continue
+                    if case_id not in outcome or outcome[case_id] == 'unchanged':
+                        outcome[case_id] = 'updated' if case_id in current else 'inserted'
+                    current[case_id] = content_hash
+                    pending[case_id] = (case, content_hash)
+                if not pending:
+                    continue
+                
+                changed_count += len(pending)
+                if not bulk and changed_count >= BULK_INDEX_THRESHOLD:
+                    bulk = True
+                    for name in INDEXES:
+                        cursor.execute(f"DROP INDEX IF EXISTS {name}")
                 
-                section_id = cursor.lastrowid
+                new_categories = {case['category'] for case, _ in pending.values()
+                                  if case['category'] and case['category'] not in category_ids}
+                if new_categories:
+                    cursor.executemany("INSERT OR IGNORE INTO categories (name) VALUES (?)",
+                                       [(name,) for name in new_categories])
+                    cursor.execute("SELECT name, id FROM categories")
+                    category_ids = dict(cursor.fetchall())
                 
-                # Insert subsections
-                for subsection in section['subsections']:
-                    cursor.execute(
-                        "INSERT INTO subsections (section_id, subsection_type, content) VALUES (?, ?, ?)",
-                        (section_id, subsection['subsection_type'], subsection['content'])
-                    )
+                inserts, bumps, rewrites, superseded = [], [], [], []
+                section_rows, subsection_rows = [], []
+                for case_id, (case, content_hash) in pending.items():
+                    row = (category_ids.get(case['category']), content_hash, case_id)
+                    if case_id in written:
+                        rewrites.append(row)
+                    elif outcome[case_id] == 'updated':
+                        bumps.append(row)
+                    else:
+                        inserts.append((case_id,) + row[:2])
+                    if case_id in written or outcome[case_id] == 'updated':
+                        superseded.append((case_id, section_id))
+                    written.add(case_id)
+                    for section in case['sections']:
+                        section_rows.append((section_id, case_id, section['section_type'], section['content']))
+                        for subsection in section['subsections']:
+                            subsection_rows.append((section_id, subsection['subsection_type'], subsection['content']))
+                        section_id += 1
+                
+                cursor.executemany(
+                    "INSERT INTO cases (case_id, category_id, content_hash, version) VALUES (?, ?, ?, 1)", inserts
+                )
+                cursor.executemany(
+                    "UPDATE cases SET category_id = ?, content_hash = ?, version = version + 1 WHERE case_id = ?", bumps
+                )
+                cursor.executemany("UPDATE cases SET category_id = ?, content_hash = ? WHERE case_id = ?", rewrites)
+                cursor.executemany("INSERT OR REPLACE INTO temp.superseded (case_id, keep_from) VALUES (?, ?)", superseded)
+                cursor.executemany(
+                    "INSERT INTO sections (id, case_id, section_type, content) VALUES (?, ?, ?, ?)", section_rows
+                )
+                cursor.executemany(
+                    "INSERT INTO subsections (section_id, subsection_type, content) VALUES (?, ?, ?)", subsection_rows
+                )
+            
+            if bulk:
+                for statement in INDEXES.values():
+                    cursor.execute(statement)
+            
+            # Drop the replaced sections (including duplicates left by earlier full re-runs)
+            stale_sections = """
+                SELECT s.id FROM temp.superseded r
+                JOIN sections s ON s.case_id = r.case_id AND s.id < r.keep_from
+            """
+            cursor.execute(f"DELETE FROM subsections WHERE section_id IN ({stale_sections})")
+            cursor.execute(f"DELETE FROM sections WHERE id IN ({stale_sections})")
+            cursor.execute("DELETE FROM temp.superseded")
         
-        self.conn.commit()
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        for result in outcome.values():
+            stats[result] += 1
+        return stats
     
     def close(self):
         """Close the database connection"""
@@ -223,22 +427,34 @@ class MedicalCasesDatabase:
 
 def main():
     """Main function to create the database"""
+    parser = argparse.ArgumentParser(description="Create or update the medical cases database from case text files")
+    parser.add_argument('files', nargs='*',
+                        default=["source_info/cases/case1.txt", "source_info/cases/cases2.txt"],
+                        help="Case text files (default: the shipped case files)")
+    parser.add_argument('--db', default="medical_cases.db", help="Database path (default: medical_cases.db)")
+    parser.add_argument('--sync', action='store_true',
+                        help="Run 'manage.py sync_cases' afterwards so the Django Case model picks up the changes")
+    args = parser.parse_args()
+    
     # Initialize database
-    db = MedicalCasesDatabase("medical_cases.db")
+    db = MedicalCasesDatabase(args.db)
     db.connect()
     db.create_tables()
     
-    # Parse and insert data from both files
-    files_to_process = ["source_info/cases/case1.txt", "source_info/cases/cases2.txt"]
-    
-    for filename in files_to_process:
-        if os.path.exists(filename):
-            print(f"Processing {filename}...")
-            cases = db.parse_text_file(filename)
-            db.insert_data(cases)
-            print(f"Processed {len(cases)} cases from {filename}")
-        else:
-            print(f"Warning: {filename} not found")
+    # Parse and insert data, one transaction per file
+    with db.build_pragmas():
+        for filename in args.files:
+            if os.path.exists(filename):
+                print(f"Processing {filename}...")
+                started_at = time.perf_counter()
+                stats = db.insert_data(db.iter_cases(filename))
+                seconds = time.perf_counter() - started_at
+                total = sum(stats.values())
+                print(f"Processed {total} cases from {filename}: {stats['inserted']} new, "
+                      f"{stats['updated']} updated, {stats['unchanged']} unchanged")
+                print(f"  parsed and loaded in {seconds:.2f}s ({total / max(seconds, 1e-9):,.0f} cases/s)")
+            else:
+                print(f"Warning: {filename} not found")
     
     # Print summary
     cursor = db.conn.cursor()
@@ -277,6 +493,13 @@ def main():
         print(f"  - {row[0]} ({row[1]})")
     
     db.close()
+    
+    if args.sync:
+        manage_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'manage.py')
+        print("\nSyncing the Django Case model...")
+        result = subprocess.run([sys.executable, manage_py, 'sync_cases', '--db', os.path.abspath(args.db)])
+        if result.returncode != 0:
+            sys.exit(result.returncode)
 
 if __name__ == "__main__":
     main()
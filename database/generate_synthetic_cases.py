@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Synthetic Medical Case Generator
+
+This script writes arbitrarily large case files in the same tagged format as
+source_info/cases/*.txt, for scaling tests of the ingest script,
+MedicalCasesQuery, the catalog pages and feedback rubrics:
+
+[CASE_ID: <id>]
+[SECTION_ID: <category>]
+[SECTION: Instruction_for_doc]        CASE_TYPE, INSTRUCTION, SCENARIO, SUMMARY
+[SECTION: Instructions_for_patient]   free text
+[SECTION: info_for_facilator]         examination findings (optional)
+[SECTION: Suggested_approach]         SPECIFIC_QUESTIONS, EXAMINATION, DIAGNOSIS,
+                                      INVESTIGATION, TREATMENT, MANAGEMENT,
+                                      COMMENTARY, PITFALL (most optional)
+
+Section and subsection lengths follow log-normal distributions fitted to the
+shipped cases (median and spread per tag), and optional parts appear at the
+same rates as in the shipped files. Cases are spread over categories with a
+skew similar to the real catalog. Output is deterministic for a given seed.
+
+Noise (--noise RATE) perturbs that share of cases with formatting seen in
+hand-edited files: trailing whitespace and blank lines, CRLF line endings,
+tags the parser does not know ([HISTORY], [PRIMARY_SURVEY]), mixed-case tags,
+empty subsections and stray brackets inside text.
+
+Usage:
+    python generate_synthetic_cases.py --cases 10000 --output source_info/cases/synthetic_10k.txt
+    python generate_synthetic_cases.py --cases 100000 --categories 40 --noise 0.05 --seed 7 --output big.txt
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+REAL_CATEGORIES = [
+    'Gastroenterology', 'Musculoskeletal_medicine', 'Cardiovascular_system', 'Ear_nose_and_throat',
+    'Mental_health', 'Aged_care', 'Child_health', 'Mens_health', 'Adolescent_health',
+    'Challenging_consultation', 'Dermatology', 'Emergency_medicine', 'Endocrinology', 'Eyes',
+    'Infectious_disease',
+]
+
+# (median characters, log-normal sigma, min, max), fitted to the shipped cases
+LENGTHS = {
+    'INSTRUCTION': (146, 0.5, 29, 390),
+    'SCENARIO': (286, 0.45, 53, 643),
+    'SUMMARY': (210, 0.5, 110, 699),
+    'Instructions_for_patient': (777, 0.4, 343, 1498),
+    'info_for_facilator': (203, 1.0, 57, 5537),
+    'SUGGESTED_INTRO': (60, 0.5, 20, 200),
+    'SPECIFIC_QUESTIONS': (340, 0.4, 148, 705),
+    'EXAMINATION': (301, 0.7, 64, 1258),
+    'DIAGNOSIS': (27, 1.0, 10, 302),
+    'INVESTIGATION': (184, 0.7, 11, 587),
+    'TREATMENT': (392, 0.5, 187, 976),
+    'MANAGEMENT': (290, 0.7, 50, 1461),
+    'COMMENTARY': (1029, 0.4, 331, 2183),
+    'PITFALL': (349, 0.4, 172, 840),
+}
+
+# Share of shipped cases containing each optional part
+PRESENCE = {
+    'SUMMARY': 0.82,
+    'info_for_facilator': 0.62,
+    'SPECIFIC_QUESTIONS': 0.68,
+    'EXAMINATION': 0.56,
+    'DIAGNOSIS': 0.46,
+    'INVESTIGATION': 0.36,
+    'TREATMENT': 0.12,
+    'MANAGEMENT': 0.68,
+    'PITFALL': 0.44,
+}
+
+APPROACH_ORDER = ['SPECIFIC_QUESTIONS', 'EXAMINATION', 'DIAGNOSIS', 'INVESTIGATION',
+                  'TREATMENT', 'MANAGEMENT', 'COMMENTARY', 'PITFALL']
+
+NOISE_KINDS = ('whitespace', 'crlf', 'unknown_tags', 'mixed_case_tags', 'empty_subsections', 'stray_brackets')
+
+FIRST_NAMES = [
+    'Erin', 'Dilip', 'Jackie', 'Eric', 'Dorothy', 'Craig', 'Anthony', 'Mei', 'Fatima', 'George',
+    'Priya', 'Liam', 'Sofia', 'Hamish', 'Ngaire', 'Tomasz', 'Aroha', 'Kwame', 'Yuki', 'Bronwyn',
+]
+LAST_NAMES = [
+    'Campbell', 'Patel', 'Maloney', 'Schmidt', 'Smythe', 'Kelly', 'Nguyen', 'Chen', 'Hassan', 'Brown',
+    'Singh', 'Walker', 'Rossi', 'McLeod', 'Tane', 'Kowalski', 'Ngata', 'Mensah', 'Tanaka', 'Jones',
+]
+OCCUPATIONS = ['teacher', 'taxi driver', 'plumber', 'accountant', 'nurse', 'farmer', 'student',
+               'retired builder', 'office worker', 'chef', 'truck driver', 'shop assistant']
+COMPLAINTS = ['chest pain', 'abdominal pain', 'headaches', 'tiredness', 'a rash', 'back pain',
+              'shortness of breath', 'a painful knee', 'low mood', 'palpitations', 'a cough',
+              'dizziness', 'a sore ear', 'blurred vision', 'weight loss']
+
+INSTRUCTION_LINES = [
+    "Please take a history from {first}, examine as appropriate, then outline the most likely diagnosis.",
+    "Take a focused history and ask the examiner for the relevant examination findings.",
+    "Discuss the likely diagnosis with {first} and negotiate a management plan.",
+    "Explain the results to {first} and answer any questions.",
+    "You do not need to examine the patient.",
+]
+SCENARIO_LINES = [
+    "{first} {last} is a {age}-year-old {occupation} who presents with {complaint}.",
+    "{first} has come to the surgery on their own and looks a little anxious.",
+    "The symptoms started {duration} ago and have been getting worse.",
+    "{first} saw another doctor last year for something similar.",
+    "There is a note in the file about a recent hospital admission.",
+]
+SUMMARY_LINES = [
+    "Past medical history", "Nil significant", "Hypertension", "Type 2 diabetes", "Medication", "Nil",
+    "Metformin 500 mg twice daily", "Allergies", "Penicillin—rash", "Immunisations", "Up to date",
+    "Social history", "Lives with partner.", "Non-smoker", "Drinks 10 standard drinks a week",
+]
+PATIENT_LINES = [
+    "You are {age} years old and work as a {occupation}.",
+    "You have had {complaint} for about {duration}.",
+    "It is worse at night and stops you from sleeping properly.",
+    "You are worried that it might be something serious, like cancer.",
+    "Your mother had a heart attack when she was about your age.",
+    "You have tried paracetamol but it has not helped much.",
+    "If the doctor asks, you admit that you have been drinking more than usual.",
+    "You do not want to take time off work because money is tight.",
+    "You hope the doctor will explain things clearly and not use jargon.",
+    "You are happy to be examined if the doctor asks politely.",
+]
+FINDINGS_LINES = [
+    "Looks well", "No cyanosis", "Height 1.65 m", "Weight 82 kg", "BMI 30 kg/m2",
+    "Pulse 88 regular", "BP 150/95 mmHg", "Temperature 37.8 °C", "Respiratory rate 18",
+    "Heart sounds dual, no murmurs", "Chest clear", "Abdomen soft, tender in the right upper quadrant",
+    "No lymphadenopathy", "Peripheral pulses present", "Urinalysis—NAD", "Fundoscopy—normal",
+]
+INTRO_LINES = ["Suggested approach to the case", "Establish rapport", "Establish rapport with {first}",
+               "Open-ended questions to explore {first}’s concerns and expectations."]
+APPROACH_LINES = {
+    'SPECIFIC_QUESTIONS': [
+        "Duration of {complaint}", "Onset—sudden or gradual?", "Aggravating and relieving factors",
+        "Associated symptoms—fever, weight loss, night sweats", "Impact on work and family life",
+        "What does {first} think is causing it?", "Medications, including over-the-counter",
+        "Smoking and alcohol history", "Family history", "Request permission to examine.",
+    ],
+    'EXAMINATION': [
+        "General appearance", "Vital signs—pulse, blood pressure, temperature",
+        "—inspect, palpate, percuss and auscultate", "Examine the relevant system",
+        "Look for signs of anaemia", "Check for lymphadenopathy", "Urinalysis",
+    ],
+    'DIAGNOSIS': ["Most likely diagnosis: {diagnosis}", "Differential diagnoses include {diagnosis}."],
+    'INVESTIGATION': [
+        "FBC, UEC, LFTs", "ECG", "Chest X-ray", "Fasting glucose and lipids", "TSH",
+        "Ultrasound if symptoms persist", "CRP and ESR",
+    ],
+    'TREATMENT': [
+        "Start simple analgesia and review in one week.",
+        "Commence an ACE inhibitor and titrate to blood pressure targets.",
+        "Short course of oral antibiotics if bacterial infection is suspected.",
+        "Refer urgently if red flag features develop.",
+    ],
+    'MANAGEMENT': [
+        "Explain the diagnosis without using jargon", "Reassure {first} where appropriate",
+        "Lifestyle advice—diet, exercise, weight loss", "Offer a printed patient handout",
+        "Safety-net: return if symptoms worsen", "Arrange follow-up in two weeks",
+        "Refer to a specialist if no improvement",
+    ],
+    'COMMENTARY': [
+        "{complaint_cap} is a common presentation in general practice.",
+        "It is important to explore the patient’s ideas, concerns and expectations.",
+        "The candidate should take a structured history and avoid premature closure.",
+        "Good candidates will negotiate a plan that the patient can realistically follow.",
+        "Safety-netting and follow-up are essential parts of the consultation.",
+    ],
+    'PITFALL': [
+        "Failing to ask about red flag symptoms.",
+        "Using medical jargon that the patient does not understand.",
+        "Not addressing the patient’s main concern.",
+        "Ordering unnecessary investigations.",
+    ],
+}
+DIAGNOSES = ['angina', 'gastro-oesophageal reflux', 'biliary colic', 'depression', 'iron deficiency anaemia',
+             'plantar fasciitis', 'otitis media', 'acne vulgaris', 'hypothyroidism', 'osteoarthritis']
+
+
+class SyntheticCaseGenerator:
+    """Deterministic generator of tagged case text"""
+
+    def __init__(self, categories: int = 15, noise: float = 0.0, noise_kinds: Optional[List[str]] = None,
+                 length_scale: float = 1.0, seed: int = 0):
+        """
+        Initialize the generator
+
+        Args:
+            categories: Number of categories (the shipped names first, then Synthetic_category_<n>)
+            noise: Share of cases with formatting noise (0.0-1.0)
+            noise_kinds: Subset of NOISE_KINDS to apply (default: all)
+            length_scale: Multiplier on every text length
+            seed: Random seed
+        """
+        unknown = set(noise_kinds or ()) - set(NOISE_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown noise kinds: {', '.join(sorted(unknown))}")
+        self.category_names = (REAL_CATEGORIES + [
+            f"Synthetic_category_{n}" for n in range(len(REAL_CATEGORIES) + 1, categories + 1)
+        ])[:categories]
+        # Zipf-like skew: a few large categories and a long tail, as in the shipped catalog
+        self.category_weights = [1.0 / (rank + 1) ** 0.8 for rank in range(len(self.category_names))]
+        self.noise = noise
+        self.noise_kinds = list(noise_kinds or NOISE_KINDS)
+        self.length_scale = length_scale
+        self.seed = seed
+
+    def _length(self, rng: random.Random, tag: str) -> int:
+        median, sigma, low, high = LENGTHS[tag]
+        length = rng.lognormvariate(math.log(median), sigma)
+        return max(1, int(min(max(length, low), high) * self.length_scale))
+
+    def _fill(self, rng: random.Random, lines: List[str], tag: str, facts: Dict[str, str],
+              joiner: str = "\n") -> str:
+        target = self._length(rng, tag)
+        parts, size = [], 0
+        while size < target:
+            line = rng.choice(lines).format(**facts)
+            parts.append(line)
+            size += len(line) + len(joiner)
+        return joiner.join(parts)
+
+    def _facts(self, rng: random.Random) -> Dict[str, str]:
+        complaint = rng.choice(COMPLAINTS)
+        return {
+            'first': rng.choice(FIRST_NAMES),
+            'last': rng.choice(LAST_NAMES),
+            'age': str(rng.randint(2, 92)),
+            'occupation': rng.choice(OCCUPATIONS),
+            'complaint': complaint,
+            'complaint_cap': complaint[0].upper() + complaint[1:],
+            'duration': rng.choice(['three days', 'two weeks', 'a month', 'six months', 'a year']),
+            'diagnosis': rng.choice(DIAGNOSES),
+        }
+
+    def generate_case(self, index: int) -> Tuple[str, str]:
+        """
+        Generate one case
+
+        Args:
+            index: Case number (the same index always gives the same case for a seed)
+
+        Returns:
+            Tuple of (case_id, case text ending in a blank line)
+        """
+        rng = random.Random(f"{self.seed}:{index}")
+        facts = self._facts(rng)
+        case_id = f"{facts['first']}_{facts['last']}_{index:06d}"
+        category = rng.choices(self.category_names, weights=self.category_weights)[0]
+
+        lines = [f"[CASE_ID: {case_id}]", f"[SECTION_ID: {category}]", "[SECTION: Instruction_for_doc]",
+                 f"[CASE_TYPE:{rng.choice(['short', 'short', 'long'])}]",
+                 "[INSTRUCTION]", self._fill(rng, INSTRUCTION_LINES, 'INSTRUCTION', facts, ' '),
+                 "[SCENARIO]", self._fill(rng, SCENARIO_LINES, 'SCENARIO', facts, ' ')]
+        if rng.random() < PRESENCE['SUMMARY']:
+            lines += ["[SUMMARY]", self._fill(rng, SUMMARY_LINES, 'SUMMARY', facts)]
+        lines += ["", "[SECTION: Instructions_for_patient]",
+                  self._fill(rng, PATIENT_LINES, 'Instructions_for_patient', facts, ' '), ""]
+        if rng.random() < PRESENCE['info_for_facilator']:
+            lines += ["[SECTION: info_for_facilator]", "",
+                      self._fill(rng, FINDINGS_LINES, 'info_for_facilator', facts), ""]
+        lines += ["[SECTION: Suggested_approach]", self._fill(rng, INTRO_LINES, 'SUGGESTED_INTRO', facts)]
+        for tag in APPROACH_ORDER:
+            if tag in PRESENCE and rng.random() >= PRESENCE[tag]:
+                continue
+            joiner = ' ' if tag in ('COMMENTARY', 'PITFALL') else "\n"
+            lines += [f"[{tag}]", self._fill(rng, APPROACH_LINES[tag], tag, facts, joiner)]
+        lines.append("")
+
+        if self.noise and rng.random() < self.noise:
+            lines = self._add_noise(rng, lines)
+            if 'crlf' in self.noise_kinds and rng.random() < 0.5:
+                return case_id, ("\n".join(lines) + "\n").replace("\n", "\r\n")
+        return case_id, "\n".join(lines) + "\n"
+
+    def _add_noise(self, rng: random.Random, lines: List[str]) -> List[str]:
+        noisy = []
+        for line in lines:
+            is_tag = line.startswith('[') and line.endswith(']')
+            is_subsection = is_tag and not line.startswith(('[CASE_ID', '[SECTION', '[CASE_TYPE'))
+            if is_subsection and 'unknown_tags' in self.noise_kinds and rng.random() < 0.1:
+                noisy.append(rng.choice(['[HISTORY]', '[PRIMARY_SURVEY]', '[SECONDARY_SURVEY]']))
+                noisy.append("Use open questions to explore the patient’s ideas.")
+            if is_subsection and 'empty_subsections' in self.noise_kinds and rng.random() < 0.1:
+                noisy.append(line)
+            if is_subsection and 'mixed_case_tags' in self.noise_kinds and rng.random() < 0.2:
+                line = '[' + line[1:-1].capitalize() + ']'
+            if not is_tag and line and 'stray_brackets' in self.noise_kinds and rng.random() < 0.05:
+                line += " [see attached letter]"
+            if 'whitespace' in self.noise_kinds and rng.random() < 0.1:
+                line += rng.choice([' ', '  ', '\t'])
+            noisy.append(line)
+            if 'whitespace' in self.noise_kinds and rng.random() < 0.05:
+                noisy.append('')
+        return noisy
+
+    def iter_cases(self, count: int, start: int = 0) -> Iterator[Tuple[str, str]]:
+        """Yield (case_id, text) for cases start .. start + count - 1"""
+        for index in range(start, start + count):
+            yield self.generate_case(index)
+
+    def write(self, file_path: str, count: int, start: int = 0) -> Dict[str, float]:
+        """
+        Write cases to a file, streaming so memory use does not grow with the corpus
+
+        Args:
+            file_path: Output path ('-' for stdout)
+            count: Number of cases
+            start: Index of the first case
+
+        Returns:
+            Dictionary with cases, bytes and seconds
+        """
+        started_at = time.perf_counter()
+        written = 0
+        f = sys.stdout if file_path == '-' else open(file_path, 'w', encoding='utf-8', newline='')
+        try:
+            for _, text in self.iter_cases(count, start):
+                f.write(text)
+                written += len(text.encode('utf-8'))
+        finally:
+            if f is not sys.stdout:
+                f.close()
+        return {'cases': count, 'bytes': written, 'seconds': time.perf_counter() - started_at}
+
+
+def main():
+    """Main function to write a synthetic case file"""
+    parser = argparse.ArgumentParser(description="Generate synthetic medical cases in the ingest text format")
+    parser.add_argument('--cases', type=int, default=1000, help="Number of cases (default: 1000)")
+    parser.add_argument('--categories', type=int, default=len(REAL_CATEGORIES),
+                        help=f"Number of categories (default: {len(REAL_CATEGORIES)})")
+    parser.add_argument('--noise', type=float, default=0.0, help="Share of cases with formatting noise (default: 0)")
+    parser.add_argument('--noise-kinds', type=str, default=','.join(NOISE_KINDS),
+                        help=f"Comma-separated noise kinds (default: {','.join(NOISE_KINDS)})")
+    parser.add_argument('--length-scale', type=float, default=1.0, help="Multiplier on text lengths (default: 1.0)")
+    parser.add_argument('--start', type=int, default=0, help="Index of the first case (default: 0)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument('--output', type=str, default='-', help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    generator = SyntheticCaseGenerator(
+        categories=args.categories,
+        noise=args.noise,
+        noise_kinds=[kind.strip() for kind in args.noise_kinds.split(',') if kind.strip()],
+        length_scale=args.length_scale,
+        seed=args.seed,
+    )
+    stats = generator.write(args.output, args.cases, start=args.start)
+    if args.output != '-':
+        print(f"Wrote {stats['cases']} cases ({stats['bytes'] / 1e6:.1f} MB) to {args.output} "
+              f"in {stats['seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
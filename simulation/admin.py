@@ -1,3 +1,23 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import AIAgentState, UsageCounter, UsageBudget
+
+
+@admin.register(AIAgentState)
+class AIAgentStateAdmin(admin.ModelAdmin):
+    list_display = ('session', 'feedback_generated', 'updated_at')
+    readonly_fields = ('usage',)
+
+
+@admin.register(UsageCounter)
+class UsageCounterAdmin(admin.ModelAdmin):
+    list_display = ('scope', 'scope_key', 'day', 'calls', 'prompt_tokens', 'completion_tokens',
+                    'cached_tokens', 'audio_characters', 'cost_usd')
+    list_filter = ('scope', 'day')
+    search_fields = ('scope_key',)
+
+
+@admin.register(UsageBudget)
+class UsageBudgetAdmin(admin.ModelAdmin):
+    list_display = ('user', 'monthly_cost_limit_usd', 'monthly_token_limit', 'updated_at')
+    search_fields = ('user__username',)
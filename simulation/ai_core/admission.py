@@ -0,0 +1,238 @@
+"""
+Admission control for LLM-bound endpoints
+
+A single process-wide controller caps the number of concurrent outbound model
+calls. Each endpoint has its own concurrency limit, callers that cannot be
+admitted immediately wait in a bounded priority queue (patient turns ahead of
+feedback and TTS), and anything that cannot be admitted within the timeout is
+rejected quickly with a suggested retry delay.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+# Lower number = higher priority
+ENDPOINT_PRIORITIES = {
+    'interact': 0,
+    'end_session': 1,
+    'tts': 2,
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted"""
+
+    def __init__(self, endpoint: str, reason: str, retry_after: int):
+        super().__init__(f"{endpoint} request rejected ({reason}), retry after {retry_after}s")
+        self.endpoint = endpoint
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ('endpoint', 'granted', 'cancelled')
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.granted = False
+        self.cancelled = False
+
+
+class AdmissionController:
+    """Process-wide concurrency limiter with a bounded priority wait queue"""
+
+    def __init__(self, max_concurrent: int = 8, limits: Optional[Dict[str, int]] = None,
+                 max_queue: int = 32, queue_timeout: float = 5.0):
+        """
+        Initialize the admission controller
+
+        Args:
+            max_concurrent: Maximum concurrent admitted requests across all endpoints
+            limits: Per-endpoint concurrency limits (defaults to max_concurrent)
+            max_queue: Maximum number of requests waiting for admission
+            queue_timeout: Seconds a request may wait before being rejected
+        """
+        self.max_concurrent = max_concurrent
+        self.limits = dict(limits or {})
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self._cond = threading.Condition()
+        self._queue = []  # heap of (priority, seq, waiter)
+        self._seq = itertools.count()
+        self._waiting = 0
+        self._in_flight_total = 0
+        self._in_flight = {}
+        self._stats = {}
+
+    def _endpoint_stats(self, endpoint: str) -> Dict[str, Any]:
+        stats = self._stats.get(endpoint)
+        if stats is None:
+            stats = {
+                'admitted': 0,
+                'rejected_queue_full': 0,
+                'rejected_timeout': 0,
+                'waiting': 0,
+                'wait_seconds_total': 0.0,
+                'wait_seconds_max': 0.0,
+                'service_seconds_avg': 0.0,
+            }
+            self._stats[endpoint] = stats
+        return stats
+
+    def _has_capacity(self, endpoint: str) -> bool:
+        if self._in_flight_total >= self.max_concurrent:
+            return False
+        limit = self.limits.get(endpoint, self.max_concurrent)
+        return self._in_flight.get(endpoint, 0) < limit
+
+    def _waiting_at_or_above(self, priority: int) -> bool:
+        """Whether any request of equal or higher priority is already queued"""
+        return any(
+            stats['waiting'] and ENDPOINT_PRIORITIES.get(endpoint, len(ENDPOINT_PRIORITIES)) <= priority
+            for endpoint, stats in self._stats.items()
+        )
+
+    def _grant(self, endpoint: str):
+        self._in_flight_total += 1
+        self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + 1
+
+    def _dispatch(self):
+        """Admit queued waiters in priority order while capacity remains"""
+        skipped = []
+        while self._queue and self._in_flight_total < self.max_concurrent:
+            entry = heapq.heappop(self._queue)
+            waiter = entry[2]
+            if waiter.cancelled:
+                continue
+            if self._has_capacity(waiter.endpoint):
+                waiter.granted = True
+                self._grant(waiter.endpoint)
+            else:
+                skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        self._cond.notify_all()
+
+    def _retry_after(self, endpoint: str) -> int:
+        """Estimate how long until capacity frees up"""
+        service = self._endpoint_stats(endpoint)['service_seconds_avg'] or 1.0
+        backlog = self._waiting + 1
+        return max(1, int(math.ceil(service * backlog / max(1, self.max_concurrent))))
+
+    def acquire(self, endpoint: str, timeout: Optional[float] = None) -> float:
+        """
+        Wait for an admission slot
+
+        Args:
+            endpoint: Endpoint name (see ENDPOINT_PRIORITIES)
+            timeout: Override for the queue timeout
+
+        Returns:
+            Seconds spent waiting for admission
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        start = time.monotonic()
+
+        with self._cond:
+            stats = self._endpoint_stats(endpoint)
+
+            priority = ENDPOINT_PRIORITIES.get(endpoint, len(ENDPOINT_PRIORITIES))
+            if self._has_capacity(endpoint) and not self._waiting_at_or_above(priority):
+                self._grant(endpoint)
+                stats['admitted'] += 1
+                return 0.0
+
+            if self._waiting >= self.max_queue:
+                stats['rejected_queue_full'] += 1
+                raise AdmissionRejected(endpoint, 'queue_full', self._retry_after(endpoint))
+
+            waiter = _Waiter(endpoint)
+            heapq.heappush(self._queue, (priority, next(self._seq), waiter))
+            self._waiting += 1
+            stats['waiting'] += 1
+            self._dispatch()
+
+            deadline = start + timeout
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            self._waiting -= 1
+            stats['waiting'] -= 1
+
+            if not waiter.granted:
+                waiter.cancelled = True
+                stats['rejected_timeout'] += 1
+                raise AdmissionRejected(endpoint, 'timeout', self._retry_after(endpoint))
+
+            waited = time.monotonic() - start
+            stats['admitted'] += 1
+            stats['wait_seconds_total'] += waited
+            stats['wait_seconds_max'] = max(stats['wait_seconds_max'], waited)
+            return waited
+
+    def release(self, endpoint: str, service_seconds: Optional[float] = None):
+        """Release an admission slot and admit the next waiter"""
+        with self._cond:
+            self._in_flight_total -= 1
+            self._in_flight[endpoint] = self._in_flight.get(endpoint, 1) - 1
+            if service_seconds is not None:
+                stats = self._endpoint_stats(endpoint)
+                # Exponentially weighted moving average of time spent holding a slot
+                previous = stats['service_seconds_avg']
+                stats['service_seconds_avg'] = service_seconds if not previous else 0.8 * previous + 0.2 * service_seconds
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, endpoint: str):
+        """Context manager that holds an admission slot for the duration of the block"""
+        self.acquire(endpoint)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(endpoint, time.monotonic() - start)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of admission and queue metrics"""
+        with self._cond:
+            endpoints = {}
+            for endpoint in set(self._stats) | set(self.limits):
+                stats = dict(self._endpoint_stats(endpoint))
+                stats['in_flight'] = self._in_flight.get(endpoint, 0)
+                stats['limit'] = self.limits.get(endpoint, self.max_concurrent)
+                endpoints[endpoint] = stats
+            return {
+                'max_concurrent': self.max_concurrent,
+                'in_flight': self._in_flight_total,
+                'queue_depth': self._waiting,
+                'max_queue': self.max_queue,
+                'queue_timeout_seconds': self.queue_timeout,
+                'endpoints': endpoints,
+            }
+
+
+# Global admission controller instance
+admission_controller = AdmissionController(
+    max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", "8")),
+    limits={
+        'interact': int(os.getenv("ADMISSION_LIMIT_INTERACT", "6")),
+        'end_session': int(os.getenv("ADMISSION_LIMIT_END_SESSION", "2")),
+        'tts': int(os.getenv("ADMISSION_LIMIT_TTS", "4")),
+    },
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "32")),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "5")),
+)
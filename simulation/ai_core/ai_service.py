@@ -5,21 +5,30 @@ This service coordinates all AI agents and provides the main interface
 for the Django application to interact with the AI system.
 """
 
+import contextvars
 import uuid
 import json
-from typing import Dict, Any, Optional, Tuple
+import queue
+import threading
+from typing import Dict, Any, Callable, Iterator, Optional, Tuple
 from django.contrib.auth.models import User
 
 from .patient_agent import PatientAgent
 from .examiner_workflow import ExaminerWorkflow
 from .feedback_agent import FeedbackAgent
 from .config import ai_config
+from .session_registry import SessionRegistry, SessionNotFound
+from .state_token import StaleStateToken
+from .speech_pipeline import SpeechPipeline
+from .resilience import CircuitOpenError
+from .telemetry import telemetry
+from .usage import usage_ledger
 
 class AIService:
     """Main AI service that coordinates all AI agents"""
     
     def __init__(self):
-        self.active_sessions = {}  # Store active sessions in memory
+        self.active_sessions = SessionRegistry()  # Store active sessions in memory
         self.llm = ai_config.get_llm()
     
     def start_session(self, user: User, case_data) -> str:
@@ -51,28 +60,173 @@ class AIService:
             'patient_agent': patient_agent,
             'examiner_workflow': examiner_workflow,
             'session_id': session_id,
-            'is_active': True
+            'is_active': True,
+            'turn': 0
         }
         
         self.active_sessions[session_id] = session_data
         
         return session_id
     
-    def process_user_input(self, session_id: str, user_input: str) -> Dict[str, Any]:
+    def restore_session(self, user: User, case_data, state: Dict[str, Any]) -> str:
+        """
+        Rebuild a session on this worker from a state snapshot (see state_token.py)
+        
+        Args:
+            user: Django user object
+            case_data: Case data from the database
+            state: Decoded state token
+            
+        Returns:
+            Session ID of the restored session
+        """
+        session_id = state['session_id']
+        
+        patient_agent = PatientAgent(
+            case_instructions=case_data.get('instructions_for_patient', '') or '',
+            session_id=session_id
+        )
+        patient_agent.memory.load_messages(state['messages'])
+        patient_agent.is_paused = state['patient_paused']
+        
+        self.active_sessions[session_id] = {
+            'user': user,
+            'case_data': case_data,
+            'patient_agent': patient_agent,
+            'examiner_workflow': ExaminerWorkflow(case_data),
+            'session_id': session_id,
+            'is_active': True,
+            'turn': state['turn'],
+            'turns_processed': state['turn']
+        }
+        
+        return session_id
+    
+    def export_state(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a session's conversation state for a state token, or None if not found"""
+        session_data = self.active_sessions.get(session_id)
+        if session_data is None:
+            return None
+        
+        patient_agent = session_data['patient_agent']
+        return {
+            'session_id': session_id,
+            'case_id': session_data['case_data']['case_id'],
+            'turn': session_data.get('turn', 0),
+            'patient_paused': patient_agent.is_paused,
+            'messages': patient_agent.memory.export_messages()
+        }
+    
+    def get_turn(self, session_id: str) -> Optional[int]:
+        """Turn counter of a session on this worker, or None if it is not loaded here"""
+        session_data = self.active_sessions.get(session_id)
+        return None if session_data is None else session_data.get('turn', 0)
+    
+    def set_turn(self, session_id: str, turn: int):
+        """Record the turn counter claimed for a session"""
+        session_data = self.active_sessions.get(session_id)
+        if session_data is not None:
+            session_data['turn'] = turn
+    
+    def knows_turn(self, session_id: str, turn_id: str) -> bool:
+        """Whether a turn id is running or recently completed for a session on this worker"""
+        turn_queue = self.active_sessions.turn_queue(session_id)
+        return turn_queue is not None and turn_queue.knows(turn_id)
+    
+    def process_user_input(self, session_id: str, user_input: str, turn_id: Optional[str] = None,
+                           claim: Optional[Callable[[], Callable[[], None]]] = None) -> Dict[str, Any]:
         """
         Process user input and return appropriate response
         
+        Turns for the same session run one at a time; a repeated turn_id
+        returns the result of the original submission instead of running again.
+        
         Args:
             session_id: Session identifier
             user_input: User's input text
+            turn_id: Optional client-supplied turn identifier
+            claim: Called inside the turn slot before the turn runs (never for a coalesced
+                duplicate); returns a callable that undoes the claim if the turn fails
             
         Returns:
             Dictionary containing response data
+            
+        Raises:
+            CircuitOpenError: If the patient reply could not be generated because OpenAI is short-circuited
+            StaleStateToken: If claim() rejects the turn
         """
         if session_id not in self.active_sessions:
             return {'error': 'Session not found'}
         
-        session_data = self.active_sessions[session_id]
+        try:
+            with telemetry.bind(case=self._case_label(session_id)), telemetry.span('turn'):
+                result, coalesced = self.active_sessions.run_turn(
+                    session_id,
+                    lambda: self._claimed_turn(
+                        claim, lambda: self._counted_turn(session_id, lambda: self._process_turn(session_id, user_input))
+                    ),
+                    turn_id=turn_id
+                )
+        except SessionNotFound:
+            # Cleared between the check and the submit
+            return {'error': 'Session not found'}
+        
+        if coalesced:
+            result = dict(result, duplicate=True)
+        return result
+    
+    @staticmethod
+    def _claimed_turn(claim: Optional[Callable[[], Callable[[], None]]],
+                      func: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Run a turn after claim(), undoing the claim if the turn fails"""
+        if claim is None:
+            return func()
+        undo = claim()
+        try:
+            return func()
+        except BaseException:
+            undo()
+            raise
+    
+    def _counted_turn(self, session_id: str, func: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run a turn with its model usage attributed to the session's next turn number
+        
+        Called from inside the turn slot, so duplicate submissions that are
+        coalesced never claim a number and numbers follow the order turns run in.
+        """
+        with self._usage_scope(session_id):
+            return func()
+    
+    def _usage_scope(self, session_id: str, count_turn: bool = True):
+        """Attribute model calls to the session's user and case, and (for a turn) to the next turn number"""
+        session_data = self.active_sessions.get(session_id)
+        if session_data is None:
+            return usage_ledger.scope()
+        
+        turn = None
+        if count_turn:
+            session_data['turns_processed'] = session_data.get('turns_processed', 0) + 1
+            turn = session_data['turns_processed']
+        
+        return usage_ledger.scope(
+            user_id=getattr(session_data['user'], 'id', None),
+            session_id=session_id,
+            case_id=session_data['case_data'].get('case_id'),
+            turn=turn
+        )
+    
+    def _case_label(self, session_id: str) -> str:
+        """Case id used as the telemetry label for a session's spans"""
+        session_data = self.active_sessions.get(session_id)
+        return session_data['case_data'].get('case_id', '') if session_data else ''
+    
+    def _process_turn(self, session_id: str, user_input: str) -> Dict[str, Any]:
+        """Process a single turn; callers must hold the session's turn slot"""
+        session_data = self.active_sessions.get(session_id)
+        if session_data is None:
+            return {'error': 'Session not found'}
+        
         patient_agent = session_data['patient_agent']
         examiner_workflow = session_data['examiner_workflow']
         
@@ -80,14 +234,7 @@ class AIService:
         is_examiner_request, patient_response = patient_agent.process_user_input(user_input)
         
         if is_examiner_request:
-            # Handle examiner request
-            examiner_response = examiner_workflow.process_examiner_request(user_input)
-            
-            return {
-                'type': 'examiner_response',
-                'response': examiner_response,
-                'patient_paused': True
-            }
+            return self._examiner_response(examiner_workflow, user_input)
         else:
             # Return patient response
             return {
@@ -96,6 +243,118 @@ class AIService:
                 'patient_paused': False
             }
     
+    def _examiner_response(self, examiner_workflow: ExaminerWorkflow, user_input: str) -> Dict[str, Any]:
+        """Resolve an examiner request (all sub-requests in one pass)"""
+        with telemetry.span('examiner'):
+            examiner_result = examiner_workflow.resolve_examiner_request(user_input)
+        
+        return {
+            'type': 'examiner_response',
+            'response': examiner_result['response'],
+            'sections': examiner_result['sections'],
+            'patient_paused': True
+        }
+    
+    def stream_user_input(self, session_id: str, user_input: str, turn_id: Optional[str] = None,
+                          speak: bool = True,
+                          on_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+                          claim: Optional[Callable[[], Callable[[], None]]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Process user input, yielding patient sentences and their audio as they become available
+        
+        The turn runs on a worker thread that holds the session's turn slot, so
+        it completes (and is recorded in memory) even if the caller stops reading.
+        
+        Args:
+            session_id: Session identifier
+            user_input: User's input text
+            turn_id: Optional client-supplied turn identifier
+            speak: Whether to synthesize audio for each patient sentence
+            on_done: Called with the result on the worker thread, inside the turn slot and
+                before the done event, so the turn is persisted even if the caller stops reading.
+                Not called for coalesced duplicates.
+            claim: As for process_user_input, called on the worker thread
+            
+        Yields:
+            Event dictionaries keyed by 'event':
+            - sentence: {'index', 'text'} as each patient sentence completes
+            - audio: {'index', 'name', 'mime', 'data'} in sentence order
+            - done: the same result process_user_input would return
+            - error: {'error'}, plus 'retry_after' when an upstream circuit is open, or
+              'stale_state_token' when claim() rejected the turn
+        """
+        if session_id not in self.active_sessions:
+            yield {'event': 'error', 'error': 'Session not found'}
+            return
+        
+        events = queue.Queue()
+        
+        def run():
+            try:
+                with telemetry.bind(case=self._case_label(session_id)), telemetry.span('turn'):
+                    result, coalesced = self.active_sessions.run_turn(
+                        session_id,
+                        lambda: self._claimed_turn(claim, lambda: self._counted_turn(
+                            session_id,
+                            lambda: self._process_turn_streaming(session_id, user_input, events.put, speak, on_done)
+                        )),
+                        turn_id=turn_id
+                    )
+                if coalesced:
+                    events.put(dict(result, event='done', duplicate=True))
+            except SessionNotFound:
+                events.put({'event': 'error', 'error': 'Session not found'})
+            except CircuitOpenError as e:
+                events.put({'event': 'error', 'error': str(e), 'retry_after': e.retry_after})
+            except StaleStateToken as e:
+                events.put({'event': 'error', 'error': str(e), 'stale_state_token': True})
+            except Exception as e:
+                events.put({'event': 'error', 'error': str(e)})
+            finally:
+                events.put(None)
+        
+        # The worker inherits the caller's context so its spans keep the request's telemetry labels
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(run,), name=f'turn-{session_id}', daemon=True).start()
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            yield event
+    
+    def _process_turn_streaming(self, session_id: str, user_input: str,
+                                emit: Callable[[Dict[str, Any]], None], speak: bool,
+                                on_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Process a single streamed turn; callers must hold the session's turn slot"""
+        session_data = self.active_sessions.get(session_id)
+        if session_data is None:
+            emit({'event': 'error', 'error': 'Session not found'})
+            return {'error': 'Session not found'}
+        
+        patient_agent = session_data['patient_agent']
+        is_examiner_request, deltas = patient_agent.stream_user_input(user_input)
+        
+        if is_examiner_request:
+            result = self._examiner_response(session_data['examiner_workflow'], user_input)
+        else:
+            # Each sentence goes to TTS as soon as it is complete
+            pipeline = SpeechPipeline(clean_sentence=patient_agent.clean_sentence)
+            sentences = []
+            for event in pipeline.run(deltas, speak=speak):
+                if event['event'] == 'sentence':
+                    sentences.append(event['text'])
+                emit(event)
+            result = {
+                'type': 'patient_response',
+                'response': ' '.join(sentences),
+                'patient_paused': False
+            }
+        
+        if on_done is not None:
+            on_done(result)
+        emit(dict(result, event='done'))
+        return result
+    
     def end_session(self, session_id: str) -> Dict[str, Any]:
         """
         End a session and generate feedback
@@ -109,7 +368,19 @@ class AIService:
         if session_id not in self.active_sessions:
             return {'error': 'Session not found'}
         
-        session_data = self.active_sessions[session_id]
+        try:
+            with self._usage_scope(session_id, count_turn=False):
+                result, _ = self.active_sessions.run_turn(session_id, lambda: self._end_session(session_id))
+            return result
+        except SessionNotFound:
+            return {'error': 'Session not found'}
+    
+    def _end_session(self, session_id: str) -> Dict[str, Any]:
+        """End a session once all of its pending turns have finished"""
+        session_data = self.active_sessions.get(session_id)
+        if session_data is None:
+            return {'error': 'Session not found'}
+        
         patient_agent = session_data['patient_agent']
         case_data = session_data['case_data']
         
@@ -117,8 +388,9 @@ class AIService:
         transcript = patient_agent.memory.get_conversation_string()
         
         # Generate feedback
-        feedback_agent = FeedbackAgent(case_data)
-        feedback = feedback_agent.generate_feedback(transcript, case_data['case_id'])
+        with telemetry.bind(case=case_data['case_id']), telemetry.span('feedback'):
+            feedback_agent = FeedbackAgent(case_data)
+            feedback = feedback_agent.generate_feedback(transcript, case_data['case_id'])
         
         # Mark session as inactive
         session_data['is_active'] = False
@@ -132,36 +404,38 @@ class AIService:
     
     def get_session_state(self, session_id: str) -> Dict[str, Any]:
         """Get current session state"""
-        if session_id not in self.active_sessions:
+        session_data = self.active_sessions.get(session_id)
+        if session_data is None:
             return {'error': 'Session not found'}
         
-        session_data = self.active_sessions[session_id]
         patient_agent = session_data['patient_agent']
         
         return {
             'session_id': session_id,
             'is_active': session_data['is_active'],
             'patient_state': patient_agent.get_session_state(),
-            'case_id': session_data['case_data']['case_id']
+            'case_id': session_data['case_data']['case_id'],
+            'queue_depth': self.active_sessions.queue_depth(session_id)
         }
     
     def resume_patient(self, session_id: str) -> bool:
         """Resume patient agent after examiner interaction"""
-        if session_id not in self.active_sessions:
-            return False
-        
-        session_data = self.active_sessions[session_id]
-        patient_agent = session_data['patient_agent']
-        patient_agent.resume_after_examiner()
+        def resume():
+            session_data = self.active_sessions.get(session_id)
+            if session_data is None:
+                return False
+            session_data['patient_agent'].resume_after_examiner()
+            return True
         
-        return True
+        try:
+            resumed, _ = self.active_sessions.run_turn(session_id, resume)
+            return resumed
+        except SessionNotFound:
+            return False
     
     def clear_session(self, session_id: str) -> bool:
         """Clear session data from memory"""
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
-            return True
-        return False
+        return self.active_sessions.pop(session_id, None) is not None
 
 # Global AI service instance
 ai_service = AIService()
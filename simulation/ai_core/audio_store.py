@@ -0,0 +1,112 @@
+"""
+Content-addressed audio storage for Clinical AI ExamPro
+
+Audio files are named by the SHA-256 of their bytes, so a file never changes
+once written and can be served with far-future cache headers. Per-case
+manifests record which stored file speaks which findings snippet.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Any, Dict, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_NAME_RE = re.compile(r'^[0-9a-f]{64}\.(mp3|wav|opus|aac)$')
+_UNSAFE_RE = re.compile(r'[^A-Za-z0-9_.-]')
+
+MIME_TYPES = {
+    'mp3': 'audio/mpeg',
+    'wav': 'audio/wav',
+    'opus': 'audio/ogg',
+    'aac': 'audio/aac',
+}
+
+
+def atomic_write(path: str, data: bytes):
+    """Write a file via a temporary file and rename so readers never see partial content"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+class AudioStore:
+    """Content-addressed audio files plus per-case manifests on local disk"""
+
+    def __init__(self, root: str, url_prefix: str = '/api/audio/'):
+        """
+        Initialize the store
+
+        Args:
+            root: Directory holding objects/ and manifests/
+            url_prefix: URL prefix the audio view is mounted at
+        """
+        self.root = root
+        self.url_prefix = url_prefix
+
+    def put(self, data: bytes, extension: str) -> str:
+        """
+        Store audio bytes
+
+        Args:
+            data: Encoded audio
+            extension: File extension (mp3, wav, ...)
+
+        Returns:
+            Stored file name ("<sha256>.<extension>")
+        """
+        name = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+        path = self._object_path(name)
+        if not os.path.exists(path):
+            atomic_write(path, data)
+        return name
+
+    def _object_path(self, name: str) -> str:
+        return os.path.join(self.root, 'objects', name[:2], name)
+
+    def path_for(self, name: str) -> Optional[str]:
+        """Filesystem path of a stored file, or None if the name is invalid or missing"""
+        if not _NAME_RE.match(name or ''):
+            return None
+        path = self._object_path(name)
+        return path if os.path.exists(path) else None
+
+    def url_for(self, name: str) -> str:
+        """URL the audio view serves a stored file at"""
+        return f"{self.url_prefix}{name}"
+
+    @staticmethod
+    def mime_type(name: str) -> str:
+        """MIME type for a stored file name"""
+        return MIME_TYPES.get(name.rsplit('.', 1)[-1], 'application/octet-stream')
+
+    def manifest_path(self, case_id: str) -> str:
+        """Path of a case's audio manifest"""
+        return os.path.join(self.root, 'manifests', f"{_UNSAFE_RE.sub('_', str(case_id))}.json")
+
+    def load_manifest(self, case_id: str) -> Optional[Dict[str, Any]]:
+        """Load a case's audio manifest, or None if it has not been rendered"""
+        try:
+            with open(self.manifest_path(case_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save_manifest(self, case_id: str, manifest: Dict[str, Any]):
+        """Atomically write a case's audio manifest"""
+        atomic_write(self.manifest_path(case_id), json.dumps(manifest, indent=2).encode('utf-8'))
+
+
+# Global audio store instance
+audio_store = AudioStore(os.getenv("AUDIO_STORE_DIR", os.path.join(PROJECT_ROOT, 'media', 'audio')))
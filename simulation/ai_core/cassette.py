@@ -0,0 +1,351 @@
+"""
+Record/replay cassettes for the LLM, vector search and TTS calls
+
+AI_CASSETTE_MODE selects the behaviour:
+- off (default): calls go straight to the provider;
+- record: calls go to the provider and each request/response pair is stored;
+- replay: responses are served from the store and no provider is contacted,
+  so no API keys are needed. A request that was never recorded raises
+  CassetteMissError.
+
+Entries are content-addressed: the key is a SHA-256 of the normalized
+request (call kind, model settings and whitespace-collapsed text), stored as
+gzipped JSON under AI_CASSETTE_DIR/<kind>/<key[:2]>/<key>.json.gz. Audio is
+stored once per distinct clip under AI_CASSETTE_DIR/blobs/.
+
+AI_CASSETTE_LATENCY=zero (default) serves replays immediately, so a replayed
+run measures only our own code; AI_CASSETTE_LATENCY=recorded sleeps for the
+upstream latency seen while recording, including the gaps between streamed
+chunks.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain.schema import AIMessage, Document
+from langchain.schema.messages import AIMessageChunk
+
+from .tts import SpeechSynthesizer, DEFAULT_VOICE, DEFAULT_MODEL
+from .audio_store import atomic_write, PROJECT_ROOT
+
+MODES = ('off', 'record', 'replay')
+LATENCIES = ('zero', 'recorded')
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode for a request that has no recording"""
+
+    status_code = 404  # Not retryable: replaying again cannot find it
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so formatting-only prompt changes map to the same recording"""
+    return ' '.join(text.split())
+
+
+def prompt_text(prompt: Any) -> str:
+    """Flatten a string or message-list prompt into text"""
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, list):
+        return '\n'.join(
+            f"{getattr(message, 'type', 'message')}: {getattr(message, 'content', message)}"
+            for message in prompt
+        )
+    return str(prompt)
+
+
+def request_key(request: Dict[str, Any]) -> str:
+    """Content address of a normalized request"""
+    payload = json.dumps(request, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CassetteStore:
+    """Content-addressed store of recorded calls with hit/miss accounting"""
+
+    def __init__(self, directory: str, mode: str = 'off', latency: str = 'zero'):
+        """
+        Initialize the store
+
+        Args:
+            directory: Root directory for recordings
+            mode: 'off', 'record' or 'replay'
+            latency: 'zero' or 'recorded' (replay only)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown AI_CASSETTE_MODE: {mode}")
+        if latency not in LATENCIES:
+            raise ValueError(f"Unknown AI_CASSETTE_LATENCY: {latency}")
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, key[:2], f"{key}.json.gz")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, 'blobs', digest[:2], digest)
+
+    def _count(self, kind: str, field: str, amount: float = 1):
+        with self._lock:
+            stats = self._stats.setdefault(kind, {'hits': 0, 'misses': 0, 'recorded': 0, 'upstream_seconds': 0.0})
+            stats[field] += amount
+
+    def save(self, kind: str, request: Dict[str, Any], response: Dict[str, Any], latency_seconds: float):
+        """Store the response for a request (last recording wins)"""
+        key = request_key(request)
+        entry = {'request': request, 'response': response, 'latency_seconds': round(latency_seconds, 6)}
+        data = gzip.compress(json.dumps(entry, separators=(',', ':')).encode('utf-8'), mtime=0)
+        try:
+            atomic_write(self._path(kind, key), data)
+            self._count(kind, 'recorded')
+        except OSError as e:
+            print(f"Error recording {kind} cassette {key}: {e}")
+
+    def load(self, kind: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Look up the recording for a request
+
+        Args:
+            kind: Call kind ('llm', 'vector' or 'tts')
+            request: Normalized request
+
+        Returns:
+            The stored entry with response and latency_seconds
+
+        Raises:
+            CassetteMissError: If the request was never recorded
+        """
+        key = request_key(request)
+        try:
+            with gzip.open(self._path(kind, key), 'rb') as f:
+                entry = json.loads(f.read().decode('utf-8'))
+        except FileNotFoundError:
+            self._count(kind, 'misses')
+            raise CassetteMissError(f"No {kind} recording for request {key}")
+        self._count(kind, 'hits')
+        self._count(kind, 'upstream_seconds', entry.get('latency_seconds', 0.0))
+        return entry
+
+    def save_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            atomic_write(path, data)
+        return digest
+
+    def load_blob(self, digest: str) -> bytes:
+        with open(self._blob_path(digest), 'rb') as f:
+            return f.read()
+
+    def pause(self, seconds: float):
+        """Sleep for a recorded delay when replaying at recorded latency"""
+        if self.latency == 'recorded' and seconds > 0:
+            time.sleep(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """Mode and per-kind hits, misses, recordings and recorded upstream seconds served"""
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'latency': self.latency,
+                'directory': self.directory,
+                'calls': {
+                    kind: dict(stats, upstream_seconds=round(stats['upstream_seconds'], 3))
+                    for kind, stats in self._stats.items()
+                },
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class CassetteChatModel:
+    """Chat model proxy recording or replaying invoke() and stream()"""
+
+    def __init__(self, llm: Any, store: CassetteStore, model_name: str, temperature: float):
+        """
+        Initialize the proxy
+
+        Args:
+            llm: Wrapped chat model (None when replaying)
+            store: Cassette store
+            model_name: Model name, part of the request key
+            temperature: Temperature, part of the request key
+        """
+        self.llm = llm
+        self.store = store
+        self.model_name = model_name
+        self.temperature = temperature
+
+    def __getattr__(self, name):
+        if self.llm is None:
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def _request(self, prompt: Any) -> Dict[str, Any]:
+        # Streamed and non-streamed calls share recordings; only the replay shape differs
+        return {
+            'model': self.model_name,
+            'temperature': self.temperature,
+            'prompt': normalize_text(prompt_text(prompt)),
+        }
+
+    def invoke(self, prompt: Any, **kwargs) -> AIMessage:
+        request = self._request(prompt)
+        if self.store.replaying:
+            entry = self.store.load('llm', request)
+            self.store.pause(entry['latency_seconds'])
+            return AIMessage(content=entry['response']['content'])
+
+        started_at = time.perf_counter()
+        message = self.llm.invoke(prompt, **kwargs)
+        latency = time.perf_counter() - started_at
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        self.store.save('llm', request, {'content': content, 'chunks': [[0.0, content]]}, latency)
+        return message
+
+    def stream(self, prompt: Any, **kwargs) -> Iterator[AIMessageChunk]:
+        request = self._request(prompt)
+        if self.store.replaying:
+            entry = self.store.load('llm', request)
+            elapsed = 0.0
+            for offset, text in entry['response']['chunks']:
+                self.store.pause(offset - elapsed)
+                elapsed = offset
+                yield AIMessageChunk(content=text)
+            return
+
+        started_at = time.perf_counter()
+        chunks: List[List[Any]] = []
+        for chunk in self.llm.stream(prompt, **kwargs):
+            text = chunk.content if isinstance(chunk.content, str) else ''
+            if text:
+                chunks.append([round(time.perf_counter() - started_at, 6), text])
+            yield chunk
+        latency = time.perf_counter() - started_at
+        content = ''.join(text for _, text in chunks)
+        self.store.save('llm', request, {'content': content, 'chunks': chunks}, latency)
+
+
+class CassetteVectorStore:
+    """Vector store proxy recording or replaying similarity_search()"""
+
+    def __init__(self, vector_store: Any, store: CassetteStore):
+        self.vector_store = vector_store
+        self.store = store
+
+    def __getattr__(self, name):
+        if self.vector_store is None:
+            raise AttributeError(name)
+        return getattr(self.vector_store, name)
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                          **kwargs) -> List[Document]:
+        request = {'query': normalize_text(query), 'k': k, 'filter': filter or {}}
+        if self.store.replaying:
+            entry = self.store.load('vector', request)
+            self.store.pause(entry['latency_seconds'])
+            return [Document(page_content=doc['page_content'], metadata=doc['metadata'])
+                    for doc in entry['response']['documents']]
+
+        started_at = time.perf_counter()
+        documents = self.vector_store.similarity_search(query, k=k, filter=filter, **kwargs)
+        latency = time.perf_counter() - started_at
+        self.store.save('vector', request, {
+            'documents': [{'page_content': doc.page_content, 'metadata': dict(doc.metadata or {})}
+                          for doc in documents],
+        }, latency)
+        return documents
+
+
+class CassetteSpeechSynthesizer(SpeechSynthesizer):
+    """Synthesizer proxy recording or replaying synthesize() and stream()"""
+
+    def __init__(self, synthesizer: SpeechSynthesizer, store: CassetteStore):
+        self.synthesizer = synthesizer
+        self.store = store
+        self.name = synthesizer.name
+        self.format = synthesizer.format
+        self.mime_type = synthesizer.mime_type
+        self.stream_formats = synthesizer.stream_formats
+
+    def available(self) -> bool:
+        return self.store.replaying or self.synthesizer.available()
+
+    def _request(self, text: str, voice: str, model: str, audio_format: str) -> Dict[str, Any]:
+        return {
+            'synthesizer': self.name,
+            'text': normalize_text(text),
+            'voice': voice,
+            'model': model,
+            'format': audio_format,
+        }
+
+    def synthesize(self, text: str, voice: str = DEFAULT_VOICE, model: str = DEFAULT_MODEL) -> Optional[bytes]:
+        request = self._request(text, voice, model, self.format)
+        if self.store.replaying:
+            entry = self.store.load('tts', request)
+            self.store.pause(entry['latency_seconds'])
+            digest = entry['response']['blob']
+            return self.store.load_blob(digest) if digest else None
+
+        started_at = time.perf_counter()
+        audio_bytes = self.synthesizer.synthesize(text, voice=voice, model=model)
+        latency = time.perf_counter() - started_at
+        digest = self.store.save_blob(audio_bytes) if audio_bytes else None
+        self.store.save('tts', request, {'blob': digest, 'chunks': [[0.0, len(audio_bytes or b'')]]}, latency)
+        return audio_bytes
+
+    def stream(self, text: str, voice: str = DEFAULT_VOICE, model: str = DEFAULT_MODEL,
+               audio_format: Optional[str] = None, chunk_size: int = 4096) -> Iterator[bytes]:
+        request = self._request(text, voice, model, audio_format or self.format)
+        if self.store.replaying:
+            entry = self.store.load('tts', request)
+            digest = entry['response']['blob']
+            audio_bytes = self.store.load_blob(digest) if digest else b''
+            position, elapsed = 0, 0.0
+            for offset, size in entry['response']['chunks']:
+                self.store.pause(offset - elapsed)
+                elapsed = offset
+                yield audio_bytes[position:position + size]
+                position += size
+            return
+
+        started_at = time.perf_counter()
+        parts: List[bytes] = []
+        chunks: List[List[Any]] = []
+        for chunk in self.synthesizer.stream(text, voice=voice, model=model,
+                                             audio_format=audio_format, chunk_size=chunk_size):
+            parts.append(chunk)
+            chunks.append([round(time.perf_counter() - started_at, 6), len(chunk)])
+            yield chunk
+        latency = time.perf_counter() - started_at
+        audio_bytes = b''.join(parts)
+        digest = self.store.save_blob(audio_bytes) if audio_bytes else None
+        self.store.save('tts', request, {'blob': digest, 'chunks': chunks}, latency)
+
+
+# Global cassette store configured from the environment
+cassette_store = CassetteStore(
+    directory=os.getenv("AI_CASSETTE_DIR", os.path.join(PROJECT_ROOT, 'cassettes')),
+    mode=os.getenv("AI_CASSETTE_MODE", "off").lower(),
+    latency=os.getenv("AI_CASSETTE_LATENCY", "zero").lower(),
+)
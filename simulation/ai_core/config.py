@@ -1,5 +1,10 @@
 """
 Configuration and shared components for AI agents
+
+AI_PROVIDER selects the backends: 'openai' (default) uses OpenAI and
+Pinecone, 'local' uses the deterministic offline fakes in fakes.py and needs
+no API keys. With AI_CASSETTE_MODE set, the chat model and vector store are
+wrapped in the record/replay proxies from cassette.py; replay needs no keys.
 """
 
 import os
@@ -9,53 +14,98 @@ from langchain_pinecone import PineconeVectorStore
 from pinecone import Pinecone
 from dotenv import load_dotenv
 
+from .usage import UsageCallbackHandler, MeteredEmbeddings
+from .cassette import cassette_store, CassetteChatModel, CassetteVectorStore
+
 # Load environment variables
 load_dotenv()
 
+PROVIDERS = ('openai', 'local')
+
 class AIConfig:
     """Configuration class for AI components"""
     
     def __init__(self):
+        self.provider = os.getenv("AI_PROVIDER", "openai").lower()
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.pinecone_api_key = os.getenv("PINECONE_API_KEY")
         self.pinecone_environment = os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
         self.pinecone_index_name = os.getenv("PINECONE_INDEX_NAME", "amc-tutor")
         
+        if self.provider not in PROVIDERS:
+            raise ValueError(f"Unknown AI_PROVIDER: {self.provider}")
+
+    def _require_keys(self):
+        """Raise if the OpenAI provider is used without API keys (checked per client, so the provider can change after import)"""
         if not self.openai_api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
         if not self.pinecone_api_key:
             raise ValueError("PINECONE_API_KEY environment variable is required")
     
     def get_llm(self, model_name: str = "gpt-4", temperature: float = 0.7) -> ChatOpenAI:
-        """Get configured OpenAI LLM"""
-        return ChatOpenAI(
-            openai_api_key=self.openai_api_key,
-            model_name=model_name,
-            temperature=temperature
-        )
+        """Get configured OpenAI LLM (a cassette proxy when AI_CASSETTE_MODE is set)"""
+        if cassette_store.replaying:
+            return CassetteChatModel(None, cassette_store, model_name, temperature)
+        if self.provider == 'local':
+            from .fakes import FakeChatModel
+            llm = FakeChatModel(model_name=model_name, temperature=temperature)
+        else:
+            self._require_keys()
+            llm = ChatOpenAI(
+                openai_api_key=self.openai_api_key,
+                model_name=model_name,
+                temperature=temperature,
+                stream_usage=True,  # Report token usage for streamed replies too
+                max_retries=0,  # resilient_call is the only retry layer
+                callbacks=[UsageCallbackHandler(model_name)]
+            )
+        if cassette_store.enabled:
+            return CassetteChatModel(llm, cassette_store, model_name, temperature)
+        return llm
     
-    def get_embeddings(self) -> OpenAIEmbeddings:
-        """Get configured OpenAI embeddings"""
-        return OpenAIEmbeddings(
-            openai_api_key=self.openai_api_key,
-            model="text-embedding-3-small",
-            dimensions=512
+    def get_embeddings(self) -> MeteredEmbeddings:
+        """Get configured OpenAI embeddings (usage is recorded in the usage ledger)"""
+        model = "text-embedding-3-small"
+        if self.provider == 'local':
+            from .fakes import HashEmbeddings
+            return MeteredEmbeddings(HashEmbeddings(dimensions=512), model)
+        self._require_keys()
+        return MeteredEmbeddings(
+            OpenAIEmbeddings(
+                openai_api_key=self.openai_api_key,
+                model=model,
+                dimensions=512,
+                max_retries=0  # Called inside resilient_call('pinecone', ...)
+            ),
+            model
         )
     
     def get_pinecone_client(self) -> Pinecone:
         """Get Pinecone client"""
+        if self.provider == 'local':
+            raise ValueError("Pinecone is not available with AI_PROVIDER=local")
+        self._require_keys()
         return Pinecone(api_key=self.pinecone_api_key)
     
     def get_vector_store(self) -> PineconeVectorStore:
-        """Get Pinecone vector store"""
-        pc = self.get_pinecone_client()
-        index = pc.Index(self.pinecone_index_name)
-        embeddings = self.get_embeddings()
-        
-        return PineconeVectorStore(
-            index=index,
-            embedding=embeddings
-        )
+        """Get Pinecone vector store (a cassette proxy when AI_CASSETTE_MODE is set)"""
+        if cassette_store.replaying:
+            return CassetteVectorStore(None, cassette_store)
+        if self.provider == 'local':
+            from .fakes import FakeVectorStore
+            vector_store = FakeVectorStore(self.get_embeddings(), dimensions=512)
+        else:
+            pc = self.get_pinecone_client()
+            index = pc.Index(self.pinecone_index_name)
+            embeddings = self.get_embeddings()
+            
+            vector_store = PineconeVectorStore(
+                index=index,
+                embedding=embeddings
+            )
+        if cassette_store.enabled:
+            return CassetteVectorStore(vector_store, cassette_store)
+        return vector_store
 
 # Global config instance
 ai_config = AIConfig()
@@ -0,0 +1,128 @@
+"""
+Process-wide cache of examiner responses
+
+Examiner findings depend only on the case content and the normalized request
+(request type + keywords), never on the session, so resolved sections are
+shared by every session in the process. Entries hold the retrieved findings,
+the formatted text and, once available, a reference to rendered audio.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class ExaminerResponseCache:
+    """Thread-safe LRU cache of examiner response sections"""
+
+    def __init__(self, max_entries: int = 2048):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of cached sections before LRU eviction
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(case_version: str, request_type: str, keywords: Iterable[str]) -> Tuple:
+        """Cache key for a normalized examiner request against a case version"""
+        return (case_version, request_type, tuple(sorted(set(keywords or ()))))
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """Get a cached entry (and mark it recently used), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, key: Tuple, findings_data: Dict[str, Any], formatted: str) -> Dict[str, Any]:
+        """
+        Store a resolved section
+
+        Args:
+            key: Key from make_key()
+            findings_data: Result of ExaminerWorkflow.retrieve_findings
+            formatted: Result of ExaminerWorkflow.format_response
+
+        Returns:
+            The stored entry (an existing entry wins if another thread got there first)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {'findings_data': findings_data, 'formatted': formatted, 'audio_ref': None}
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+            self._entries.move_to_end(key)
+            return entry
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Tuple[Dict[str, Any], str]]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Get a cached entry, computing and storing it on a miss
+
+        Args:
+            key: Key from make_key()
+            compute: Callable returning (findings_data, formatted)
+
+        Returns:
+            Tuple of (entry, hit)
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry, True
+        findings_data, formatted = compute()
+        return self.put(key, findings_data, formatted), False
+
+    def attach_audio(self, key: Tuple, audio_ref: List[str]) -> bool:
+        """Record the audio store file names rendered for a cached entry; False if not cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            entry['audio_ref'] = audio_ref
+            return True
+
+    def invalidate_case(self, case_version: str) -> int:
+        """Drop every entry for a case version; returns the number removed"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == case_version]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self):
+        """Drop all entries and reset statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit-rate and size statistics"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'entries_with_audio': sum(1 for entry in self._entries.values() if entry['audio_ref']),
+            }
+
+
+# Global examiner response cache shared by all sessions in the process
+examiner_cache = ExaminerResponseCache(max_entries=int(os.getenv("EXAMINER_CACHE_SIZE", "2048")))
@@ -8,6 +8,20 @@ addresses the "Examiner" during a simulation session.
 import re
 from typing import Dict, Any, Optional, List
 from .config import ai_config
+from .findings_index import get_findings_index
+from .examiner_cache import examiner_cache
+from .findings_audio import get_snippet_audio, audio_for_snippets
+from .audio_store import audio_store
+from .request_classifier import request_classifier
+
+# Reply when a case has no findings for the requested type
+NO_FINDINGS_MESSAGES = {
+    'physical_exam': "No specific physical examination findings available for this case.",
+    'lab_results': "No laboratory results available for this case.",
+    'imaging': "No imaging results available for this case.",
+    'vital_signs': "No specific vital signs recorded for this case.",
+    'general_findings': "No examination findings available for this case.",
+}
 
 class ExaminerWorkflow:
     """Handles examiner findings retrieval and response generation"""
@@ -21,6 +35,18 @@ class ExaminerWorkflow:
         """
         self.case_data = case_data
         self.llm = ai_config.get_llm(temperature=0.3)  # Lower temperature for factual responses
+        
+        # Segmented findings, built once per case and shared across sessions
+        self.findings_index = get_findings_index(
+            self._get_field('case_id'),
+            self._get_field('info_for_facilitator_exam_findings'),
+            self._get_field('examination_details')
+        )
+        # Responses are cached per case content, so edited cases never see stale answers
+        self.case_version = f"{self._get_field('case_id')}:{self.findings_index.fingerprint}"
+        
+        # Pre-rendered snippet audio (empty until prerender_findings_audio has run for this content)
+        self.snippet_audio = get_snippet_audio(self._get_field('case_id'), self.findings_index.fingerprint)
     
     def _get_field(self, field_name: str) -> str:
         """Safely get a field from case_data whether it's an object or a dict."""
@@ -57,63 +83,27 @@ class ExaminerWorkflow:
         # Remove "Examiner" prefix and clean up
         request_text = re.sub(r'^\s*examiner\s*:?\s*', '', user_input, flags=re.IGNORECASE).strip()
         
-        # Parse different types of requests
-        request_type = self._classify_request(request_text)
+        # Classify the request and extract keywords in a single pass
+        request_type, keywords = request_classifier.analyze(request_text)
+        
+        # Compound requests ("vitals, chest exam and an FBC") become one sub-request per type
+        sub_requests = request_classifier.analyze_compound(request_text)
         
         return {
             'original_input': user_input,
             'cleaned_request': request_text,
             'request_type': request_type,
-            'keywords': self._extract_keywords(request_text)
+            'keywords': keywords,
+            'sub_requests': sub_requests
         }
     
     def _classify_request(self, request_text: str) -> str:
         """Classify the type of examiner request"""
-        request_lower = request_text.lower()
-        
-        # Physical examination requests
-        if any(keyword in request_lower for keyword in ['examine', 'look at', 'check', 'inspect', 'observe']):
-            return 'physical_exam'
-        
-        # Lab results requests
-        if any(keyword in request_lower for keyword in ['lab', 'blood', 'test', 'result', 'investigation']):
-            return 'lab_results'
-        
-        # Imaging requests
-        if any(keyword in request_lower for keyword in ['x-ray', 'ct', 'mri', 'scan', 'imaging']):
-            return 'imaging'
-        
-        # Vital signs requests
-        if any(keyword in request_lower for keyword in ['vital', 'blood pressure', 'temperature', 'pulse', 'heart rate']):
-            return 'vital_signs'
-        
-        # General findings request
-        if any(keyword in request_lower for keyword in ['findings', 'results', 'what do you see', 'show me']):
-            return 'general_findings'
-        
-        return 'general_findings'
+        return request_classifier.classify(request_text)
     
     def _extract_keywords(self, request_text: str) -> List[str]:
         """Extract relevant keywords from the request"""
-        # Common medical examination keywords
-        keywords = []
-        
-        # Body parts
-        body_parts = ['head', 'neck', 'chest', 'abdomen', 'back', 'limbs', 'extremities', 
-                     'face', 'eyes', 'ears', 'nose', 'mouth', 'throat', 'heart', 'lungs']
-        
-        for part in body_parts:
-            if part in request_text.lower():
-                keywords.append(part)
-        
-        # Examination types
-        exam_types = ['inspection', 'palpation', 'auscultation', 'percussion', 'examination']
-        
-        for exam_type in exam_types:
-            if exam_type in request_text.lower():
-                keywords.append(exam_type)
-        
-        return keywords
+        return request_classifier.extract_keywords(request_text)
     
     def retrieve_findings(self, parsed_request: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -127,107 +117,21 @@ class ExaminerWorkflow:
         """
         request_type = parsed_request['request_type']
         
-        # Get the appropriate findings based on request type
-        if request_type == 'physical_exam':
-            findings = self._get_physical_exam_findings(parsed_request)
-        elif request_type == 'lab_results':
-            findings = self._get_lab_results(parsed_request)
-        elif request_type == 'imaging':
-            findings = self._get_imaging_findings(parsed_request)
-        elif request_type == 'vital_signs':
-            findings = self._get_vital_signs(parsed_request)
+        # Resolve only the relevant snippets through the precomputed index
+        snippets = self.findings_index.lookup(request_type, parsed_request['keywords'])
+        if snippets:
+            findings = "\n".join(snippet['text'] for snippet in snippets)
         else:
-            findings = self._get_general_findings(parsed_request)
+            findings = NO_FINDINGS_MESSAGES.get(request_type, NO_FINDINGS_MESSAGES['general_findings'])
         
         return {
             'request_type': request_type,
             'findings': findings,
-            'source': 'case_data',
+            'snippet_ids': [snippet['id'] for snippet in snippets],
+            'source': self.findings_index.source if snippets else 'case_data',
             'keywords_used': parsed_request['keywords']
         }
     
-    def _get_physical_exam_findings(self, parsed_request: Dict[str, Any]) -> str:
-        """Get physical examination findings"""
-        # Prioritize facilitator-specific findings if available
-        info_for_facilitator = self._get_field('info_for_facilitator_exam_findings')
-        if info_for_facilitator:
-            return info_for_facilitator
-        
-        # Fall back to general examination details
-        exam_details = self._get_field('examination_details')
-        if exam_details:
-            return exam_details
-        
-        return "No specific physical examination findings available for this case."
-    
-    def _get_lab_results(self, parsed_request: Dict[str, Any]) -> str:
-        """Get laboratory results"""
-        # Check for lab results in examination details
-        exam_details = self._get_field('examination_details') or ''
-        info_for_facilitator = self._get_field('info_for_facilitator_exam_findings') or ''
-        
-        # Look for lab-related content
-        lab_content = ""
-        if 'lab' in info_for_facilitator.lower() or 'blood' in info_for_facilitator.lower():
-            lab_content = info_for_facilitator
-        elif 'lab' in exam_details.lower() or 'blood' in exam_details.lower():
-            lab_content = exam_details
-        
-        if lab_content:
-            return lab_content
-        
-        return "No laboratory results available for this case."
-    
-    def _get_imaging_findings(self, parsed_request: Dict[str, Any]) -> str:
-        """Get imaging findings"""
-        # Check for imaging results in examination details
-        exam_details = self._get_field('examination_details') or ''
-        info_for_facilitator = self._get_field('info_for_facilitator_exam_findings') or ''
-        
-        # Look for imaging-related content
-        imaging_content = ""
-        if any(keyword in info_for_facilitator.lower() for keyword in ['x-ray', 'ct', 'mri', 'scan', 'imaging']):
-            imaging_content = info_for_facilitator
-        elif any(keyword in exam_details.lower() for keyword in ['x-ray', 'ct', 'mri', 'scan', 'imaging']):
-            imaging_content = exam_details
-        
-        if imaging_content:
-            return imaging_content
-        
-        return "No imaging results available for this case."
-    
-    def _get_vital_signs(self, parsed_request: Dict[str, Any]) -> str:
-        """Get vital signs"""
-        # Check for vital signs in examination details
-        exam_details = self._get_field('examination_details') or ''
-        info_for_facilitator = self._get_field('info_for_facilitator_exam_findings') or ''
-        
-        # Look for vital signs content
-        vital_content = ""
-        if any(keyword in info_for_facilitator.lower() for keyword in ['blood pressure', 'temperature', 'pulse', 'heart rate', 'vital']):
-            vital_content = info_for_facilitator
-        elif any(keyword in exam_details.lower() for keyword in ['blood pressure', 'temperature', 'pulse', 'heart rate', 'vital']):
-            vital_content = exam_details
-        
-        if vital_content:
-            return vital_content
-        
-        return "No specific vital signs recorded for this case."
-    
-    def _get_general_findings(self, parsed_request: Dict[str, Any]) -> str:
-        """Get general examination findings"""
-        # Prioritize facilitator-specific findings
-        info_for_facilitator = self._get_field('info_for_facilitator_exam_findings')
-        if info_for_facilitator:
-            return info_for_facilitator
-        
-        # Fall back to general examination details
-        exam_details = self._get_field('examination_details')
-        if exam_details:
-            return exam_details
-        
-        return "No examination findings available for this case."
-    
     def format_response(self, findings_data: Dict[str, Any]) -> str:
         """
         Format the findings into a readable response
@@ -250,23 +154,77 @@ class ExaminerWorkflow:
         
         return response
     
-    def process_examiner_request(self, user_input: str) -> str:
+    def resolve_examiner_request(self, user_input: str) -> Dict[str, Any]:
         """
-        Complete workflow for processing an examiner request
+        Resolve every sub-request of an examiner request in one pass
         
         Args:
             user_input: The user's input starting with "Examiner"
             
         Returns:
-            Formatted response with examination findings
+            Dictionary containing:
+            - sections: One entry per sub-request with title, request_type, findings,
+              snippet_ids, source, keywords_used and audio_urls (pre-rendered audio, if any)
+            - response: All sections formatted as a single response string
         """
-        # Parse the request
         parsed_request = self.parse_examiner_request(user_input)
         
-        # Retrieve findings
-        findings_data = self.retrieve_findings(parsed_request)
+        sections = []
+        shown_snippets = set()
+        formatted_sections = []
+        for sub_request in parsed_request['sub_requests']:
+            # Sections are shared across sessions through the process-wide cache
+            cache_key = examiner_cache.make_key(
+                self.case_version, sub_request['request_type'], sub_request['keywords']
+            )
+            entry, _ = examiner_cache.get_or_compute(cache_key, lambda: self._render_section(sub_request))
+            findings_data = dict(entry['findings_data'])
+            formatted = entry['formatted']
+            
+            # Findings that overlap (e.g. vitals inside a physical exam) are only shown once
+            new_ids = [i for i in findings_data['snippet_ids'] if i not in shown_snippets]
+            if findings_data['snippet_ids'] and len(new_ids) < len(findings_data['snippet_ids']):
+                if new_ids:
+                    findings_data['findings'] = "\n".join(
+                        self.findings_index.snippets[i]['text'] for i in new_ids
+                    )
+                else:
+                    findings_data['findings'] = "Already covered above."
+                findings_data['snippet_ids'] = new_ids
+                formatted = self.format_response(findings_data)
+                audio_ref = audio_for_snippets(self.snippet_audio, new_ids)
+            else:
+                audio_ref = entry['audio_ref']
+                if audio_ref is None:
+                    audio_ref = audio_for_snippets(self.snippet_audio, findings_data['snippet_ids'])
+                    if audio_ref:
+                        examiner_cache.attach_audio(cache_key, audio_ref)
+            findings_data['audio_urls'] = [audio_store.url_for(name) for name in audio_ref or []]
+            shown_snippets.update(new_ids)
+            
+            findings_data['title'] = findings_data['request_type'].replace('_', ' ').title()
+            findings_data['cleaned_request'] = sub_request['cleaned_request']
+            sections.append(findings_data)
+            formatted_sections.append(formatted)
         
-        # Format response
-        response = self.format_response(findings_data)
+        return {
+            'sections': sections,
+            'response': "\n\n".join(formatted_sections)
+        }
+    
+    def _render_section(self, sub_request: Dict[str, Any]):
+        """Retrieve and format the findings for one sub-request"""
+        findings_data = self.retrieve_findings(sub_request)
+        return findings_data, self.format_response(findings_data)
+    
+    def process_examiner_request(self, user_input: str) -> str:
+        """
+        Complete workflow for processing an examiner request
         
-        return response
+        Args:
+            user_input: The user's input starting with "Examiner"
+            
+        Returns:
+            Formatted response with examination findings
+        """
+        return self.resolve_examiner_request(user_input)['response']
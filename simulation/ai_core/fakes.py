@@ -0,0 +1,391 @@
+"""
+Deterministic local stand-ins for the OpenAI and Pinecone dependencies
+
+With AI_PROVIDER=local, ai_config hands out these fakes instead of the real
+clients, so the whole Django stack can be exercised and load tested offline
+without API keys:
+
+- FakeChatModel: patient-style replies chosen from a hash of the prompt,
+  streamed word by word at a configurable token rate;
+- HashEmbeddings: unit vectors seeded from a hash of the text;
+- FakeVectorStore: similarity search over a small synthetic guideline corpus;
+- FakeSpeechSynthesizer: the offline WAV tone synthesizer with latency.
+
+Every fake sleeps for a latency drawn from a configurable distribution and
+can inject upstream errors (status 500) and rate limits (status 429) at a
+configurable rate, which resilient_call retries and counts like the real ones.
+Usage is recorded under the real model names, so cost accounting and budgets
+behave as in production.
+
+Latency specs (FAKE_LLM_LATENCY, FAKE_EMBEDDING_LATENCY, FAKE_VECTOR_LATENCY,
+FAKE_TTS_LATENCY) take the form:
+    constant:<seconds>
+    uniform:<low>:<high>
+    normal:<mean>:<stddev>
+    lognormal:<median>:<sigma>
+"""
+
+import hashlib
+import math
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from langchain.schema import AIMessage, Document
+from langchain.schema.messages import AIMessageChunk
+from langchain_core.embeddings import Embeddings
+
+from .tts import LocalSpeechSynthesizer, DEFAULT_VOICE, DEFAULT_MODEL
+from .usage import usage_ledger, estimate_tokens
+
+PATIENT_SENTENCES = (
+    "It started about three days ago.",
+    "The pain is mostly on the right side.",
+    "I haven't had anything like this before.",
+    "It gets worse when I move around.",
+    "I took some paracetamol but it didn't help much.",
+    "I've been feeling quite tired lately.",
+    "No, I don't have any allergies that I know of.",
+    "My mother had something similar a few years ago.",
+    "I'm a bit worried it might be something serious.",
+    "I don't smoke, and I only drink on weekends.",
+    "It wakes me up at night sometimes.",
+    "I haven't noticed any fever.",
+    "I've lost a little weight without trying.",
+    "I work in an office, so I sit most of the day.",
+    "It comes and goes, but it's been more often recently.",
+    "I'm not taking any regular medications.",
+    "Sorry, could you explain what that means?",
+    "It feels like a dull ache, not sharp.",
+    "I feel a little short of breath when I climb stairs.",
+    "I came in today because it's getting harder to cope.",
+)
+
+CATEGORY_TYPES = (
+    'Adolescent Health', 'Cardiovascular Medicine', 'Mental Health',
+    'Dermatology', 'Emergency Medicine', 'General Practice',
+)
+
+GUIDELINE_TOPICS = (
+    'history taking', 'red flag symptoms', 'risk factor assessment', 'physical examination',
+    'investigations', 'differential diagnosis', 'management planning', 'patient education',
+    'safety netting', 'follow-up arrangements', 'referral criteria', 'communication skills',
+)
+
+
+class FakeUpstreamError(Exception):
+    """Injected upstream failure, shaped like an API error with a status code"""
+
+    def __init__(self, message: str, status_code: int = 500, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class LatencyModel:
+    """Latency distribution sampled by the fakes"""
+
+    DISTRIBUTIONS = ('constant', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, distribution: str = 'constant', a: float = 0.0, b: float = 0.0):
+        """
+        Initialize the latency model
+
+        Args:
+            distribution: One of DISTRIBUTIONS
+            a: Seconds (constant), low (uniform), mean (normal) or median (lognormal)
+            b: High (uniform), standard deviation (normal) or sigma (lognormal)
+        """
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.a = a
+        self.b = b
+
+    @classmethod
+    def parse(cls, spec: str) -> 'LatencyModel':
+        """Build a latency model from a spec such as 'lognormal:0.5:0.4'"""
+        parts = spec.strip().split(':')
+        try:
+            values = [float(part) for part in parts[1:]]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        return cls(parts[0].lower(), *values[:2])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.distribution == 'constant':
+            return self.a
+        if self.distribution == 'uniform':
+            return rng.uniform(self.a, self.b)
+        if self.distribution == 'normal':
+            return max(0.0, rng.gauss(self.a, self.b))
+        return self.a * math.exp(rng.gauss(0.0, self.b)) if self.a > 0 else 0.0
+
+
+class FaultInjector:
+    """Raises injected errors and rate limits at configured rates"""
+
+    def __init__(self, error_rate: float = 0.0, rate_limit_rate: float = 0.0, retry_after: float = 1.0):
+        """
+        Initialize the fault injector
+
+        Args:
+            error_rate: Fraction of calls failing with a 500
+            rate_limit_rate: Fraction of calls failing with a 429
+            retry_after: Seconds reported on injected 429s
+        """
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+
+    def maybe_fail(self, rng: random.Random, name: str):
+        if not self.error_rate and not self.rate_limit_rate:
+            return
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            raise FakeUpstreamError(f"{name}: rate limit exceeded (injected)", 429, self.retry_after)
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise FakeUpstreamError(f"{name}: upstream error (injected)", 500)
+
+
+class _FakeDependency:
+    """Shared latency, fault injection and random state for one fake"""
+
+    def __init__(self, name: str, latency: LatencyModel, faults: FaultInjector, seed: Optional[str] = None):
+        self.name = name
+        self.latency = latency
+        self.faults = faults
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def call(self) -> float:
+        """Inject a fault or sleep for the sampled latency; returns the seconds slept"""
+        with self._rng_lock:
+            self.faults.maybe_fail(self._rng, self.name)
+            delay = self.latency.sample(self._rng)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+class FakeChatModel:
+    """
+    Chat model stand-in exposing the invoke() and stream() calls the agents use
+
+    Replies depend only on the prompt, so a replayed conversation gets the same answers.
+    """
+
+    def __init__(self, model_name: str = 'gpt-4', temperature: float = 0.7,
+                 dependency: Optional[_FakeDependency] = None, tokens_per_second: Optional[float] = None):
+        """
+        Initialize the fake chat model
+
+        Args:
+            model_name: Model name recorded in the usage ledger
+            temperature: Accepted for interface compatibility (replies are deterministic)
+            dependency: Latency and fault settings (defaults to FAKE_LLM_* settings)
+            tokens_per_second: Streaming rate after the first token, 0 for no pacing
+                (defaults to FAKE_LLM_TOKENS_PER_SECOND)
+        """
+        self.model_name = model_name
+        self.temperature = temperature
+        self.dependency = dependency or get_fake_dependency('llm')
+        self.tokens_per_second = (
+            tokens_per_second if tokens_per_second is not None
+            else _env_float("FAKE_LLM_TOKENS_PER_SECOND", 60.0)
+        )
+
+    def _reply(self, prompt: str) -> str:
+        seed = _digest(prompt)
+        count = 1 + seed[0] % 4
+        return ' '.join(PATIENT_SENTENCES[seed[i + 1] % len(PATIENT_SENTENCES)] for i in range(count))
+
+    @staticmethod
+    def _prompt_text(prompt: Any) -> str:
+        if isinstance(prompt, str):
+            return prompt
+        if isinstance(prompt, list):
+            return '\n'.join(str(getattr(message, 'content', message)) for message in prompt)
+        return str(prompt)
+
+    def _record(self, prompt: str, reply: str, started_at: float):
+        usage_ledger.record(
+            'llm', self.model_name, estimate_tokens(prompt), estimate_tokens(reply),
+            latency_seconds=time.perf_counter() - started_at
+        )
+
+    def invoke(self, prompt: Any, **kwargs) -> AIMessage:
+        started_at = time.perf_counter()
+        prompt = self._prompt_text(prompt)
+        self.dependency.call()
+        reply = self._reply(prompt)
+        if self.tokens_per_second > 0:
+            time.sleep(estimate_tokens(reply) / self.tokens_per_second)
+        self._record(prompt, reply, started_at)
+        return AIMessage(content=reply)
+
+    def stream(self, prompt: Any, **kwargs) -> Iterator[AIMessageChunk]:
+        started_at = time.perf_counter()
+        prompt = self._prompt_text(prompt)
+        self.dependency.call()  # Time to first token
+        reply = self._reply(prompt)
+        words = reply.split(' ')
+        delay = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for i, word in enumerate(words):
+            if i and delay:
+                time.sleep(delay)
+            yield AIMessageChunk(content=word if i == 0 else ' ' + word)
+        self._record(prompt, reply, started_at)
+
+
+def hash_vector(text: str, dimensions: int) -> List[float]:
+    """Unit vector seeded from a hash of the text"""
+    rng = random.Random(_digest(text))
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+class HashEmbeddings(Embeddings):
+    """Embeddings stand-in returning hash-seeded unit vectors"""
+
+    def __init__(self, dimensions: int = 512, dependency: Optional[_FakeDependency] = None):
+        self.dimensions = dimensions
+        self.dependency = dependency or get_fake_dependency('embedding')
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.dependency.call()
+        return [hash_vector(text, self.dimensions) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.dependency.call()
+        return hash_vector(text, self.dimensions)
+
+
+class FakeVectorStore:
+    """Vector store stand-in searching a synthetic guideline corpus with hash embeddings"""
+
+    def __init__(self, embeddings: Embeddings, dimensions: int = 512, passages_per_category: int = 20,
+                 dependency: Optional[_FakeDependency] = None):
+        """
+        Initialize the fake vector store
+
+        Args:
+            embeddings: Embeddings used for queries (corpus vectors are hashed directly)
+            dimensions: Vector size, matching the embeddings
+            passages_per_category: Synthetic passages per category_type
+            dependency: Latency and fault settings (defaults to FAKE_VECTOR_* settings)
+        """
+        self.embeddings = embeddings
+        self.dimensions = dimensions
+        self.passages_per_category = passages_per_category
+        self.dependency = dependency or get_fake_dependency('vector')
+        self._corpus: Optional[List[Dict[str, Any]]] = None
+        self._corpus_lock = threading.Lock()
+
+    def _build_corpus(self) -> List[Dict[str, Any]]:
+        corpus = []
+        for category in CATEGORY_TYPES:
+            for i in range(self.passages_per_category):
+                topic = GUIDELINE_TOPICS[i % len(GUIDELINE_TOPICS)]
+                text = (
+                    f"{category} guideline {i + 1}: {topic}. Candidates are expected to cover {topic} "
+                    f"systematically, explain their reasoning to the patient and document the findings "
+                    f"that change management in {category.lower()} presentations."
+                )
+                corpus.append({
+                    'text': text,
+                    'metadata': {'category_type': category, 'topic': topic},
+                    'vector': hash_vector(text, self.dimensions),
+                })
+        return corpus
+
+    def _get_corpus(self) -> List[Dict[str, Any]]:
+        if self._corpus is None:
+            with self._corpus_lock:
+                if self._corpus is None:
+                    self._corpus = self._build_corpus()
+        return self._corpus
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[Dict[str, Any]] = None,
+                          **kwargs) -> List[Document]:
+        self.dependency.call()
+        query_vector = self.embeddings.embed_query(query)
+        scored = []
+        for entry in self._get_corpus():
+            if filter and any(entry['metadata'].get(key) != value for key, value in filter.items()):
+                continue
+            score = sum(a * b for a, b in zip(query_vector, entry['vector']))
+            scored.append((score, entry))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [Document(page_content=entry['text'], metadata=dict(entry['metadata'])) for _, entry in scored[:k]]
+
+
+class FakeSpeechSynthesizer(LocalSpeechSynthesizer):
+    """Offline WAV tone synthesizer with injected latency and faults, recording usage like OpenAI TTS"""
+
+    name = 'fake'
+
+    def __init__(self, dependency: Optional[_FakeDependency] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.dependency = dependency or get_fake_dependency('tts')
+
+    def synthesize(self, text: str, voice: str = DEFAULT_VOICE, model: str = DEFAULT_MODEL) -> Optional[bytes]:
+        started_at = time.perf_counter()
+        self.dependency.call()
+        audio_bytes = super().synthesize(text, voice=voice, model=model)
+        usage_ledger.record('tts', model, audio_characters=len(text), latency_seconds=time.perf_counter() - started_at)
+        return audio_bytes
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+# Default latency of each fake, roughly matching the real upstreams
+DEFAULT_LATENCIES = {
+    'llm': 'lognormal:0.4:0.5',
+    'embedding': 'uniform:0.02:0.08',
+    'vector': 'lognormal:0.08:0.3',
+    'tts': 'lognormal:0.25:0.4',
+}
+
+_dependencies: Dict[str, _FakeDependency] = {}
+_dependencies_lock = threading.Lock()
+
+
+def get_fake_dependency(name: str) -> _FakeDependency:
+    """
+    Shared latency and fault settings for one kind of fake, read from the environment
+
+    FAKE_<NAME>_LATENCY sets the latency spec. FAKE_ERROR_RATE and
+    FAKE_RATE_LIMIT_RATE apply to every fake unless overridden with
+    FAKE_<NAME>_ERROR_RATE / FAKE_<NAME>_RATE_LIMIT_RATE. FAKE_SEED seeds the
+    latency and fault draws.
+
+    Args:
+        name: 'llm', 'embedding', 'vector' or 'tts'
+    """
+    with _dependencies_lock:
+        dependency = _dependencies.get(name)
+        if dependency is None:
+            prefix = f"FAKE_{name.upper()}_"
+            seed = os.getenv("FAKE_SEED")
+            dependency = _FakeDependency(
+                f"fake_{name}",
+                LatencyModel.parse(os.getenv(prefix + "LATENCY", DEFAULT_LATENCIES[name])),
+                FaultInjector(
+                    error_rate=_env_float(prefix + "ERROR_RATE", _env_float("FAKE_ERROR_RATE", 0.0)),
+                    rate_limit_rate=_env_float(prefix + "RATE_LIMIT_RATE", _env_float("FAKE_RATE_LIMIT_RATE", 0.0)),
+                ),
+                seed=f"{seed}:{name}" if seed else None
+            )
+            _dependencies[name] = dependency
+        return dependency
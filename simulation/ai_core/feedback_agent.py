@@ -12,6 +12,8 @@ from langchain.schema import HumanMessage, AIMessage, SystemMessage
 from langchain.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
 
 from .config import ai_config
+from .resilience import resilient_call
+from .telemetry import telemetry
 
 class FeedbackAgent:
     """AI Feedback Agent that generates comprehensive feedback reports"""
@@ -390,15 +392,18 @@ class FeedbackAgent:
         
         return query
     
+    @telemetry.traced('rag_query')
     def _query_pinecone(self, query: str, case_id: str) -> List[str]:
         """Query Pinecone for relevant information"""
         try:
             # Add category filter based on case
             category_filter = self._get_category_filter(case_id)
             
-            # Query with filter
-            results = self.vector_store.similarity_search(
-                query, 
+            # Query with filter (retried with backoff, short-circuited while Pinecone is failing)
+            results = resilient_call(
+                'pinecone',
+                self.vector_store.similarity_search,
+                query,
                 k=3,
                 filter=category_filter
             )
@@ -0,0 +1,118 @@
+"""
+Pre-rendered examiner findings audio
+
+Every snippet in a case's findings index is synthesized offline (see the
+prerender_findings_audio management command) and stored in the audio store.
+At exam time the examiner only looks up which files speak the snippets it is
+returning, so no TTS call sits in the request path.
+"""
+
+import os
+import threading
+from typing import Dict, Any, List, Optional
+
+from .audio_store import audio_store, AudioStore
+from .findings_index import FindingsIndex
+from .tts import SpeechSynthesizer, DEFAULT_VOICE, DEFAULT_MODEL
+
+
+def prerender_case_audio(index: FindingsIndex, synthesizer: SpeechSynthesizer,
+                         voice: str = DEFAULT_VOICE, model: str = DEFAULT_MODEL,
+                         force: bool = False, store: AudioStore = None) -> Dict[str, Any]:
+    """
+    Synthesize and store audio for every snippet of a case's findings
+
+    Args:
+        index: The case's findings index
+        synthesizer: TTS backend
+        voice: Voice name
+        model: TTS model name
+        force: Re-synthesize even if the manifest is up to date
+        store: Audio store (defaults to the global one)
+
+    Returns:
+        Dictionary with snippets, rendered, reused and failed counts
+    """
+    store = store or audio_store
+    previous = store.load_manifest(index.case_id) or {}
+    same_voice = (previous.get('voice') == voice and previous.get('model') == model
+                  and previous.get('synthesizer') == synthesizer.name)
+    # Snippet ids shift when findings are edited, so reuse is keyed by snippet text
+    reusable = {} if force or not same_voice else {
+        entry['text']: entry['audio'] for entry in previous.get('snippets', {}).values()
+        if store.path_for(entry.get('audio'))
+    }
+
+    snippets = {}
+    stats = {'snippets': len(index.snippets), 'rendered': 0, 'reused': 0, 'failed': 0}
+    for snippet in index.snippets:
+        name = reusable.get(snippet['text'])
+        if name:
+            stats['reused'] += 1
+        else:
+            try:
+                audio_bytes = synthesizer.synthesize(snippet['text'], voice=voice, model=model)
+            except Exception as e:
+                print(f"Error rendering audio for {index.case_id} snippet {snippet['id']}: {e}")
+                audio_bytes = None
+            if not audio_bytes:
+                stats['failed'] += 1
+                continue
+            name = store.put(audio_bytes, synthesizer.format)
+            stats['rendered'] += 1
+        snippets[str(snippet['id'])] = {'text': snippet['text'], 'audio': name}
+
+    store.save_manifest(index.case_id, {
+        'case_id': index.case_id,
+        'fingerprint': index.fingerprint,
+        'synthesizer': synthesizer.name,
+        'voice': voice,
+        'model': model,
+        'snippets': snippets,
+    })
+    return stats
+
+
+_manifest_cache: Dict[str, tuple] = {}
+_manifest_cache_lock = threading.Lock()
+
+
+def get_snippet_audio(case_id: str, fingerprint: str, store: AudioStore = None) -> Dict[int, str]:
+    """
+    Map snippet ids to stored audio file names for a case
+
+    Args:
+        case_id: Case identifier
+        fingerprint: Findings index fingerprint the audio must have been rendered from
+        store: Audio store (defaults to the global one)
+
+    Returns:
+        {snippet_id: audio file name}; empty if the case has no current rendering
+    """
+    store = store or audio_store
+    manifest_path = store.manifest_path(case_id)
+    try:
+        mtime = os.path.getmtime(manifest_path)
+    except OSError:
+        return {}
+
+    with _manifest_cache_lock:
+        cached = _manifest_cache.get(case_id)
+    if cached and cached[0] == mtime:
+        manifest = cached[1]
+    else:
+        manifest = store.load_manifest(case_id) or {}
+        with _manifest_cache_lock:
+            _manifest_cache[case_id] = (mtime, manifest)
+
+    # Audio rendered from older findings text must not be played
+    if manifest.get('fingerprint') != fingerprint:
+        return {}
+    return {int(snippet_id): entry['audio'] for snippet_id, entry in manifest.get('snippets', {}).items()}
+
+
+def audio_for_snippets(snippet_audio: Dict[int, str], snippet_ids: List[int]) -> Optional[List[str]]:
+    """Audio file names for a list of snippets, or None unless every snippet has audio"""
+    if not snippet_ids or any(snippet_id not in snippet_audio for snippet_id in snippet_ids):
+        return None
+    return [snippet_audio[snippet_id] for snippet_id in snippet_ids]
@@ -0,0 +1,251 @@
+"""
+Precomputed examiner findings index for Clinical AI ExamPro
+
+Each case's examination findings are segmented into snippets tagged with
+body system(s) and modality (vitals, labs, imaging, exam). Snippets are kept
+in inverted indexes keyed by modality, body system and term, so an examiner
+request resolves to only the relevant snippets with a few dictionary lookups
+instead of rescanning the whole findings text on every request.
+
+An index is built the first time a process serves an examiner request for a
+case's content and is shared by every session in that process, up to an LRU
+bound (FINDINGS_INDEX_CACHE_SIZE, default 256 cases).
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set
+
+# Body system vocabulary. Multi-word phrases are matched against the
+# normalized snippet text, single words against its token set.
+BODY_SYSTEMS = {
+    'general': ['looks', 'appearance', 'well', 'unwell', 'distress', 'pale', 'jaundice', 'jaundiced',
+                'hydration', 'dehydrated', 'weight', 'height', 'bmi', 'centile', 'cyanosis'],
+    'cardiovascular': ['heart', 'cardiac', 'apex', 'murmur', 'murmurs', 'pulse', 'pulses', 'bruits',
+                       'oedema', 'jvp', 'heart sounds', 'capillary refill', 'blood pressure', 'bp'],
+    'respiratory': ['chest', 'lung', 'lungs', 'breath', 'breathing', 'wheeze', 'crackles', 'respiratory',
+                    'air entry', 'percussion note', 'saturation', 'spo2', 'trachea'],
+    'abdominal': ['abdomen', 'abdominal', 'liver', 'spleen', 'bowel', 'hernia', 'hernias', 'rectal',
+                  'hepatomegaly', 'splenomegaly', 'tenderness', 'guarding'],
+    'neurological': ['neurological', 'neuro', 'reflexes', 'reflex', 'power', 'tone', 'sensation',
+                     'cranial', 'nerves', 'gait', 'coordination', 'romberg', 'pupils', 'conscious',
+                     'gcs', 'tremor', 'balance'],
+    'musculoskeletal': ['joint', 'joints', 'knee', 'knees', 'hip', 'hips', 'shoulder', 'shoulders',
+                        'spine', 'back', 'range of movement', 'deformity', 'fingers', 'ulnar', 'limb',
+                        'limbs', 'leg', 'legs', 'arm', 'arms', 'feet', 'foot', 'hand', 'hands', 'neck movements'],
+    'skin': ['skin', 'rash', 'acne', 'lesion', 'lesions', 'bruise', 'bruising', 'comedones', 'pustules',
+             'erythema', 'scarring', 'nails', 'toenails', 'mole', 'ulcer'],
+    'head_neck': ['head', 'neck', 'thyroid', 'lymph', 'nodes', 'ear', 'ears', 'otoscopy', 'eardrums',
+                  'hearing', 'nose', 'throat', 'tonsils', 'mouth', 'face', 'facial', 'eye', 'eyes',
+                  'cataracts', 'fundoscopy', 'visual', 'vision', 'axillae'],
+    'genitourinary': ['urine', 'urinalysis', 'testes', 'scrotum', 'scrotal', 'vaginal', 'speculum',
+                      'pelvic', 'breast', 'breasts', 'prostate', 'genital', 'cervix'],
+}
+
+# Modality vocabulary; snippets that match none of these are plain exam findings
+MODALITIES = {
+    'vitals': ['blood pressure', 'bp', 'pulse', 'heart rate', 'temperature', 'respiratory rate',
+               'oxygen saturation', 'saturation', 'spo2', 'mm hg', 'mmhg', 'bpm', 'bmi', 'weight',
+               'height', 'vital', 'vitals'],
+    'labs': ['fbc', 'full blood count', 'blood count', 'haemoglobin', 'hb', 'wcc', 'platelets', 'uec',
+             'u and e', 'electrolytes', 'lfts', 'lft', 'liver function', 'crp', 'esr', 'glucose',
+             'lipids', 'hba1c', 'tsh', 'thyroid function', 'urinalysis', 'blood tests', 'blood test',
+             'blood film', 'culture', 'serology', 'ferritin', 'iron studies', 'b12', 'folate', 'inr',
+             'troponin', 'mmol', 'hcg', 'pregnancy test', 'psa', 'swab', 'pathology'],
+    'imaging': ['x-ray', 'xray', 'cxr', 'ct', 'mri', 'ultrasound', 'scan', 'imaging', 'ecg', 'echo',
+                'echocardiogram', 'audiometry', 'spirometry', 'doppler'],
+}
+
+# Request types produced by ExaminerWorkflow mapped to the modalities they want
+REQUEST_MODALITIES = {
+    'vital_signs': ('vitals',),
+    'lab_results': ('labs',),
+    'imaging': ('imaging',),
+    'physical_exam': ('exam', 'vitals'),
+    'general_findings': None,
+}
+
+# Request keywords (body parts, exam types) mapped to body systems
+KEYWORD_SYSTEMS = {
+    'head': ('head_neck',), 'neck': ('head_neck',), 'face': ('head_neck', 'skin'),
+    'eyes': ('head_neck',), 'ears': ('head_neck',), 'nose': ('head_neck',),
+    'mouth': ('head_neck',), 'throat': ('head_neck',),
+    'chest': ('respiratory', 'cardiovascular'), 'lungs': ('respiratory',),
+    'heart': ('cardiovascular',), 'abdomen': ('abdominal',),
+    'back': ('musculoskeletal',), 'limbs': ('musculoskeletal',), 'extremities': ('musculoskeletal',),
+    'skin': ('skin',), 'neurological': ('neurological',),
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-/][a-z0-9]+)*")
+_TAG_LINE_RE = re.compile(r'^\s*\[[A-Z_]+(?::[^\]]*)?\]\s*$')
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+
+def _compile_vocabulary(vocabulary: Dict[str, List[str]]):
+    """Split a label -> terms vocabulary into single-word and phrase lookup tables"""
+    words = {}
+    phrases = []
+    for label, terms in vocabulary.items():
+        for term in terms:
+            if ' ' in term or '-' in term:
+                phrases.append((term, label))
+            else:
+                words.setdefault(term, set()).add(label)
+    return words, phrases
+
+
+_SYSTEM_WORDS, _SYSTEM_PHRASES = _compile_vocabulary(BODY_SYSTEMS)
+_MODALITY_WORDS, _MODALITY_PHRASES = _compile_vocabulary(MODALITIES)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a text"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _labels_for(normalized: str, tokens: Set[str], words, phrases) -> Set[str]:
+    labels = set()
+    for token in tokens:
+        matched = words.get(token)
+        if matched:
+            labels |= matched
+    for phrase, label in phrases:
+        if phrase in normalized:
+            labels.add(label)
+    return labels
+
+
+def segment_findings(text: str) -> List[str]:
+    """Split a findings blob into line/sentence sized snippets, dropping bracket tags"""
+    snippets = []
+    for line in (text or '').splitlines():
+        if not line.strip() or _TAG_LINE_RE.match(line):
+            continue
+        for sentence in _SENTENCE_SPLIT_RE.split(line.strip()):
+            sentence = sentence.strip()
+            if sentence:
+                snippets.append(sentence)
+    return snippets
+
+
+class FindingsIndex:
+    """Inverted index over a single case's segmented examination findings"""
+
+    def __init__(self, case_id: str, facilitator_findings: str = '', examination_details: str = ''):
+        """
+        Segment and index a case's findings
+
+        Args:
+            case_id: Case identifier
+            facilitator_findings: Findings the facilitator reveals on request (preferred source)
+            examination_details: Suggested examination, used when no facilitator findings exist
+        """
+        self.case_id = case_id
+        if (facilitator_findings or '').strip():
+            self.source = 'info_for_facilitator_exam_findings'
+            text = facilitator_findings
+        else:
+            self.source = 'examination_details'
+            text = examination_details or ''
+
+        self.fingerprint = hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+        self.snippets: List[Dict[str, Any]] = []
+        self.by_modality: Dict[str, Set[int]] = {}
+        self.by_system: Dict[str, Set[int]] = {}
+        self.by_term: Dict[str, Set[int]] = {}
+
+        for snippet_id, snippet_text in enumerate(segment_findings(text)):
+            normalized = ' '.join(tokenize(snippet_text))
+            tokens = set(normalized.split())
+            systems = _labels_for(normalized, tokens, _SYSTEM_WORDS, _SYSTEM_PHRASES)
+            modalities = _labels_for(normalized, tokens, _MODALITY_WORDS, _MODALITY_PHRASES) or {'exam'}
+
+            self.snippets.append({
+                'id': snippet_id,
+                'text': snippet_text,
+                'systems': sorted(systems),
+                'modalities': sorted(modalities),
+            })
+            for modality in modalities:
+                self.by_modality.setdefault(modality, set()).add(snippet_id)
+            for system in systems:
+                self.by_system.setdefault(system, set()).add(snippet_id)
+            for token in tokens:
+                self.by_term.setdefault(token, set()).add(snippet_id)
+
+    def __len__(self) -> int:
+        return len(self.snippets)
+
+    def lookup(self, request_type: str, keywords: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Resolve an examiner request to the relevant snippets
+
+        Args:
+            request_type: Request type from ExaminerWorkflow classification
+            keywords: Body parts / examination keywords from the request
+
+        Returns:
+            Matching snippets in document order (empty if the case has none)
+        """
+        modalities = REQUEST_MODALITIES.get(request_type)
+        if modalities is None:
+            candidates = set(range(len(self.snippets)))
+        else:
+            candidates = set()
+            for modality in modalities:
+                candidates |= self.by_modality.get(modality, set())
+
+        keywords = keywords or []
+        if keywords and candidates:
+            focused = set()
+            for keyword in keywords:
+                for system in KEYWORD_SYSTEMS.get(keyword, ()):
+                    focused |= self.by_system.get(system, set())
+                focused |= self.by_term.get(keyword, set())
+            # Only narrow when the keywords actually hit something in this case
+            if focused & candidates:
+                candidates &= focused
+
+        return [self.snippets[snippet_id] for snippet_id in sorted(candidates)]
+
+
+# Indexes are built lazily, on a case's first examiner request in each process, and kept in an LRU
+_index_cache: "OrderedDict[tuple, FindingsIndex]" = OrderedDict()
+_index_cache_lock = threading.Lock()
+INDEX_CACHE_SIZE = int(os.getenv("FINDINGS_INDEX_CACHE_SIZE", "256"))
+
+
+def get_findings_index(case_id: str, facilitator_findings: str = '', examination_details: str = '') -> FindingsIndex:
+    """
+    Get the findings index for a case, building it on first use per process and content version
+    
+    Up to FINDINGS_INDEX_CACHE_SIZE indexes are kept; the least recently used is evicted.
+
+    Args:
+        case_id: Case identifier
+        facilitator_findings: Facilitator findings text
+        examination_details: Examination details text
+
+    Returns:
+        The shared FindingsIndex for this case content
+    """
+    content_hash = hashlib.sha1(
+        f"{facilitator_findings or ''}\x00{examination_details or ''}".encode('utf-8')
+    ).hexdigest()
+    key = (case_id, content_hash)
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+    
+    built = FindingsIndex(case_id, facilitator_findings, examination_details)
+    with _index_cache_lock:
+        index = _index_cache.setdefault(key, built)
+        _index_cache.move_to_end(key)
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
@@ -16,6 +16,7 @@ class SessionMemory:
         Args:
             k: Number of conversation turns to keep in memory
         """
+        self.k = k
         self.memory = ConversationBufferWindowMemory(k=k, return_messages=True)
         self.session_metadata = {}
     
@@ -39,6 +40,20 @@ class SessionMemory:
         """Get conversation as a formatted string"""
         return self.memory.buffer
     
+    def export_messages(self) -> List[List[str]]:
+        """Export the messages in the memory window as compact [role, text] pairs ('h' or 'a')"""
+        messages = self.get_messages()[-self.k * 2:]
+        return [['h' if isinstance(message, HumanMessage) else 'a', message.content] for message in messages]
+    
+    def load_messages(self, messages: List[List[str]]):
+        """Replace memory with messages exported by export_messages"""
+        self.clear()
+        for role, content in messages:
+            if role == 'h':
+                self.add_human_message(content)
+            else:
+                self.add_ai_message(content)
+    
     def clear(self):
         """Clear all memory"""
         self.memory.clear()
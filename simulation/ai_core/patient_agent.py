@@ -5,13 +5,16 @@ This agent role-plays as the patient based on case instructions and maintains
 conversation context throughout the session.
 """
 
+import itertools
 import re
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Iterator, Optional, Tuple
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
 from langchain.prompts import ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
 
 from .config import ai_config
 from .memory import SessionMemory
+from .resilience import resilient_call, CircuitOpenError
+from .telemetry import telemetry
 
 class PatientAgent:
     """AI Patient Agent that role-plays as the patient"""
@@ -77,6 +80,9 @@ Remember: You are the patient, not a medical professional. Respond only from the
             Tuple of (is_examiner_request, patient_response)
             - is_examiner_request: True if user addressed examiner
             - patient_response: Patient's response or None if examiner request
+            
+        Raises:
+            CircuitOpenError: If OpenAI is short-circuited; nothing is added to memory
         """
         # Check for examiner keyword
         if self.detect_examiner_keyword(user_input):
@@ -100,14 +106,34 @@ Remember: You are the patient, not a medical professional. Respond only from the
         
         return False, patient_response
     
-    def _generate_patient_response(self, user_input: str) -> str:
-        """Generate patient response using LLM"""
-        try:
-            # Get conversation history
-            conversation_history = self.memory.get_conversation_string()
+    def stream_user_input(self, user_input: str) -> Tuple[bool, Optional[Iterator[str]]]:
+        """
+        Process user input and stream the patient response as it is generated
+        
+        Args:
+            user_input: The user's input text
             
-            # Create the prompt
-            prompt = f"""
+        Returns:
+            Tuple of (is_examiner_request, response_deltas)
+            - is_examiner_request: True if user addressed examiner
+            - response_deltas: Iterator of response text pieces, or None if examiner request.
+              The exchange is added to memory once the iterator is exhausted. Iterating
+              raises CircuitOpenError, with nothing recorded, if OpenAI is short-circuited.
+        """
+        if self.detect_examiner_keyword(user_input):
+            self.is_paused = True
+            return True, None
+        
+        self.is_paused = False
+        return False, self._stream_patient_response(user_input)
+    
+    def _build_prompt(self, user_input: str) -> str:
+        """Build the patient prompt from the persona and conversation history"""
+        # Get conversation history
+        conversation_history = self.memory.get_conversation_string()
+        
+        # Create the prompt
+        return f"""
 {self.persona_prompt}
 
 CONVERSATION HISTORY:
@@ -116,9 +142,57 @@ CONVERSATION HISTORY:
 DOCTOR: {user_input}
 
 PATIENT:"""
+    
+    @telemetry.traced('patient_llm_first_token')
+    def _open_stream(self, prompt: str):
+        """Start a streamed completion and wait for its first chunk"""
+        stream = self.llm.stream(prompt)
+        return next(stream, None), stream
+    
+    def _stream_patient_response(self, user_input: str) -> Iterator[str]:
+        """Stream the patient response from the LLM, recording the full reply in memory"""
+        pieces = []
+        try:
+            try:
+                # Only opening the stream is retried; once text is flowing it is relayed as-is
+                first_chunk, stream = resilient_call('openai', self._open_stream, self._build_prompt(user_input))
+                head = [first_chunk] if first_chunk is not None else []
+                for chunk in itertools.chain(head, stream):
+                    delta = chunk.content or ''
+                    if delta:
+                        pieces.append(delta)
+                        yield delta
+            except CircuitOpenError:
+                # Nothing was said; the caller answers 503 instead of a canned reply
+                raise
+            except Exception as e:
+                print(f"Error streaming patient response: {e}")
+            
+            if not pieces:
+                fallback = "I'm sorry, I'm having trouble understanding. Could you please repeat that?"
+                pieces.append(fallback)
+                yield fallback
+        finally:
+            # Record whatever was said, even if the client went away mid-reply
+            if pieces:
+                self.memory.add_human_message(user_input)
+                self.memory.add_ai_message(self._clean_response(''.join(pieces)))
+    
+    def clean_sentence(self, sentence: str) -> str:
+        """Remove role prefixes, AI notes and bracketed asides from a single streamed sentence"""
+        sentence = re.sub(r'^\s*(PATIENT|Patient):\s*', '', sentence, flags=re.IGNORECASE)
+        sentence = re.sub(r'\s*\(Note:.*?\)', '', sentence)
+        sentence = re.sub(r'\s*\[.*?\]', '', sentence)
+        return sentence.strip()
+    
+    @telemetry.traced('patient_llm')
+    def _generate_patient_response(self, user_input: str) -> str:
+        """Generate patient response using LLM"""
+        try:
+            prompt = self._build_prompt(user_input)
             
-            # Generate response
-            response = self.llm.invoke(prompt)
+            # Generate response (retried with backoff, short-circuited while OpenAI is failing)
+            response = resilient_call('openai', self.llm.invoke, prompt)
             
             # Extract just the patient's response (remove any extra text)
             patient_response = response.content.strip()
@@ -128,6 +202,9 @@ PATIENT:"""
             
             return patient_response
             
+        except CircuitOpenError:
+            # Nothing was said; the caller answers 503 instead of a canned reply
+            raise
         except Exception as e:
             print(f"Error generating patient response: {e}")
             return "I'm sorry, I'm having trouble understanding. Could you please repeat that?"
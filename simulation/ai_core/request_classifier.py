@@ -0,0 +1,340 @@
+"""
+Compiled examiner request classifier for Clinical AI ExamPro
+
+The classifier is built once per process. A request is tokenized in a single
+pass; the longest matching term (up to three words) at each position is looked
+up in a term -> class weight table, and the weight vectors are summed over all
+request types at once. Because "blood pressure" is matched as one term before
+"blood" is considered, multi-word terms can no longer be misrouted by the
+order in which classes happen to be checked.
+
+Compound requests ("the vitals, chest exam and a full blood count") are split
+on commas and conjunctions into sub-requests that are classified separately.
+"""
+
+import re
+from typing import Any, Dict, List, Tuple
+
+REQUEST_TYPES = ('physical_exam', 'lab_results', 'imaging', 'vital_signs', 'general_findings')
+
+# Used when no term matches, and to break ties (earlier wins)
+DEFAULT_REQUEST_TYPE = 'general_findings'
+TIE_BREAK_ORDER = ('vital_signs', 'lab_results', 'imaging', 'physical_exam', 'general_findings')
+
+# term -> {request_type: weight}
+TERM_WEIGHTS = {
+    # Vital signs
+    'vital': {'vital_signs': 3.0},
+    'vitals': {'vital_signs': 3.0},
+    'vital signs': {'vital_signs': 3.0},
+    'observations': {'vital_signs': 2.0},
+    'obs': {'vital_signs': 2.0},
+    'blood pressure': {'vital_signs': 3.0},
+    'bp': {'vital_signs': 3.0},
+    'temperature': {'vital_signs': 3.0},
+    'temp': {'vital_signs': 2.0},
+    'pulse': {'vital_signs': 2.5},
+    'heart rate': {'vital_signs': 3.0},
+    'respiratory rate': {'vital_signs': 3.0},
+    'resp rate': {'vital_signs': 3.0},
+    'oxygen saturation': {'vital_signs': 3.0},
+    'oxygen saturations': {'vital_signs': 3.0},
+    'saturations': {'vital_signs': 2.5},
+    'sats': {'vital_signs': 2.5},
+    'weight': {'vital_signs': 2.0},
+    'height': {'vital_signs': 2.0},
+    'bmi': {'vital_signs': 2.5},
+
+    # Laboratory results
+    'lab': {'lab_results': 3.0},
+    'labs': {'lab_results': 3.0},
+    'laboratory': {'lab_results': 3.0},
+    'blood': {'lab_results': 1.5},
+    'bloods': {'lab_results': 3.0},
+    'blood test': {'lab_results': 3.0},
+    'blood tests': {'lab_results': 3.0},
+    'blood count': {'lab_results': 3.0},
+    'full blood count': {'lab_results': 3.0},
+    'blood sugar': {'lab_results': 3.0},
+    'blood glucose': {'lab_results': 3.0},
+    'blood film': {'lab_results': 3.0},
+    'fbc': {'lab_results': 3.0},
+    'uec': {'lab_results': 3.0},
+    'electrolytes': {'lab_results': 3.0},
+    'lfts': {'lab_results': 3.0},
+    'liver function': {'lab_results': 3.0},
+    'kidney function': {'lab_results': 3.0},
+    'renal function': {'lab_results': 3.0},
+    'thyroid function': {'lab_results': 3.0},
+    'crp': {'lab_results': 3.0},
+    'esr': {'lab_results': 3.0},
+    'glucose': {'lab_results': 2.5},
+    'hba1c': {'lab_results': 3.0},
+    'tsh': {'lab_results': 3.0},
+    'lipids': {'lab_results': 3.0},
+    'cholesterol': {'lab_results': 3.0},
+    'ferritin': {'lab_results': 3.0},
+    'iron studies': {'lab_results': 3.0},
+    'b12': {'lab_results': 3.0},
+    'folate': {'lab_results': 3.0},
+    'inr': {'lab_results': 3.0},
+    'troponin': {'lab_results': 3.0},
+    'psa': {'lab_results': 3.0},
+    'urinalysis': {'lab_results': 3.0},
+    'urine': {'lab_results': 2.5},
+    'dipstick': {'lab_results': 3.0},
+    'culture': {'lab_results': 2.5},
+    'swab': {'lab_results': 2.5},
+    'serology': {'lab_results': 3.0},
+    'pregnancy test': {'lab_results': 3.0},
+    'test': {'lab_results': 1.0},
+    'tests': {'lab_results': 1.0},
+    'investigation': {'lab_results': 1.0, 'imaging': 0.5},
+    'investigations': {'lab_results': 1.0, 'imaging': 0.5},
+    'result': {'lab_results': 0.5, 'general_findings': 0.5},
+    'results': {'lab_results': 0.5, 'general_findings': 0.75},
+
+    # Imaging
+    'x-ray': {'imaging': 3.0},
+    'xray': {'imaging': 3.0},
+    'x ray': {'imaging': 3.0},
+    'cxr': {'imaging': 3.0},
+    'ct': {'imaging': 3.0},
+    'mri': {'imaging': 3.0},
+    'scan': {'imaging': 2.5},
+    'scans': {'imaging': 2.5},
+    'imaging': {'imaging': 3.0},
+    'ultrasound': {'imaging': 3.0},
+    'ecg': {'imaging': 3.0},
+    'echo': {'imaging': 3.0},
+    'echocardiogram': {'imaging': 3.0},
+    'audiometry': {'imaging': 3.0},
+    'spirometry': {'imaging': 3.0},
+    'doppler': {'imaging': 3.0},
+
+    # Physical examination
+    'examine': {'physical_exam': 2.0},
+    'examining': {'physical_exam': 2.0},
+    'examination': {'physical_exam': 1.5},
+    'exam': {'physical_exam': 1.5},
+    'look at': {'physical_exam': 1.5},
+    'check': {'physical_exam': 0.75},
+    'inspect': {'physical_exam': 2.0},
+    'inspection': {'physical_exam': 2.0},
+    'observe': {'physical_exam': 1.5},
+    'palpate': {'physical_exam': 2.0},
+    'palpation': {'physical_exam': 2.0},
+    'auscultate': {'physical_exam': 2.0},
+    'auscultation': {'physical_exam': 2.0},
+    'listen to': {'physical_exam': 2.0},
+    'percuss': {'physical_exam': 2.0},
+    'percussion': {'physical_exam': 2.0},
+    'feel': {'physical_exam': 1.0},
+    'otoscopy': {'physical_exam': 2.5},
+    'fundoscopy': {'physical_exam': 2.5},
+    'reflexes': {'physical_exam': 2.0},
+
+    # General findings
+    'findings': {'general_findings': 1.0},
+    'what do you see': {'general_findings': 1.5},
+    'show me': {'general_findings': 1.0},
+    'anything else': {'general_findings': 1.0},
+}
+
+# Request keywords passed on to findings retrieval
+BODY_PARTS = ('head', 'neck', 'chest', 'abdomen', 'back', 'limbs', 'extremities',
+              'face', 'eyes', 'ears', 'nose', 'mouth', 'throat', 'heart', 'lungs')
+EXAM_TYPES = ('inspection', 'palpation', 'auscultation', 'percussion', 'examination')
+
+# Body parts also lean towards a physical examination
+for _part in BODY_PARTS:
+    TERM_WEIGHTS.setdefault(_part, {'physical_exam': 0.5})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_MAX_TERM_WORDS = 3
+
+# Separators between the parts of a compound request
+_SPLIT_RE = re.compile(r"[,;]|\b(?:and then|as well as|and|then|also|plus)\b", re.IGNORECASE)
+
+
+class RequestClassifier:
+    """Single-pass, table-driven classifier for examiner requests"""
+
+    def __init__(self, term_weights: Dict[str, Dict[str, float]] = None,
+                 request_types: Tuple[str, ...] = REQUEST_TYPES):
+        """
+        Compile the term weight table
+
+        Args:
+            term_weights: term -> {request_type: weight}
+            request_types: Request types in score-vector order
+        """
+        self.request_types = request_types
+        position = {request_type: i for i, request_type in enumerate(request_types)}
+        self._tie_rank = [TIE_BREAK_ORDER.index(t) if t in TIE_BREAK_ORDER else len(TIE_BREAK_ORDER)
+                          for t in request_types]
+
+        # term tuple -> weight vector aligned with request_types
+        self._vectors: Dict[Tuple[str, ...], Tuple[float, ...]] = {}
+        for term, weights in (term_weights or TERM_WEIGHTS).items():
+            vector = [0.0] * len(request_types)
+            for request_type, weight in weights.items():
+                vector[position[request_type]] = weight
+            self._vectors[tuple(_TOKEN_RE.findall(term))] = tuple(vector)
+
+        keyword_order = BODY_PARTS + EXAM_TYPES
+        self._keyword_rank = {keyword: i for i, keyword in enumerate(keyword_order)}
+
+        # Bare body parts only say *where*, not *what*, so a sub-request made of
+        # nothing else inherits the type of the sub-request before it
+        self._location_terms = {
+            (part,) for part in BODY_PARTS
+            if (term_weights or TERM_WEIGHTS).get(part) == {'physical_exam': 0.5}
+        }
+        self._body_parts = set(BODY_PARTS)
+
+    def _scan(self, request_text: str) -> Tuple[List[float], set, bool]:
+        """
+        Score a request against every request type in one pass
+
+        Returns:
+            Tuple of (scores, keywords, names_request) where names_request is
+            False when only bare body parts (or nothing) matched
+        """
+        tokens = _TOKEN_RE.findall(request_text.lower())
+        scores = [0.0] * len(self.request_types)
+        keywords = set()
+        names_request = False
+        vectors = self._vectors
+        keyword_rank = self._keyword_rank
+
+        i = 0
+        count = len(tokens)
+        while i < count:
+            token = tokens[i]
+            if token in keyword_rank:
+                keywords.add(token)
+            # Longest match first so multi-word terms win over their parts
+            for width in range(min(_MAX_TERM_WORDS, count - i), 0, -1):
+                term = tuple(tokens[i:i + width])
+                vector = vectors.get(term)
+                if vector is not None:
+                    scores = [a + b for a, b in zip(scores, vector)]
+                    if term not in self._location_terms:
+                        names_request = True
+                    for token_in_term in tokens[i + 1:i + width]:
+                        if token_in_term in keyword_rank:
+                            keywords.add(token_in_term)
+                    i += width
+                    break
+            else:
+                i += 1
+
+        return scores, keywords, names_request
+
+    def _pick(self, scores: List[float]) -> str:
+        best = max(scores)
+        if best <= 0:
+            return DEFAULT_REQUEST_TYPE
+        return min(
+            (rank, request_type)
+            for request_type, score, rank in zip(self.request_types, scores, self._tie_rank)
+            if score == best
+        )[1]
+
+    def _ordered(self, keywords) -> List[str]:
+        return sorted(keywords, key=self._keyword_rank.get)
+
+    def analyze(self, request_text: str) -> Tuple[str, List[str]]:
+        """
+        Classify a request and extract its keywords in one pass
+
+        Args:
+            request_text: Request text with the "Examiner" prefix removed
+
+        Returns:
+            Tuple of (request_type, keywords)
+        """
+        scores, keywords, _ = self._scan(request_text)
+        return self._pick(scores), self._ordered(keywords)
+
+    def _extends(self, sub_request: Dict[str, Any]) -> bool:
+        """Whether a bare body part continues this sub-request rather than asking for an examination"""
+        if sub_request['request_type'] == 'physical_exam':
+            return True
+        return sub_request['request_type'] == 'imaging' and not sub_request['keywords'].isdisjoint(self._body_parts)
+
+    def analyze_compound(self, request_text: str) -> List[Dict[str, Any]]:
+        """
+        Split a compound request into sub-requests and classify each one
+
+        Parts that match no term ("can I have", "please") are folded into the
+        neighbouring part, and parts of the same type are merged. A part that
+        is only a body part ("and the ears") extends a physical examination
+        before it, or imaging that already named a body part ("CT of the head
+        and neck"); otherwise it asks for an examination of its own ("the
+        vitals and the chest").
+
+        Args:
+            request_text: Request text with the "Examiner" prefix removed
+
+        Returns:
+            List of sub-requests in the order first asked, each with
+            'cleaned_request', 'request_type' and 'keywords'
+        """
+        sub_requests = []
+        by_type = {}
+        pending = []
+
+        for part in _SPLIT_RE.split(request_text):
+            part = part.strip()
+            if not part:
+                continue
+            scores, keywords, names_request = self._scan(part)
+            location_only = max(scores) > 0 and not names_request
+            if max(scores) <= 0 or (location_only and sub_requests and self._extends(sub_requests[-1])):
+                if sub_requests and not pending:
+                    target = sub_requests[-1]
+                    target['parts'].append(part)
+                    target['keywords'] |= keywords
+                else:
+                    pending.append(part)
+                continue
+
+            request_type = 'physical_exam' if location_only else self._pick(scores)
+            target = by_type.get(request_type)
+            if target is None:
+                target = {'request_type': request_type, 'parts': [], 'keywords': set()}
+                by_type[request_type] = target
+                sub_requests.append(target)
+            target['parts'].extend(pending + [part])
+            target['keywords'] |= keywords
+            pending = []
+
+        if not sub_requests:
+            request_type, keywords = self.analyze(request_text)
+            return [{'cleaned_request': request_text, 'request_type': request_type, 'keywords': keywords}]
+
+        if pending:
+            sub_requests[-1]['parts'].extend(pending)
+
+        return [
+            {
+                'cleaned_request': ', '.join(sub_request['parts']),
+                'request_type': sub_request['request_type'],
+                'keywords': self._ordered(sub_request['keywords']),
+            }
+            for sub_request in sub_requests
+        ]
+
+    def classify(self, request_text: str) -> str:
+        """Classify a request into one of REQUEST_TYPES"""
+        return self.analyze(request_text)[0]
+
+    def extract_keywords(self, request_text: str) -> List[str]:
+        """Extract body-part and examination-type keywords from a request"""
+        return self.analyze(request_text)[1]
+
+
+# Global classifier instance, compiled once per process
+request_classifier = RequestClassifier()
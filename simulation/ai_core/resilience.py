@@ -0,0 +1,345 @@
+"""
+Shared resilience layer for upstream AI dependencies
+
+The upstream calls made while serving a session go through resilient_call():
+patient replies (OpenAI chat), feedback RAG searches including their query
+embeddings (Pinecone and OpenAI embeddings) and speech synthesis (OpenAI TTS).
+It combines a per-dependency circuit breaker (opens on error rate, consecutive
+failures or slow calls, then probes in half-open state) with jittered
+exponential retries that are capped by a retry budget, so a degraded upstream
+fails fast instead of tying up workers.
+
+Not covered: the Pinecone index lookup when ai_config builds a vector store,
+and the offline scripts in pinecone_search/ and database/pdf_processing/.
+AIService, FeedbackAgent and ExaminerWorkflow build chat models but never
+call them; a new call site must be wrapped in resilient_call() itself.
+"""
+
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is short-circuited by an open breaker"""
+
+    def __init__(self, dependency: str, retry_in: float):
+        super().__init__(f"Circuit for {dependency} is open, retry in {retry_in:.1f}s")
+        self.dependency = dependency
+        self.retry_in = retry_in
+        self.retry_after = max(1, math.ceil(retry_in))  # Whole seconds, for Retry-After
+
+
+class RetryBudget:
+    """Caps retries to a fraction of recent requests"""
+
+    def __init__(self, ratio: float = 0.2, min_retries_per_second: float = 1.0, window_seconds: float = 10.0):
+        """
+        Initialize the retry budget
+
+        Args:
+            ratio: Retries allowed per request in the window
+            min_retries_per_second: Retry floor so low-traffic periods can still retry
+            window_seconds: Length of the sliding window
+        """
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.window_seconds = window_seconds
+        self._requests = deque()
+        self._retries = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._requests and self._requests[0] < cutoff:
+            self._requests.popleft()
+        while self._retries and self._retries[0] < cutoff:
+            self._retries.popleft()
+
+    def record_request(self):
+        """Record an initial (non-retry) attempt"""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            self._requests.append(now)
+
+    def try_acquire_retry(self) -> bool:
+        """Reserve a retry if the budget allows it"""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            allowed = self.min_retries_per_second * self.window_seconds + self.ratio * len(self._requests)
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+    def get_state(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            return {
+                'requests_in_window': len(self._requests),
+                'retries_in_window': len(self._retries),
+                'ratio': self.ratio,
+            }
+
+
+class CircuitBreaker:
+    """Circuit breaker with error-rate, consecutive-failure and slow-call thresholds"""
+
+    def __init__(self, name: str, failure_rate_threshold: float = 0.5, consecutive_failures: int = 5,
+                 slow_call_seconds: float = 20.0, slow_call_rate_threshold: float = 0.8,
+                 minimum_calls: int = 10, window_seconds: float = 30.0,
+                 open_seconds: float = 15.0, half_open_max_calls: int = 1):
+        """
+        Initialize the circuit breaker
+
+        Args:
+            name: Dependency name
+            failure_rate_threshold: Failure rate in the window that opens the circuit
+            consecutive_failures: Consecutive failures that open the circuit
+            slow_call_seconds: Calls slower than this count as slow
+            slow_call_rate_threshold: Slow-call rate in the window that opens the circuit
+            minimum_calls: Calls needed in the window before rates are evaluated
+            window_seconds: Length of the sliding window
+            open_seconds: Time to stay open before probing
+            half_open_max_calls: Concurrent probe calls allowed while half-open
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.consecutive_failures = consecutive_failures
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._consecutive = 0
+        self._calls = deque()  # (timestamp, failed, slow)
+        self._last_error = None
+        self._open_count = 0
+
+    def _trim(self, now: float):
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def _open(self, now: float):
+        self._state = OPEN
+        self._opened_at = now
+        self._half_open_in_flight = 0
+        self._open_count += 1
+
+    def allow_request(self):
+        """
+        Check whether a call may proceed
+
+        Raises:
+            CircuitOpenError: If the circuit is open or all half-open probes are taken
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN:
+                remaining = self.open_seconds - (now - self._opened_at)
+                if remaining > 0:
+                    raise CircuitOpenError(self.name, remaining)
+                self._state = HALF_OPEN
+                self._half_open_in_flight = 0
+            if self._state == HALF_OPEN:
+                if self._half_open_in_flight >= self.half_open_max_calls:
+                    raise CircuitOpenError(self.name, self.open_seconds)
+                self._half_open_in_flight += 1
+
+    def record_success(self, duration: float):
+        with self._lock:
+            now = time.monotonic()
+            slow = duration >= self.slow_call_seconds
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                if slow:
+                    self._open(now)
+                    return
+                self._state = CLOSED
+                self._calls.clear()
+            self._consecutive = 0
+            self._calls.append((now, False, slow))
+            self._evaluate(now)
+
+    def record_failure(self, duration: float, error: Optional[BaseException] = None):
+        with self._lock:
+            now = time.monotonic()
+            self._last_error = repr(error) if error is not None else None
+            if self._state == HALF_OPEN:
+                self._open(now)
+                return
+            self._consecutive += 1
+            self._calls.append((now, True, duration >= self.slow_call_seconds))
+            self._evaluate(now)
+
+    def record_ignored(self):
+        """Release a half-open probe slot for a call whose error says nothing about upstream health"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def _evaluate(self, now: float):
+        if self._state != CLOSED:
+            return
+        if self._consecutive >= self.consecutive_failures:
+            self._open(now)
+            return
+        self._trim(now)
+        total = len(self._calls)
+        if total < self.minimum_calls:
+            return
+        failures = sum(1 for _, failed, _ in self._calls if failed)
+        slow = sum(1 for _, _, is_slow in self._calls if is_slow)
+        if failures / total >= self.failure_rate_threshold or slow / total >= self.slow_call_rate_threshold:
+            self._open(now)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def get_state(self) -> Dict[str, Any]:
+        """Snapshot of breaker state for health reporting"""
+        state = self.state
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            total = len(self._calls)
+            failures = sum(1 for _, failed, _ in self._calls if failed)
+            slow = sum(1 for _, _, is_slow in self._calls if is_slow)
+            return {
+                'state': state,
+                'calls_in_window': total,
+                'failure_rate': round(failures / total, 3) if total else 0.0,
+                'slow_call_rate': round(slow / total, 3) if total else 0.0,
+                'consecutive_failures': self._consecutive,
+                'times_opened': self._open_count,
+                'open_remaining_seconds': round(max(0.0, self.open_seconds - (now - self._opened_at)), 1) if state == OPEN else 0.0,
+                'last_error': self._last_error,
+            }
+
+
+class Dependency:
+    """Resilience policy (breaker + retry budget + backoff) for one upstream"""
+
+    def __init__(self, name: str, max_retries: int = 2, base_delay: float = 0.25, max_delay: float = 4.0,
+                 breaker: Optional[CircuitBreaker] = None, budget: Optional[RetryBudget] = None):
+        self.name = name
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker(name)
+        self.budget = budget or RetryBudget()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (1-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def get_state(self) -> Dict[str, Any]:
+        state = self.breaker.get_state()
+        state['retry_budget'] = self.budget.get_state()
+        return state
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Client errors (other than timeouts, conflicts and rate limits) are not worth retrying"""
+    if isinstance(error, (CircuitOpenError, ValueError, TypeError, KeyError)):
+        return False
+    status = getattr(error, 'status_code', None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in (408, 409, 429):
+        return False
+    return True
+
+
+_dependencies: Dict[str, Dependency] = {}
+_dependencies_lock = threading.Lock()
+
+
+def get_dependency(name: str) -> Dependency:
+    """Get (or lazily create) the resilience policy for a dependency"""
+    with _dependencies_lock:
+        dependency = _dependencies.get(name)
+        if dependency is None:
+            dependency = Dependency(
+                name,
+                max_retries=int(os.getenv("RESILIENCE_MAX_RETRIES", "2")),
+                breaker=CircuitBreaker(
+                    name,
+                    slow_call_seconds=float(os.getenv("RESILIENCE_SLOW_CALL_SECONDS", "20")),
+                    open_seconds=float(os.getenv("RESILIENCE_OPEN_SECONDS", "15")),
+                ),
+            )
+            _dependencies[name] = dependency
+        return dependency
+
+
+def resilient_call(dependency_name: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Call an upstream dependency with circuit breaking and budgeted retries
+
+    Args:
+        dependency_name: Name of the upstream (e.g. 'openai', 'pinecone')
+        func: Callable performing the request
+        *args, **kwargs: Passed through to func
+
+    Returns:
+        Result of func
+
+    Raises:
+        CircuitOpenError: If the breaker is open
+        Exception: The last error from func once retries are exhausted
+    """
+    dependency = get_dependency(dependency_name)
+    dependency.budget.record_request()
+    attempt = 0
+
+    while True:
+        dependency.breaker.allow_request()
+        start = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if not is_retryable(e):
+                # Bad requests and cassette misses are the caller's problem, not an upstream outage
+                dependency.breaker.record_ignored()
+                raise
+            dependency.breaker.record_failure(time.monotonic() - start, e)
+            attempt += 1
+            if attempt > dependency.max_retries or not dependency.budget.try_acquire_retry():
+                raise
+            time.sleep(dependency.backoff(attempt))
+            continue
+        dependency.breaker.record_success(time.monotonic() - start)
+        return result
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Breaker and retry-budget state for every dependency seen so far"""
+    with _dependencies_lock:
+        dependencies = list(_dependencies.values())
+    return {dependency.name: dependency.get_state() for dependency in dependencies}
+
+
+# Register the known upstreams so they show up on the health endpoint before first use
+for _name in ('openai', 'openai_tts', 'pinecone'):
+    get_dependency(_name)
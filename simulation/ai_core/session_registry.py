@@ -0,0 +1,188 @@
+"""
+Thread-safe session registry for Clinical AI ExamPro
+
+Sessions are spread over a fixed number of lock stripes so that requests for
+different sessions never contend on a single global lock. Each session also
+owns a turn queue that serializes its turns and coalesces duplicate
+submissions (e.g. a double speech-recognition final plus a client retry).
+"""
+
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+class SessionNotFound(KeyError):
+    """Raised when a turn is submitted for a session that is not registered"""
+
+
+class TurnQueue:
+    """FIFO turn queue for a single session"""
+
+    def __init__(self, max_remembered_turns: int = 32):
+        """
+        Initialize the turn queue
+
+        Args:
+            max_remembered_turns: Number of completed turn ids kept for coalescing
+        """
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._now_serving = 0
+        self._in_flight = set()
+        self._completed = OrderedDict()
+        self._max_remembered_turns = max_remembered_turns
+        self.coalesced_count = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of turns currently running or waiting"""
+        with self._cond:
+            return self._next_ticket - self._now_serving
+
+    def knows(self, turn_id: str) -> bool:
+        """Whether a turn id is running or was completed recently, so a resubmission would be coalesced"""
+        with self._cond:
+            return turn_id in self._in_flight or turn_id in self._completed
+
+    def submit(self, func: Callable[[], Any], turn_id: Optional[str] = None) -> Tuple[Any, bool]:
+        """
+        Run a turn once every earlier turn for the session has finished
+
+        Args:
+            func: Callable that performs the turn
+            turn_id: Optional client-supplied id used to coalesce duplicates
+
+        Returns:
+            Tuple of (result, coalesced)
+            - result: The turn result, or the original result for a duplicate turn id
+            - coalesced: True if this submission was a duplicate and did not run
+
+        Only successful turns are remembered. A duplicate of a turn that failed
+        (e.g. a client retrying after a 503) runs the turn again.
+        """
+        with self._cond:
+            if turn_id is not None:
+                self._cond.wait_for(lambda: turn_id not in self._in_flight)
+                if turn_id in self._completed:
+                    self.coalesced_count += 1
+                    return self._completed[turn_id], True
+                self._in_flight.add(turn_id)
+
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self._cond.wait_for(lambda: self._now_serving == ticket)
+
+        succeeded = False
+        try:
+            result = func()
+            succeeded = True
+        finally:
+            with self._cond:
+                self._now_serving += 1
+                if turn_id is not None:
+                    self._in_flight.discard(turn_id)
+                    if succeeded:
+                        self._completed[turn_id] = result
+                        while len(self._completed) > self._max_remembered_turns:
+                            self._completed.popitem(last=False)
+                self._cond.notify_all()
+
+        return result, False
+
+
+class SessionRegistry:
+    """Dict-like store of active sessions guarded by striped locks"""
+
+    def __init__(self, stripes: int = 64):
+        """
+        Initialize the registry
+
+        Args:
+            stripes: Number of lock stripes (and backing shards)
+        """
+        self._stripes = stripes
+        self._locks = [threading.RLock() for _ in range(stripes)]
+        self._shards = [dict() for _ in range(stripes)]
+        self._turn_queues = [dict() for _ in range(stripes)]
+
+    def _stripe(self, session_id: str) -> int:
+        return zlib.crc32(str(session_id).encode('utf-8')) % self._stripes
+
+    def lock_for(self, session_id: str) -> threading.RLock:
+        """Get the stripe lock guarding a session"""
+        return self._locks[self._stripe(session_id)]
+
+    def __contains__(self, session_id: str) -> bool:
+        index = self._stripe(session_id)
+        with self._locks[index]:
+            return session_id in self._shards[index]
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        index = self._stripe(session_id)
+        with self._locks[index]:
+            return self._shards[index][session_id]
+
+    def __setitem__(self, session_id: str, session_data: Dict[str, Any]):
+        index = self._stripe(session_id)
+        with self._locks[index]:
+            self._shards[index][session_id] = session_data
+            self._turn_queues[index].setdefault(session_id, TurnQueue())
+
+    def __delitem__(self, session_id: str):
+        if self.pop(session_id, None) is None:
+            raise KeyError(session_id)
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._stripes):
+            with self._locks[index]:
+                session_ids = list(self._shards[index])
+            yield from session_ids
+
+    def get(self, session_id: str, default=None):
+        """Get session data or a default"""
+        index = self._stripe(session_id)
+        with self._locks[index]:
+            return self._shards[index].get(session_id, default)
+
+    def pop(self, session_id: str, default=None):
+        """Remove a session and return its data"""
+        index = self._stripe(session_id)
+        with self._locks[index]:
+            self._turn_queues[index].pop(session_id, None)
+            return self._shards[index].pop(session_id, default)
+
+    def turn_queue(self, session_id: str) -> Optional[TurnQueue]:
+        """Get the turn queue for a session, or None if it is not registered"""
+        index = self._stripe(session_id)
+        with self._locks[index]:
+            return self._turn_queues[index].get(session_id)
+
+    def run_turn(self, session_id: str, func: Callable[[], Any], turn_id: Optional[str] = None) -> Tuple[Any, bool]:
+        """
+        Run a turn for a session through its turn queue
+
+        Args:
+            session_id: Session identifier
+            func: Callable that performs the turn
+            turn_id: Optional client-supplied id used to coalesce duplicates
+
+        Returns:
+            Tuple of (result, coalesced) as returned by TurnQueue.submit
+
+        Raises:
+            SessionNotFound: If the session is not registered
+        """
+        queue = self.turn_queue(session_id)
+        if queue is None:
+            raise SessionNotFound(session_id)
+        return queue.submit(func, turn_id=turn_id)
+
+    def queue_depth(self, session_id: str) -> int:
+        """Number of turns running or waiting for a session"""
+        queue = self.turn_queue(session_id)
+        return queue.depth if queue else 0
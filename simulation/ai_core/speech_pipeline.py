@@ -0,0 +1,189 @@
+"""
+Sentence-pipelined speech for streamed patient replies
+
+Streamed patient text is cut at sentence boundaries. Each sentence is sent to
+TTS as soon as it is complete, while later sentences are still generating,
+and audio segments are released strictly in sentence order. The patient can
+start speaking about one sentence after the model starts generating instead
+of after generation plus full synthesis.
+"""
+
+import contextvars
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .tts import SpeechSynthesizer, get_synthesizer, DEFAULT_VOICE, DEFAULT_MODEL
+from .tts_cache import tts_cache, TTSAudioCache
+
+# Words that end in a full stop without ending the sentence
+_ABBREVIATIONS = {'dr', 'mr', 'mrs', 'ms', 'prof', 'st', 'e.g', 'i.e', 'etc', 'vs', 'approx'}
+# Abbreviations only when a number follows: "No. 5" but not "No. I don't smoke."
+_NUMBER_ABBREVIATIONS = {'no'}
+_BOUNDARY_RE = re.compile(r'[.!?]+["\')\]]*(?=\s)')
+
+
+class SentenceSplitter:
+    """Incrementally split streamed text into complete sentences"""
+
+    def __init__(self, min_chars: int = 1):
+        """
+        Initialize the splitter
+
+        Args:
+            min_chars: Sentences shorter than this are held and joined with the next one
+        """
+        self.min_chars = min_chars
+        self._buffer = ''
+
+    def feed(self, delta: str) -> List[str]:
+        """
+        Add streamed text and return any sentences it completed
+
+        Args:
+            delta: Next piece of streamed text
+
+        Returns:
+            Complete sentences, in order
+        """
+        self._buffer += delta
+        sentences = []
+        start = 0
+        for match in _BOUNDARY_RE.finditer(self._buffer):
+            end = match.end()
+            candidate = self._buffer[start:end].strip()
+            last_word = candidate.rstrip('.!?"\')]').rsplit(None, 1)[-1].lower() if candidate else ''
+            if self._buffer[match.start()] == '.' and last_word in _ABBREVIATIONS:
+                continue
+            if self._buffer[match.start()] == '.' and last_word in _NUMBER_ABBREVIATIONS:
+                following = self._buffer[end:].lstrip()
+                if not following:
+                    break  # Decided by the next word
+                if following[0].isdigit():
+                    continue
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = end
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text remains once the stream has ended"""
+        remainder = self._buffer.strip()
+        self._buffer = ''
+        return remainder or None
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("TTS_PIPELINE_WORKERS", "4")),
+                thread_name_prefix='tts-pipeline',
+            )
+        return _executor
+
+
+class SpeechPipeline:
+    """Turns a stream of text deltas into ordered sentence and audio events"""
+
+    def __init__(self, synthesizer: Optional[SpeechSynthesizer] = None, voice: str = DEFAULT_VOICE,
+                 model: str = DEFAULT_MODEL, cache: Optional[TTSAudioCache] = None,
+                 executor: Optional[ThreadPoolExecutor] = None, clean_sentence=None):
+        """
+        Initialize the pipeline
+
+        Args:
+            synthesizer: TTS backend (defaults to the configured one)
+            voice: Voice name
+            model: TTS model name
+            cache: TTS cache segments are read from and written to
+            executor: Thread pool running the TTS calls
+            clean_sentence: Optional callable applied to each sentence before it is emitted
+        """
+        self.synthesizer = synthesizer or get_synthesizer()
+        self.voice = voice
+        self.model = model
+        self.cache = cache or tts_cache
+        self.executor = executor or _get_executor()
+        self.clean_sentence = clean_sentence
+
+    def _synthesize(self, text: str) -> Dict[str, Any]:
+        audio_bytes, cache_status = self.cache.get_or_synthesize(
+            text, self.voice, self.model, self.synthesizer.format,
+            lambda: self.synthesizer.synthesize(text, voice=self.voice, model=self.model)
+        )
+        key = self.cache.make_key(text, self.voice, self.model, self.synthesizer.format)
+        return {
+            'name': f"{key}.{self.synthesizer.format}",
+            'mime': self.synthesizer.mime_type,
+            'data': audio_bytes,
+            'cache': cache_status,
+        }
+
+    def run(self, deltas: Iterable[str], speak: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        Consume text deltas and yield events as soon as they are available
+
+        Args:
+            deltas: Streamed text pieces
+            speak: Whether to synthesize audio for each sentence
+
+        Yields:
+            {'event': 'sentence', 'index', 'text'} as each sentence completes,
+            {'event': 'audio', 'index', 'name', 'mime', 'data', 'cache'} in sentence order
+            (or {'event': 'audio', 'index', 'error'} if synthesis failed)
+        """
+        splitter = SentenceSplitter()
+        pending: List[tuple] = []
+        index = 0
+
+        def sentences_from(texts):
+            nonlocal index
+            for text in texts:
+                if self.clean_sentence:
+                    text = self.clean_sentence(text)
+                if not text:
+                    continue
+                event = {'event': 'sentence', 'index': index, 'text': text}
+                if speak:
+                    # Copy the context so TTS spans keep the request's telemetry labels
+                    context = contextvars.copy_context()
+                    pending.append((index, self.executor.submit(context.run, self._synthesize, text)))
+                index += 1
+                yield event
+
+        def ready_audio(block: bool):
+            # Release audio strictly in order; only the head of the queue may be emitted
+            while pending and (block or pending[0][1].done()):
+                segment_index, future = pending.pop(0)
+                yield self._audio_event(segment_index, future)
+
+        try:
+            for delta in deltas:
+                yield from sentences_from(splitter.feed(delta))
+                yield from ready_audio(block=False)
+            remainder = splitter.flush()
+            yield from sentences_from([remainder] if remainder else [])
+            yield from ready_audio(block=True)
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _audio_event(index: int, future: Future) -> Dict[str, Any]:
+        try:
+            result = future.result()
+        except Exception as e:
+            return {'event': 'audio', 'index': index, 'error': str(e)}
+        if not result['data']:
+            return {'event': 'audio', 'index': index, 'error': 'No audio generated'}
+        return dict(result, event='audio', index=index)
@@ -0,0 +1,87 @@
+"""
+Signed session state tokens for Clinical AI ExamPro
+
+When STATE_TOKENS_ENABLED is set, every turn response carries a compact,
+signed and compressed snapshot of the conversation state: case id, turn
+counter, paused flag and the patient's memory window. A worker that has never
+seen the session (or has restarted) rebuilds it from the token, so turns can
+be served by any worker behind a plain round-robin balancer.
+
+Tokens are signed with SECRET_KEY, not encrypted; they hold nothing the
+student has not already seen. Replay protection comes from the turn counter,
+which the API checks against Session.current_turn with a compare-and-set.
+"""
+
+import os
+from typing import Any, Dict
+
+from django.core import signing
+
+STATE_TOKENS_ENABLED = os.getenv("STATE_TOKENS_ENABLED", "false").lower() in ('1', 'true', 'yes')
+STATE_TOKEN_MAX_AGE = int(os.getenv("STATE_TOKEN_MAX_AGE", str(24 * 60 * 60)))
+
+_SALT = 'simulation.ai_core.state_token'
+_VERSION = 1
+
+
+class StateTokenError(Exception):
+    """Raised when a state token is malformed, tampered with or expired"""
+
+
+class StaleStateToken(StateTokenError):
+    """Raised when a state token's turn has already been claimed or superseded"""
+
+
+def encode_state(state: Dict[str, Any]) -> str:
+    """
+    Sign and compress a session state snapshot
+
+    Args:
+        state: Dictionary with session_id, case_id, turn, patient_paused and
+            messages (a list of [role, text] pairs, role 'h' or 'a')
+
+    Returns:
+        URL-safe token string
+    """
+    payload = {
+        'v': _VERSION,
+        's': state['session_id'],
+        'c': state['case_id'],
+        't': state['turn'],
+        'p': 1 if state['patient_paused'] else 0,
+        'm': state['messages'],
+    }
+    return signing.dumps(payload, salt=_SALT, compress=True)
+
+
+def decode_state(token: str, max_age: int = STATE_TOKEN_MAX_AGE) -> Dict[str, Any]:
+    """
+    Verify and unpack a state token
+
+    Args:
+        token: Token from encode_state
+        max_age: Maximum token age in seconds
+
+    Returns:
+        The state dictionary passed to encode_state
+
+    Raises:
+        StateTokenError: If the token is invalid, expired or from an unsupported version
+    """
+    try:
+        payload = signing.loads(token, salt=_SALT, max_age=max_age)
+    except signing.SignatureExpired:
+        raise StateTokenError('State token has expired')
+    except signing.BadSignature:
+        raise StateTokenError('Invalid state token')
+
+    if not isinstance(payload, dict) or payload.get('v') != _VERSION:
+        raise StateTokenError('Unsupported state token version')
+
+    return {
+        'session_id': payload['s'],
+        'case_id': payload['c'],
+        'turn': payload['t'],
+        'patient_paused': bool(payload['p']),
+        'messages': payload['m'],
+    }
@@ -0,0 +1,239 @@
+"""
+Latency tracing and metrics for Clinical AI ExamPro
+
+Spans time named stages of a turn (LLM calls, examiner lookups, DB writes,
+RAG queries, TTS) and feed in-process histograms that are exported at
+/metrics in the Prometheus text format. Every span carries the endpoint and
+case labels bound for the current request, so latency can be broken down per
+endpoint and per case.
+
+Tracing is off unless METRICS_ENABLED is set. When off, span() and bind()
+return a shared no-op context manager and traced() calls straight through,
+so instrumented code pays one attribute check per call.
+"""
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Seconds; covers everything from cache lookups to feedback generation
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LABEL_NAMES = ('span', 'endpoint', 'case')
+
+_endpoint_var = contextvars.ContextVar('telemetry_endpoint', default='')
+_case_var = contextvars.ContextVar('telemetry_case', default='')
+
+
+class _NoopContext:
+    """Shared context manager used for every span and binding while tracing is off"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP = _NoopContext()
+
+
+class Histogram:
+    """Thread-safe labelled histogram with fixed buckets"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...],
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, label_values: Tuple[str, ...]):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = [0] * (len(self.buckets) + 2)
+                self._series[label_values] = series
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> Iterator[str]:
+        """Prometheus text exposition lines for this histogram"""
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = sorted((labels, list(series)) for labels, series in self._series.items())
+        for label_values, series in snapshot:
+            labels = _format_labels(self.label_names, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            cumulative += series[len(self.buckets)]
+            yield f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {series[-1]:.6f}"
+            yield f"{self.name}_count{{{labels}}} {cumulative}"
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """Thread-safe labelled counter"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, label_values: Tuple[str, ...], amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for label_values, value in snapshot:
+            yield f"{self.name}{{{_format_labels(self.label_names, label_values)}}} {value}"
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class Telemetry:
+    """Span recorder feeding the span latency histogram and error counter"""
+
+    def __init__(self, enabled: bool = False):
+        """
+        Initialize telemetry
+
+        Args:
+            enabled: Whether spans are recorded
+        """
+        self.enabled = enabled
+        self.span_seconds = Histogram(
+            'clinical_span_duration_seconds', 'Duration of traced spans in seconds', LABEL_NAMES
+        )
+        self.span_errors = Counter(
+            'clinical_span_errors_total', 'Traced spans that raised an exception', LABEL_NAMES
+        )
+
+    def _label_values(self, span_name: str) -> Tuple[str, str, str]:
+        return span_name, _endpoint_var.get(), _case_var.get()
+
+    def observe(self, span_name: str, seconds: float, error: bool = False):
+        """Record a span whose duration was measured elsewhere"""
+        if not self.enabled:
+            return
+        label_values = self._label_values(span_name)
+        self.span_seconds.observe(seconds, label_values)
+        if error:
+            self.span_errors.inc(label_values)
+
+    def span(self, span_name: str):
+        """
+        Time a block of code
+
+        Args:
+            span_name: Stage name, used as the `span` label
+
+        Returns:
+            Context manager (a shared no-op when tracing is off)
+        """
+        if not self.enabled:
+            return _NOOP
+        return self._span(span_name)
+
+    @contextmanager
+    def _span(self, span_name: str):
+        started_at = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(span_name, time.perf_counter() - started_at, error)
+
+    def traced(self, span_name: str) -> Callable:
+        """Decorator timing every call of a function as a span"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self._span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def bind(self, endpoint: Optional[str] = None, case: Optional[str] = None):
+        """
+        Set the endpoint and/or case labels for spans recorded inside the block
+
+        Bindings follow contextvars, so they apply to the current thread and
+        to work started with contextvars.copy_context().
+
+        Returns:
+            Context manager (a shared no-op when tracing is off)
+        """
+        if not self.enabled:
+            return _NOOP
+        return self._bind(endpoint, case)
+
+    @contextmanager
+    def _bind(self, endpoint: Optional[str], case: Optional[str]):
+        tokens = []
+        if endpoint is not None:
+            tokens.append((_endpoint_var, _endpoint_var.set(endpoint)))
+        if case is not None:
+            tokens.append((_case_var, _case_var.set(case)))
+        try:
+            yield
+        finally:
+            for var, token in reversed(tokens):
+                var.reset(token)
+
+    def current_labels(self) -> Dict[str, str]:
+        """Labels bound in the current context, for re-binding in another context"""
+        return {'endpoint': _endpoint_var.get(), 'case': _case_var.get()}
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = list(self.span_seconds.render())
+        lines.extend(self.span_errors.render())
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        self.span_seconds.reset()
+        self.span_errors.reset()
+
+
+# Global telemetry instance
+telemetry = Telemetry(enabled=os.getenv("METRICS_ENABLED", "false").lower() in ('1', 'true', 'yes'))
@@ -0,0 +1,236 @@
+"""
+Text-to-speech synthesizers for Clinical AI ExamPro
+
+OpenAISpeechSynthesizer is used in production. LocalSpeechSynthesizer is a
+deterministic, offline stand-in (a short tone per text) so audio pipelines can
+be exercised in development and tests without an API key. The 'fake' backend
+(fakes.FakeSpeechSynthesizer, the default with AI_PROVIDER=local) adds
+simulated latency and fault injection on top of it for load testing.
+"""
+
+import hashlib
+import io
+import math
+import os
+import struct
+import threading
+import time
+import wave
+from typing import Dict, Iterator, Optional
+
+from .resilience import resilient_call
+from .telemetry import telemetry
+from .usage import usage_ledger
+
+DEFAULT_VOICE = os.getenv("TTS_VOICE", "alloy")
+DEFAULT_MODEL = os.getenv("TTS_MODEL", "gpt-4o-mini-tts")
+
+
+def _openai_speech_bytes(client, model: str, voice: str, text: str) -> Optional[bytes]:
+    """Synthesize speech with OpenAI and return MP3 bytes (None if no bytes could be read)"""
+    # Prefer streaming when available; fall back to non-streaming
+    try:
+        with client.audio.speech.with_streaming_response.create(
+            model=model,
+            voice=voice,
+            input=text
+        ) as response:
+            return response.read()
+    except Exception:
+        result = client.audio.speech.create(
+            model=model,
+            voice=voice,
+            input=text
+        )
+        audio_bytes = None
+        if hasattr(result, 'read'):
+            try:
+                audio_bytes = result.read()
+            except Exception:
+                audio_bytes = None
+        if audio_bytes is None and hasattr(result, 'content'):
+            audio_bytes = result.content
+        if audio_bytes is None and hasattr(result, 'to_bytes'):
+            try:
+                audio_bytes = result.to_bytes()
+            except Exception:
+                audio_bytes = None
+        if audio_bytes is None and hasattr(result, 'getvalue'):
+            try:
+                audio_bytes = result.getvalue()
+            except Exception:
+                audio_bytes = None
+        return audio_bytes
+
+
+class SpeechSynthesizer:
+    """Base class for text-to-speech backends"""
+
+    name = 'base'
+    format = 'mp3'
+    mime_type = 'audio/mpeg'
+    # Formats stream() can produce, mapped to their MIME types
+    stream_formats = {'mp3': 'audio/mpeg'}
+
+    def available(self) -> bool:
+        """Whether the backend is configured and can be called"""
+        return True
+
+    def synthesize(self, text: str, voice: str = DEFAULT_VOICE, model: str = DEFAULT_MODEL) -> Optional[bytes]:
+        """
+        Synthesize speech for a text
+
+        Args:
+            text: Text to speak
+            voice: Voice name
+            model: TTS model name
+
+        Returns:
+            Encoded audio bytes, or None if the backend returned nothing
+        """
+        raise NotImplementedError
+
+    def stream(self, text: str, voice: str = DEFAULT_VOICE, model: str = DEFAULT_MODEL,
+               audio_format: Optional[str] = None, chunk_size: int = 4096) -> Iterator[bytes]:
+        """
+        Synthesize speech and yield encoded audio in chunks as it becomes available
+
+        Backends without native streaming synthesize the whole clip and then chunk it.
+
+        Args:
+            text: Text to speak
+            voice: Voice name
+            model: TTS model name
+            audio_format: One of stream_formats (defaults to the backend format)
+            chunk_size: Bytes per chunk
+
+        Yields:
+            Audio byte chunks
+        """
+        audio_bytes = self.synthesize(text, voice=voice, model=model) or b''
+        for start in range(0, len(audio_bytes), chunk_size):
+            yield audio_bytes[start:start + chunk_size]
+
+
+class OpenAISpeechSynthesizer(SpeechSynthesizer):
+    """OpenAI TTS behind the shared circuit breaker"""
+
+    name = 'openai'
+    stream_formats = {'mp3': 'audio/mpeg', 'opus': 'audio/ogg'}
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self._client = None
+
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    @property
+    def client(self):
+        if self._client is None:
+            from openai import OpenAI
+            # resilient_call is the only retry layer
+            self._client = OpenAI(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    @telemetry.traced('tts_synthesize')
+    def synthesize(self, text: str, voice: str = DEFAULT_VOICE, model: str = DEFAULT_MODEL) -> Optional[bytes]:
+        started_at = time.perf_counter()
+        audio_bytes = resilient_call('openai_tts', _openai_speech_bytes, self.client, model, voice, text)
+        usage_ledger.record('tts', model, audio_characters=len(text), latency_seconds=time.perf_counter() - started_at)
+        return audio_bytes
+
+    def stream(self, text: str, voice: str = DEFAULT_VOICE, model: str = DEFAULT_MODEL,
+               audio_format: Optional[str] = None, chunk_size: int = 4096) -> Iterator[bytes]:
+        manager = self.client.audio.speech.with_streaming_response.create(
+            model=model,
+            voice=voice,
+            input=text,
+            response_format=audio_format or self.format
+        )
+        # Only opening the stream goes through the breaker; chunks are relayed as they arrive
+        started_at = time.perf_counter()
+        with telemetry.span('tts_first_byte'):
+            response = resilient_call('openai_tts', manager.__enter__)
+        try:
+            for chunk in response.iter_bytes(chunk_size):
+                yield chunk
+        finally:
+            manager.__exit__(None, None, None)
+            usage_ledger.record('tts', model, audio_characters=len(text), latency_seconds=time.perf_counter() - started_at)
+
+
+class LocalSpeechSynthesizer(SpeechSynthesizer):
+    """Offline stand-in producing a short WAV tone whose pitch and length depend on the text"""
+
+    name = 'local'
+    format = 'wav'
+    mime_type = 'audio/wav'
+    stream_formats = {'wav': 'audio/wav'}
+
+    def __init__(self, sample_rate: int = 8000, seconds_per_char: float = 0.02, max_seconds: float = 8.0):
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.max_seconds = max_seconds
+
+    def synthesize(self, text: str, voice: str = DEFAULT_VOICE, model: str = DEFAULT_MODEL) -> Optional[bytes]:
+        seed = hashlib.sha256(f"{voice}\x00{model}\x00{text}".encode('utf-8')).digest()
+        frequency = 220 + seed[0] * 2
+        duration = min(self.max_seconds, max(0.2, len(text) * self.seconds_per_char))
+        frames = int(self.sample_rate * duration)
+
+        samples = bytearray()
+        for i in range(frames):
+            value = int(8000 * math.sin(2 * math.pi * frequency * i / self.sample_rate))
+            samples += struct.pack('<h', value)
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(bytes(samples))
+        return buffer.getvalue()
+
+
+def _fake_synthesizer() -> SpeechSynthesizer:
+    # Imported lazily: fakes builds on this module
+    from .fakes import FakeSpeechSynthesizer
+    return FakeSpeechSynthesizer()
+
+
+SYNTHESIZERS = {
+    'openai': OpenAISpeechSynthesizer,
+    'local': LocalSpeechSynthesizer,
+    'fake': _fake_synthesizer,
+}
+
+_synthesizers: Dict[str, SpeechSynthesizer] = {}
+_synthesizers_lock = threading.Lock()
+
+
+def get_synthesizer(name: Optional[str] = None) -> SpeechSynthesizer:
+    """
+    Get the shared synthesizer instance for a backend
+
+    Args:
+        name: Backend name ('openai', 'local' or 'fake'); defaults to TTS_SYNTHESIZER,
+            or 'fake' when AI_PROVIDER=local
+
+    Returns:
+        SpeechSynthesizer instance, wrapped for record/replay when AI_CASSETTE_MODE is set
+    """
+    default = 'fake' if os.getenv("AI_PROVIDER", "openai").lower() == 'local' else 'openai'
+    name = (name or os.getenv("TTS_SYNTHESIZER", default)).lower()
+    if name not in SYNTHESIZERS:
+        raise ValueError(f"Unknown TTS synthesizer: {name}")
+    with _synthesizers_lock:
+        synthesizer = _synthesizers.get(name)
+        if synthesizer is None:
+            synthesizer = SYNTHESIZERS[name]()
+            # Imported lazily: cassette builds on this module
+            from .cassette import cassette_store, CassetteSpeechSynthesizer
+            if cassette_store.enabled:
+                synthesizer = CassetteSpeechSynthesizer(synthesizer, cassette_store)
+            _synthesizers[name] = synthesizer
+        return synthesizer
@@ -0,0 +1,318 @@
+"""
+Disk-backed TTS audio cache for Clinical AI ExamPro
+
+Synthesized audio is stored under a content address derived from
+hash(text, voice, model, format), so repeated patient lines and stock phrases
+are synthesized once. The cache is capped by total bytes with least recently
+used eviction, and concurrent requests for the same audio are collapsed so
+only one of them calls the TTS backend (singleflight).
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .audio_store import atomic_write, PROJECT_ROOT
+
+_NAME_RE = re.compile(r'^[0-9a-f]{64}\.[a-z0-9]+$')
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one execution"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run func once per key among concurrent callers
+
+        Args:
+            key: Call key
+            func: Callable producing the result
+
+        Returns:
+            Tuple of (result, shared) where shared is True for callers that
+            waited on another caller's execution
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+
+class TTSAudioCache:
+    """Byte-capped LRU cache of synthesized audio files on local disk"""
+
+    def __init__(self, root: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the cache
+
+        Args:
+            root: Cache directory
+            max_bytes: Total size above which least recently used files are evicted
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Optional[OrderedDict] = None  # key -> (file name, size), loaded lazily
+        self._total_bytes = 0
+        self._singleflight = SingleFlight()
+        self._stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'evictions': 0, 'errors': 0}
+
+    @staticmethod
+    def make_key(text: str, voice: str, model: str, audio_format: str) -> str:
+        """Content address for a synthesis request"""
+        return hashlib.sha256(f"{text}\x00{voice}\x00{model}\x00{audio_format}".encode('utf-8')).hexdigest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name[:2], name)
+
+    def path_for(self, name: str) -> Optional[str]:
+        """Filesystem path of a cached file, or None if the name is invalid or not cached"""
+        if not _NAME_RE.match(name or ''):
+            return None
+        path = self._path(name)
+        return path if os.path.exists(path) else None
+
+    def _load(self):
+        """Index files already on disk, oldest access first (callers hold the lock)"""
+        if self._entries is not None:
+            return
+        found = []
+        if os.path.isdir(self.root):
+            for directory, _, files in os.walk(self.root):
+                for name in files:
+                    if name.startswith('.tmp-'):
+                        continue
+                    try:
+                        stat = os.stat(os.path.join(directory, name))
+                    except OSError:
+                        continue
+                    found.append((stat.st_mtime, name, stat.st_size))
+        found.sort()
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        for _, name, size in found:
+            self._entries[name.split('.')[0]] = (name, size)
+            self._total_bytes += size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached audio for a key (marking it recently used), or None"""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(entry[0])
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # mtime doubles as last-access time so LRU order survives restarts
+            os.utime(path, None)
+            return data
+        except OSError:
+            with self._lock:
+                if self._entries.pop(key, None):
+                    self._total_bytes -= entry[1]
+            return None
+
+    def put(self, key: str, data: bytes, audio_format: str):
+        """Store audio for a key and evict least recently used files over the byte cap"""
+        name = f"{key}.{audio_format}"
+        atomic_write(self._path(name), data)
+        self._register(key, name, len(data))
+
+    def _register(self, key: str, name: str, size: int):
+        """Record a newly written file and evict least recently used files over the byte cap"""
+        with self._lock:
+            self._load()
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._total_bytes -= previous[1]
+            self._entries[key] = (name, size)
+            self._total_bytes += size
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (old_name, old_size) = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                self._stats['evictions'] += 1
+                evicted.append(old_name)
+        for old_name in evicted:
+            try:
+                os.unlink(self._path(old_name))
+            except OSError:
+                pass
+
+    def _read_chunks(self, key: str, chunk_size: int) -> Optional[Iterator[bytes]]:
+        """Chunk iterator over a cached file (marking it recently used), or None"""
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+        path = self._path(entry[0])
+        try:
+            os.utime(path, None)
+        except OSError:
+            return None
+
+        # Opened on first iteration, so a response that is never consumed holds no file descriptor
+        def chunks():
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+        return chunks()
+
+    def _tee(self, key: str, audio_format: str, source: Iterator[bytes]) -> Iterator[bytes]:
+        """Relay chunks while writing them to a temporary file that is committed only when complete"""
+        name = f"{key}.{audio_format}"
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        size = 0
+        complete = False
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in source:
+                    f.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+            complete = size > 0
+        finally:
+            # Aborted or failed streams never leave partial audio in the cache
+            if complete:
+                os.replace(tmp_path, path)
+                self._register(key, name, size)
+            elif os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def stream_or_synthesize(self, text: str, voice: str, model: str, audio_format: str,
+                             stream: Callable[[], Iterator[bytes]],
+                             chunk_size: int = 4096) -> Tuple[Iterator[bytes], str]:
+        """
+        Stream cached audio, or relay a live synthesis stream while caching it
+
+        Streams are not collapsed across callers; a concurrent identical request
+        simply streams too, and whichever finishes last rewrites the same bytes.
+
+        Args:
+            text: Text to speak
+            voice: Voice name
+            model: TTS model name
+            audio_format: Audio format / file extension
+            stream: Callable returning the synthesis chunk iterator on a miss
+            chunk_size: Bytes per chunk when reading from the cache
+
+        Returns:
+            Tuple of (chunk iterator, status) where status is 'hit' or 'miss'
+        """
+        key = self.make_key(text, voice, model, audio_format)
+        chunks = self._read_chunks(key, chunk_size)
+        if chunks is not None:
+            self._count('hits')
+            return chunks, 'hit'
+        self._count('misses')
+        return self._tee(key, audio_format, stream()), 'miss'
+
+    def get_or_synthesize(self, text: str, voice: str, model: str, audio_format: str,
+                          synthesize: Callable[[], Optional[bytes]]) -> Tuple[Optional[bytes], str]:
+        """
+        Get cached audio or synthesize it once, collapsing concurrent identical requests
+
+        Args:
+            text: Text to speak
+            voice: Voice name
+            model: TTS model name
+            audio_format: Audio format / file extension
+            synthesize: Callable returning audio bytes on a miss
+
+        Returns:
+            Tuple of (audio bytes or None, status) where status is 'hit', 'miss' or 'coalesced'
+        """
+        key = self.make_key(text, voice, model, audio_format)
+        data = self.get(key)
+        if data is not None:
+            self._count('hits')
+            return data, 'hit'
+
+        def fill():
+            cached = self.get(key)
+            if cached is not None:
+                return cached, 'hit'
+            audio_bytes = synthesize()
+            if audio_bytes:
+                try:
+                    self.put(key, audio_bytes, audio_format)
+                except OSError as e:
+                    print(f"Error writing TTS cache entry: {e}")
+                    self._count('errors')
+            return audio_bytes, 'miss'
+
+        (data, status), shared = self._singleflight.do(key, fill)
+        status = 'coalesced' if shared else status
+        self._count({'hit': 'hits', 'miss': 'misses', 'coalesced': 'coalesced'}[status])
+        return data, status
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit-rate and size statistics"""
+        with self._lock:
+            self._load()
+            lookups = self._stats['hits'] + self._stats['misses'] + self._stats['coalesced']
+            stats = dict(self._stats)
+            stats.update({
+                'hit_rate': round((self._stats['hits'] + self._stats['coalesced']) / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            })
+            return stats
+
+
+# Global TTS cache instance
+tts_cache = TTSAudioCache(
+    os.getenv("TTS_CACHE_DIR", os.path.join(PROJECT_ROOT, 'media', 'tts_cache')),
+    max_bytes=int(os.getenv("TTS_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+)
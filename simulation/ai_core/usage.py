@@ -0,0 +1,421 @@
+"""
+Model usage accounting for Clinical AI ExamPro
+
+Every outbound model call (chat completions, embeddings, TTS) is recorded with
+its prompt, completion and cached tokens, audio characters and latency. Calls
+are attributed to the user, session, case and turn bound with
+usage_ledger.scope(), aggregated in memory into per-day counters for each of
+those scopes, and written to UsageCounter rows in batches by a background
+flusher rather than on every call.
+
+Costs come from a per-model price table (USD per million tokens or
+characters) that can be overridden with USAGE_PRICES_JSON. Monthly per-user
+budgets are read from UsageBudget, falling back to USAGE_MONTHLY_BUDGET_USD
+and USAGE_MONTHLY_TOKEN_BUDGET.
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+
+# USD per million units: prompt/cached/completion tokens, or characters for TTS
+DEFAULT_PRICES = {
+    'gpt-4o-mini-tts': {'characters': 12.0},
+    'gpt-4o-mini': {'prompt': 0.15, 'cached': 0.075, 'completion': 0.60},
+    'gpt-4o': {'prompt': 2.50, 'cached': 1.25, 'completion': 10.0},
+    'gpt-4': {'prompt': 30.0, 'cached': 30.0, 'completion': 60.0},
+    'text-embedding-3-small': {'prompt': 0.02},
+    'tts-1-hd': {'characters': 30.0},
+    'tts-1': {'characters': 15.0},
+}
+
+# Counter slots, in the order they are stored in memory and in UsageCounter
+FIELDS = ('calls', 'prompt_tokens', 'completion_tokens', 'cached_tokens',
+          'audio_characters', 'latency_ms', 'cost_usd')
+
+_scope_var = contextvars.ContextVar('usage_scope', default=None)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for providers that do not report usage (about four characters per token)"""
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+def _load_prices() -> Dict[str, Dict[str, float]]:
+    prices = dict(DEFAULT_PRICES)
+    override = os.getenv("USAGE_PRICES_JSON")
+    if override:
+        try:
+            prices.update(json.loads(override))
+        except ValueError as e:
+            print(f"Ignoring invalid USAGE_PRICES_JSON: {e}")
+    return prices
+
+
+def _optional_float(name: str) -> Optional[float]:
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+class UsageLedger:
+    """In-memory usage aggregation with batched writes to UsageCounter"""
+
+    def __init__(self, flush_interval: float = 5.0, flush_threshold: int = 500,
+                 prices: Optional[Dict[str, Dict[str, float]]] = None,
+                 default_cost_budget: Optional[float] = None,
+                 default_token_budget: Optional[float] = None,
+                 budget_cache_seconds: float = 30.0):
+        """
+        Initialize the ledger
+
+        Args:
+            flush_interval: Seconds between background flushes
+            flush_threshold: Pending calls that trigger an early flush
+            prices: Price table keyed by model name prefix
+            default_cost_budget: Monthly USD limit for users without a UsageBudget (None = unlimited)
+            default_token_budget: Monthly token limit for users without a UsageBudget (None = unlimited)
+            budget_cache_seconds: How long month-to-date totals and limits read from the database are reused
+        """
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.prices = prices if prices is not None else DEFAULT_PRICES
+        # Longest prefix first so 'gpt-4o-mini' wins over 'gpt-4o' and 'gpt-4'
+        self._price_keys = sorted(self.prices, key=len, reverse=True)
+        self.default_cost_budget = default_cost_budget
+        self.default_token_budget = default_token_budget
+        self.budget_cache_seconds = budget_cache_seconds
+
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str, date], List[float]] = {}
+        self._pending_calls = 0
+        self._session_totals: Dict[str, List[float]] = {}
+        self._month_cache: Dict[str, Tuple[float, Dict[str, float]]] = {}
+        self._limits_cache: Dict[int, Tuple[float, Dict[str, Optional[float]]]] = {}
+        self._wakeup = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._stats = {'recorded': 0, 'flushes': 0, 'rows_written': 0, 'flush_errors': 0}
+
+    @contextmanager
+    def scope(self, user_id: Optional[int] = None, session_id: Optional[str] = None,
+              case_id: Optional[str] = None, turn: Optional[int] = None):
+        """Attribute model calls made inside the block to a user, session, case and turn"""
+        token = _scope_var.set({'user': user_id, 'session': session_id, 'case': case_id, 'turn': turn})
+        try:
+            yield
+        finally:
+            _scope_var.reset(token)
+
+    def price_for(self, model: str) -> Dict[str, float]:
+        for key in self._price_keys:
+            if model and model.startswith(key):
+                return self.prices[key]
+        return {}
+
+    def cost(self, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+             cached_tokens: int = 0, audio_characters: int = 0) -> float:
+        """Cost in USD of a call"""
+        price = self.price_for(model)
+        uncached = max(0, prompt_tokens - cached_tokens)
+        return (
+            uncached * price.get('prompt', 0.0)
+            + cached_tokens * price.get('cached', price.get('prompt', 0.0))
+            + completion_tokens * price.get('completion', 0.0)
+            + audio_characters * price.get('characters', 0.0)
+        ) / 1_000_000
+
+    def record(self, kind: str, model: str, prompt_tokens: int = 0, completion_tokens: int = 0,
+               cached_tokens: int = 0, audio_characters: int = 0, latency_seconds: float = 0.0):
+        """
+        Record one outbound model call against the current scope
+
+        Args:
+            kind: 'llm', 'embedding' or 'tts'
+            model: Model name, used for pricing
+            prompt_tokens: Input tokens (including cached ones)
+            completion_tokens: Output tokens
+            cached_tokens: Input tokens served from the provider's prompt cache
+            audio_characters: Characters sent to TTS
+            latency_seconds: Wall time of the call
+        """
+        values = [
+            1, prompt_tokens, completion_tokens, cached_tokens, audio_characters,
+            int(latency_seconds * 1000),
+            self.cost(model, prompt_tokens, completion_tokens, cached_tokens, audio_characters),
+        ]
+        current = _scope_var.get() or {}
+        today = date.today()
+        keys = []
+        if current.get('session'):
+            if current.get('turn') is not None:
+                keys.append(('turn', f"{current['session']}:{current['turn']}", today))
+            keys.append(('session', current['session'], today))
+        if current.get('case'):
+            keys.append(('case', current['case'], today))
+        if current.get('user') is not None:
+            keys.append(('user', str(current['user']), today))
+
+        with self._lock:
+            self._stats['recorded'] += 1
+            for key in keys:
+                self._add(self._pending.setdefault(key, [0] * len(FIELDS)), values)
+            if current.get('session'):
+                self._add(self._session_totals.setdefault(current['session'], [0] * len(FIELDS)), values)
+            self._pending_calls += 1
+            flush_now = self._pending_calls >= self.flush_threshold
+
+        self._ensure_flusher()
+        if flush_now:
+            self._wakeup.set()
+
+    @staticmethod
+    def _add(counters: List[float], values: List[float]):
+        for i, value in enumerate(values):
+            counters[i] += value
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name='usage-ledger', daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """
+        Write pending counters to the database in one transaction
+
+        Returns:
+            Number of counter rows updated
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_calls = 0
+        if not pending:
+            return 0
+
+        from django.db import transaction
+        from django.db.models import F
+        from django.utils import timezone
+        from ..models import UsageCounter
+
+        try:
+            with transaction.atomic():
+                UsageCounter.objects.bulk_create(
+                    [UsageCounter(scope=scope, scope_key=key, day=day) for scope, key, day in pending],
+                    ignore_conflicts=True
+                )
+                now = timezone.now()
+                for (scope, key, day), counters in pending.items():
+                    updates = {field: F(field) + value for field, value in zip(FIELDS[:-1], counters[:-1])}
+                    updates['cost_usd'] = F('cost_usd') + Decimal(str(round(counters[-1], 6)))
+                    UsageCounter.objects.filter(scope=scope, scope_key=key, day=day).update(updated_at=now, **updates)
+        except Exception as e:
+            print(f"Error flushing usage ledger: {e}")
+            # Keep the counts for the next attempt
+            with self._lock:
+                self._stats['flush_errors'] += 1
+                for key, counters in pending.items():
+                    self._add(self._pending.setdefault(key, [0] * len(FIELDS)), counters)
+            return 0
+
+        with self._lock:
+            self._stats['flushes'] += 1
+            self._stats['rows_written'] += len(pending)
+            # Cached month-to-date totals predate these rows
+            for scope, key, _ in pending:
+                if scope == 'user':
+                    self._month_cache.pop(key, None)
+        return len(pending)
+
+    @staticmethod
+    def _as_dict(counters: List[float]) -> Dict[str, float]:
+        result = dict(zip(FIELDS, counters))
+        result['cost_usd'] = round(float(result['cost_usd']), 6)
+        return result
+
+    def session_totals(self, session_id: str) -> Dict[str, float]:
+        """Usage recorded for a session by this process"""
+        with self._lock:
+            counters = list(self._session_totals.get(session_id, [0] * len(FIELDS)))
+        return self._as_dict(counters)
+
+    def forget_session(self, session_id: str):
+        """Drop a finished session's in-memory totals (its counters stay in the database)"""
+        with self._lock:
+            self._session_totals.pop(session_id, None)
+
+    def month_to_date(self, user_id: int) -> Dict[str, float]:
+        """A user's usage this calendar month, including counts not yet flushed"""
+        key = str(user_id)
+        cached = self._month_cache.get(key)
+        if cached is None or time.monotonic() - cached[0] > self.budget_cache_seconds:
+            from django.db.models import Sum
+            from ..models import UsageCounter
+
+            month_start = date.today().replace(day=1)
+            totals = UsageCounter.objects.filter(
+                scope='user', scope_key=key, day__gte=month_start
+            ).aggregate(**{field: Sum(field) for field in FIELDS})
+            stored = {field: float(totals[field] or 0) for field in FIELDS}
+            self._month_cache[key] = (time.monotonic(), stored)
+        else:
+            stored = cached[1]
+
+        month_start = date.today().replace(day=1)
+        with self._lock:
+            unflushed = [0] * len(FIELDS)
+            for (scope, scope_key, day), counters in self._pending.items():
+                if scope == 'user' and scope_key == key and day >= month_start:
+                    self._add(unflushed, counters)
+        return self._as_dict([stored[field] + unflushed[i] for i, field in enumerate(FIELDS)])
+
+    def get_limits(self, user_id: int) -> Dict[str, Optional[float]]:
+        """Monthly cost and token limits for a user (a changed UsageBudget applies within budget_cache_seconds)"""
+        cached = self._limits_cache.get(user_id)
+        if cached is not None and time.monotonic() - cached[0] <= self.budget_cache_seconds:
+            return dict(cached[1])
+
+        from ..models import UsageBudget
+
+        budget = UsageBudget.objects.filter(user_id=user_id).first()
+        cost_limit = budget.monthly_cost_limit_usd if budget else None
+        token_limit = budget.monthly_token_limit if budget else None
+        limits = {
+            'monthly_cost_limit_usd': float(cost_limit) if cost_limit is not None else self.default_cost_budget,
+            'monthly_token_limit': token_limit if token_limit is not None else self.default_token_budget,
+        }
+        self._limits_cache[user_id] = (time.monotonic(), limits)
+        return dict(limits)
+
+    def check_budget(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Check a user's month-to-date usage against their limits
+
+        Args:
+            user_id: Django user id
+
+        Returns:
+            None if the user is within budget, otherwise a dictionary describing the exceeded limit
+        """
+        limits = self.get_limits(user_id)
+        if limits['monthly_cost_limit_usd'] is None and limits['monthly_token_limit'] is None:
+            return None
+
+        used = self.month_to_date(user_id)
+        tokens = used['prompt_tokens'] + used['completion_tokens']
+        if limits['monthly_cost_limit_usd'] is not None and used['cost_usd'] >= limits['monthly_cost_limit_usd']:
+            return {'limit': 'monthly_cost_limit_usd', 'used': used['cost_usd'], **limits}
+        if limits['monthly_token_limit'] is not None and tokens >= limits['monthly_token_limit']:
+            return {'limit': 'monthly_token_limit', 'used': tokens, **limits}
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pending_rows'] = len(self._pending)
+            stats['pending_calls'] = self._pending_calls
+            return stats
+
+
+def _extract_token_usage(response) -> Tuple[int, int, int]:
+    """(prompt, completion, cached) tokens from a LangChain LLMResult"""
+    token_usage = (response.llm_output or {}).get('token_usage') or {}
+    if token_usage:
+        details = token_usage.get('prompt_tokens_details') or {}
+        return (
+            token_usage.get('prompt_tokens', 0) or 0,
+            token_usage.get('completion_tokens', 0) or 0,
+            details.get('cached_tokens', 0) or 0,
+        )
+
+    # Streaming responses report usage on the message instead
+    prompt = completion = cached = 0
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None) or {}
+            prompt += usage.get('input_tokens', 0) or 0
+            completion += usage.get('output_tokens', 0) or 0
+            cached += (usage.get('input_token_details') or {}).get('cache_read', 0) or 0
+    return prompt, completion, cached
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """LangChain callback recording token usage and latency of every chat model call"""
+
+    run_inline = True
+
+    def __init__(self, model_name: str, ledger: Optional[UsageLedger] = None):
+        self.model_name = model_name
+        self.ledger = ledger
+        self._started: Dict[Any, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        started_at = self._started.pop(run_id, None)
+        latency = time.perf_counter() - started_at if started_at is not None else 0.0
+        prompt, completion, cached = _extract_token_usage(response)
+        model = (response.llm_output or {}).get('model_name') or self.model_name
+        (self.ledger or usage_ledger).record('llm', model, prompt, completion, cached, latency_seconds=latency)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._started.pop(run_id, None)
+
+
+class MeteredEmbeddings(Embeddings):
+    """Embeddings wrapper recording estimated token usage and latency (the API usage is not surfaced)"""
+
+    def __init__(self, embeddings: Embeddings, model_name: str, ledger: Optional[UsageLedger] = None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.ledger = ledger
+
+    def _record(self, texts: List[str], started_at: float):
+        tokens = sum(estimate_tokens(text) for text in texts)
+        (self.ledger or usage_ledger).record(
+            'embedding', self.model_name, prompt_tokens=tokens,
+            latency_seconds=time.perf_counter() - started_at
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        started_at = time.perf_counter()
+        vectors = self.embeddings.embed_documents(texts)
+        self._record(texts, started_at)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        started_at = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        self._record([text], started_at)
+        return vector
+
+
+# Global usage ledger instance
+usage_ledger = UsageLedger(
+    flush_interval=float(os.getenv("USAGE_FLUSH_INTERVAL", "5")),
+    flush_threshold=int(os.getenv("USAGE_FLUSH_THRESHOLD", "500")),
+    prices=_load_prices(),
+    default_cost_budget=_optional_float("USAGE_MONTHLY_BUDGET_USD"),
+    default_token_budget=_optional_float("USAGE_MONTHLY_TOKEN_BUDGET"),
+)
+atexit.register(usage_ledger.flush)
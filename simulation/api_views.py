@@ -6,8 +6,9 @@ including session management and real-time interactions.
 """
 
 import json
+import logging
 import uuid
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, FileResponse, Http404, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
@@ -15,14 +16,126 @@ from django.utils.decorators import method_decorator
 from django.views import View
 from django.shortcuts import get_object_or_404
 
-from .models import Case, Session, Feedback, AIAgentState
+from .models import Case, Session, Feedback, AIAgentState, UsageCounter
 from .ai_core.ai_service import ai_service
 from .db_utils import MedicalCasesQuery
 from django.views.decorators.http import require_POST
-from openai import OpenAI
 import base64
 import os
+import time
+from functools import wraps
 from .ai_core.config import ai_config
+from .ai_core.admission import admission_controller, AdmissionRejected
+from .ai_core.resilience import CircuitOpenError, get_breaker_states
+from .ai_core.examiner_cache import examiner_cache
+from .ai_core.tts import get_synthesizer, DEFAULT_VOICE, DEFAULT_MODEL
+from .ai_core.audio_store import audio_store
+from .ai_core.tts_cache import tts_cache
+from .ai_core.state_token import STATE_TOKENS_ENABLED, StateTokenError, StaleStateToken, encode_state, decode_state
+from .ai_core.telemetry import telemetry
+from .ai_core.usage import usage_ledger
+from .ai_core.cassette import cassette_store
+from django.db import connection
+from django.db.models import F, Sum
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+
+class _UsageScopedIterator:
+    """Wraps a streaming body so the model calls it makes are attributed to the view's usage scope"""
+    
+    def __init__(self, iterable, scope):
+        self._iterator = iter(iterable)
+        self._scope = scope
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        # Entered per chunk, since the server may pull each chunk in a different context
+        with self._scope():
+            return next(self._iterator)
+    
+    def close(self):
+        if hasattr(self._iterator, 'close'):
+            with self._scope():
+                self._iterator.close()
+
+
+class _SlotReleasingIterator:
+    """Wraps a streaming body so its admission slot is released once the stream ends or is closed"""
+    
+    def __init__(self, iterable, endpoint, started_at):
+        self._iterator = iter(iterable)
+        self._endpoint = endpoint
+        self._started_at = started_at
+        self._released = False
+        # The body is consumed after the view returns, so carry its telemetry labels along
+        self._labels = telemetry.current_labels()
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self):
+        try:
+            with telemetry.bind(**self._labels):
+                return next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+    
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        elapsed = time.monotonic() - self._started_at
+        try:
+            if hasattr(self._iterator, 'close'):
+                self._iterator.close()
+        finally:
+            admission_controller.release(self._endpoint, elapsed)
+            with telemetry.bind(**self._labels):
+                telemetry.observe('request', elapsed)
+
+
+def admission_controlled(endpoint):
+    """Run a view inside an admission slot; reject with 503 and Retry-After when overloaded"""
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            try:
+                admission_controller.acquire(endpoint)
+            except AdmissionRejected as e:
+                response = JsonResponse({
+                    'error': 'Server is busy, please retry shortly',
+                    'reason': e.reason,
+                    'retry_after': e.retry_after
+                }, status=503)
+                response['Retry-After'] = str(e.retry_after)
+                return response
+            
+            started_at = time.monotonic()
+            with telemetry.bind(endpoint=endpoint):
+                try:
+                    response = view_func(request, *args, **kwargs)
+                except BaseException:
+                    elapsed = time.monotonic() - started_at
+                    admission_controller.release(endpoint, elapsed)
+                    telemetry.observe('request', elapsed, error=True)
+                    raise
+                
+                if getattr(response, 'streaming', False):
+                    # Streaming bodies keep the upstream busy, so hold the slot until they finish
+                    response.streaming_content = _SlotReleasingIterator(response.streaming_content, endpoint, started_at)
+                else:
+                    elapsed = time.monotonic() - started_at
+                    admission_controller.release(endpoint, elapsed)
+                    telemetry.observe('request', elapsed, error=response.status_code >= 500)
+            return response
+        return _wrapped_view
+    return decorator
+
 
 @method_decorator(csrf_exempt, name='dispatch')
 @method_decorator(login_required, name='dispatch')
@@ -37,6 +150,10 @@ class StartSessionView(View):
             if not case_id:
                 return JsonResponse({'error': 'case_id is required'}, status=400)
             
+            budget_response = _budget_exceeded_response(request.user)
+            if budget_response:
+                return budget_response
+            
             # Get case data from database
             db_query = MedicalCasesQuery()
             case_data = db_query.get_case_with_content(case_id)
@@ -62,66 +179,361 @@ class StartSessionView(View):
                 patient_persona=case_data.get('instructions_for_patient', '')
             )
             
-            return JsonResponse({
+            result = {
                 'success': True,
                 'session_id': session_id,
                 'case_id': case_id,
                 'message': 'Session started successfully'
-            })
+            }
+            if STATE_TOKENS_ENABLED:
+                result['state_token'] = _issue_state_token(session_id)
+            return JsonResponse(result)
             
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
 
+@telemetry.traced('db_write')
+def _record_turn(session_id, user_input, response):
+    """Append a completed turn to the session transcript and update the agent state"""
+    try:
+        session_obj = Session.objects.get(session_id=session_id)
+        session_obj.add_to_transcript('Doctor', user_input)
+        
+        if response['type'] == 'patient_response':
+            session_obj.add_to_transcript('Patient', response['response'])
+        elif response['type'] == 'examiner_response':
+            session_obj.add_to_transcript('Examiner', response['response'])
+        
+        # Update AI agent state
+        ai_state = AIAgentState.objects.get(session=session_obj)
+        ai_state.patient_paused = response.get('patient_paused', False)
+        ai_state.usage = usage_ledger.session_totals(session_id)
+        ai_state.save()
+        
+    except Session.DoesNotExist:
+        pass  # Continue even if session record not found
+
+def _upstream_unavailable_response(error):
+    """503 with Retry-After for a call short-circuited by an open circuit breaker"""
+    response = JsonResponse({'error': str(error), 'retry_after': error.retry_after}, status=503)
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+def _budget_exceeded_response(user):
+    """402 response if the user has used up their monthly model budget, otherwise None"""
+    exceeded = usage_ledger.check_budget(user.id)
+    if exceeded is None:
+        return None
+    return JsonResponse({'error': 'Usage budget exceeded', **exceeded}, status=402)
+
+def _issue_state_token(session_id):
+    """Signed state token for a session loaded on this worker, or None"""
+    state = ai_service.export_state(session_id)
+    return encode_state(state) if state else None
+
+def _stale_state_token_response(user, session_id):
+    """409 for a replayed or superseded state token, with the latest token if this worker holds it"""
+    result = {'error': 'State token is stale or has already been used'}
+    # Let the owner resynchronise if this worker holds the latest state (e.g. a reply lost in transit)
+    latest_turn = Session.objects.filter(
+        session_id=session_id, user=user, is_active=True
+    ).values_list('current_turn', flat=True).first()
+    if latest_turn is not None and ai_service.get_turn(session_id) == latest_turn:
+        result['state_token'] = _issue_state_token(session_id)
+    return JsonResponse(result, status=409)
+
+def _continue_from_state_token(request, session_id, token, turn_id=None):
+    """
+    Load a session from its state token
+    
+    The token's turn must match Session.current_turn. A token that has moved on
+    is still accepted for a turn_id this worker is running or has just
+    completed, so the retry is coalesced with the original reply instead of
+    being rejected. The session is rebuilt from the token when this worker
+    does not have it, or has a different copy.
+    
+    Args:
+        request: Django request (its user must own the session)
+        session_id: Session identifier
+        token: State token from the previous response
+        turn_id: Optional client-supplied turn identifier
+        
+    Returns:
+        Tuple of (state, error_response); exactly one of them is None
+    """
+    try:
+        state = decode_state(token)
+    except StateTokenError as e:
+        return None, JsonResponse({'error': str(e)}, status=400)
+    
+    if state['session_id'] != session_id:
+        return None, JsonResponse({'error': 'State token does not belong to this session'}, status=400)
+    
+    current = Session.objects.filter(
+        session_id=session_id, user=request.user, is_active=True, current_turn=state['turn']
+    ).exists()
+    if not current:
+        if turn_id and ai_service.knows_turn(session_id, turn_id):
+            return state, None
+        return None, _stale_state_token_response(request.user, session_id)
+    
+    if ai_service.get_turn(session_id) != state['turn']:
+        db_query = MedicalCasesQuery()
+        case_data = db_query.get_case_with_content(state['case_id'])
+        db_query.close()
+        
+        if not case_data:
+            return None, JsonResponse({'error': 'Case not found'}, status=404)
+        
+        ai_service.restore_session(request.user, case_data, state)
+    return state, None
+
+def _turn_claim(user, session_id, turn, close_connection=False):
+    """
+    Claim callable for ai_service that spends a state token's turn
+    
+    Claiming advances Session.current_turn with a compare-and-set, so each
+    token serves exactly one turn and replayed or superseded tokens are
+    rejected. It runs inside the turn slot, after turn_id coalescing, and the
+    returned undo puts the counter back if the turn fails so the client can
+    retry with the same token.
+    
+    Args:
+        user: Owner of the session
+        session_id: Session identifier
+        turn: Turn number from the state token
+        close_connection: Close the database connection after claiming and
+            undoing, for claims made on a streamed turn's worker thread
+        
+    Returns:
+        Callable that claims the turn and returns its undo callable
+        
+    Raises:
+        StaleStateToken: From the claim, if the turn was already claimed
+    """
+    def claim():
+        matched = Session.objects.filter(
+            session_id=session_id, user=user, is_active=True, current_turn=turn
+        ).update(current_turn=F('current_turn') + 1)
+        if not matched:
+            if close_connection:
+                connection.close()
+            raise StaleStateToken('State token is stale or has already been used')
+        ai_service.set_turn(session_id, turn + 1)
+        return undo
+    
+    def undo():
+        try:
+            Session.objects.filter(
+                session_id=session_id, user=user, current_turn=turn + 1
+            ).update(current_turn=turn)
+            ai_service.set_turn(session_id, turn)
+        finally:
+            if close_connection:
+                connection.close()
+    
+    return claim
+
 @method_decorator(csrf_exempt, name='dispatch')
 @method_decorator(login_required, name='dispatch')
+@method_decorator(admission_controlled('interact'), name='post')
 class InteractView(View):
-    """API endpoint for user interactions during a session"""
+    """
+    API endpoint for user interactions during a session
+    
+    Returns JSON by default. With {"stream": "sse"} in the body (or an
+    Accept: text/event-stream header) the turn is streamed as server-sent
+    events: `text` per patient sentence, `audio` base64 chunks per sentence in
+    order, then `done` with the usual response fields.
+    
+    With STATE_TOKENS_ENABLED, requests carry the `state_token` from the
+    previous response and every response returns the next one.
+    """
     
     def post(self, request):
         try:
             data = json.loads(request.body)
             session_id = data.get('session_id')
             user_input = data.get('user_input')
+            turn_id = data.get('turn_id')
             
             if not session_id or not user_input:
                 return JsonResponse({'error': 'session_id and user_input are required'}, status=400)
             
-            # Process input through AI service
-            response = ai_service.process_user_input(session_id, user_input)
+            budget_response = _budget_exceeded_response(request.user)
+            if budget_response:
+                return budget_response
+            
+            use_state_token = STATE_TOKENS_ENABLED and bool(data.get('state_token'))
+            streamed = data.get('stream') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+            claim = None
+            if use_state_token:
+                state, error_response = _continue_from_state_token(request, session_id, data['state_token'], turn_id)
+                if error_response:
+                    return error_response
+                claim = _turn_claim(request.user, session_id, state['turn'], close_connection=streamed)
+            
+            # SSE mode: reply text and its audio come back on this one response
+            if streamed:
+                if session_id not in ai_service.active_sessions:
+                    return JsonResponse({'error': 'Session not found'}, status=404)
+                events, error_response = _start_turn_events(
+                    request, session_id, user_input, turn_id, use_state_token, claim
+                )
+                if error_response:
+                    return error_response
+                response = StreamingHttpResponse(_interact_sse_stream(events), content_type='text/event-stream')
+                response['Cache-Control'] = 'no-store'
+                response['X-Accel-Buffering'] = 'no'
+                return response
+            
+            # Process input through AI service (serialized per session)
+            try:
+                response = ai_service.process_user_input(session_id, user_input, turn_id=turn_id, claim=claim)
+            except CircuitOpenError as e:
+                return _upstream_unavailable_response(e)
+            except StaleStateToken:
+                return _stale_state_token_response(request.user, session_id)
             
             if 'error' in response:
                 return JsonResponse(response, status=404)
             
-            # Update session transcript
-            try:
-                session_obj = Session.objects.get(session_id=session_id)
-                session_obj.add_to_transcript('Doctor', user_input)
-                
-                if response['type'] == 'patient_response':
-                    session_obj.add_to_transcript('Patient', response['response'])
-                elif response['type'] == 'examiner_response':
-                    session_obj.add_to_transcript('Examiner', response['response'])
-                
-                # Update AI agent state
-                ai_state = AIAgentState.objects.get(session=session_obj)
-                ai_state.patient_paused = response.get('patient_paused', False)
-                ai_state.save()
-                
-            except Session.DoesNotExist:
-                pass  # Continue even if session record not found
+            # A coalesced duplicate was already recorded by the original request
+            if not response.get('duplicate'):
+                _record_turn(session_id, user_input, response)
             
-            return JsonResponse({
+            result = {
                 'success': True,
                 'response': response['response'],
                 'type': response['type'],
-                'patient_paused': response.get('patient_paused', False)
-            })
+                'patient_paused': response.get('patient_paused', False),
+                'sections': response.get('sections', [])
+            }
+            if response.get('duplicate'):
+                result['duplicate'] = True
+            if use_state_token:
+                result['state_token'] = _issue_state_token(session_id)
+            return JsonResponse(result)
             
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
 
+AUDIO_CHUNK_BYTES = 16 * 1024
+
+def turn_events(session_id, user_input, turn_id, state_token=False, claim=None):
+    """Events for a streamed turn; the turn's worker records it even if the client goes away"""
+    def record(result):
+        try:
+            _record_turn(session_id, user_input, result)
+        except Exception as e:
+            print(f"Error recording streamed turn: {e}")
+        finally:
+            connection.close()  # The turn's worker thread exits after this turn
+    
+    speak = get_synthesizer().available()
+    for event in ai_service.stream_user_input(session_id, user_input, turn_id=turn_id, speak=speak,
+                                              on_done=record, claim=claim):
+        if event['event'] == 'done' and state_token and 'error' not in event:
+            event['state_token'] = _issue_state_token(session_id)
+        yield event
+
+def _start_turn_events(request, session_id, user_input, turn_id, state_token=False, claim=None):
+    """
+    Start a streamed turn and read its first event before responding
+    
+    An open circuit breaker or a stale state token is only reported once the
+    turn runs, so this is what lets a streamed turn still answer 503 with
+    Retry-After, or 409.
+    
+    Returns:
+        Tuple of (events, error_response); exactly one of them is None
+    """
+    events = turn_events(session_id, user_input, turn_id, state_token, claim)
+    first_event = next(events)
+    if first_event['event'] == 'error' and first_event.get('stale_state_token'):
+        events.close()
+        return None, _stale_state_token_response(request.user, session_id)
+    if first_event['event'] == 'error' and 'retry_after' in first_event:
+        events.close()
+        response = JsonResponse({'error': first_event['error'], 'retry_after': first_event['retry_after']}, status=503)
+        response['Retry-After'] = str(first_event['retry_after'])
+        return None, response
+    return _relay_chunks(first_event, events), None
+
+def _sse(event_name, payload):
+    return f"event: {event_name}\ndata: {json.dumps(payload)}\n\n"
+
+def audio_chunk_payloads(event):
+    """Split a synthesized audio event into base64 chunk payloads; the last one is marked final"""
+    data = event['data']
+    for start in range(0, len(data), AUDIO_CHUNK_BYTES):
+        yield {
+            'index': event['index'],
+            'mime': event['mime'],
+            'chunk': base64.b64encode(data[start:start + AUDIO_CHUNK_BYTES]).decode('ascii'),
+            'final': start + AUDIO_CHUNK_BYTES >= len(data)
+        }
+
+def _interact_sse_stream(events):
+    """Server-sent events for a streamed turn with audio inlined as base64 chunks"""
+    for event in events:
+        kind = event.pop('event')
+        if kind == 'sentence':
+            yield _sse('text', event)
+        elif kind == 'audio' and 'data' in event:
+            for payload in audio_chunk_payloads(event):
+                yield _sse('audio', payload)
+        else:
+            yield _sse(kind, event)
+
+def end_session_with_feedback(session_id):
+    """End an AI session, generate feedback and save it against the session record"""
+    result = ai_service.end_session(session_id)
+    
+    if 'error' in result:
+        return result
+    
+    # Save feedback to database
+    try:
+        with telemetry.span('db_write'):
+            _save_feedback(session_id, result)
+    except Session.DoesNotExist:
+        pass  # Continue even if session record not found
+    
+    return result
+
+def _save_feedback(session_id, result):
+    """Mark the session record inactive and store its feedback"""
+    session_obj = Session.objects.get(session_id=session_id)
+    session_obj.is_active = False
+    session_obj.save()
+    
+    # Create feedback record
+    Feedback.objects.create(
+        session=session_obj,
+        overall_score=result['feedback']['overall_score'],
+        pass_fail=result['feedback']['pass_fail'],
+        what_went_well=result['feedback']['what_went_well'],
+        areas_for_improvement=result['feedback']['areas_for_improvement'],
+        specific_recommendations=result['feedback']['specific_recommendations'],
+        key_points_covered=result['feedback']['key_points_covered'],
+        key_points_missed=result['feedback']['key_points_missed'],
+        compliance_analysis=result['feedback']['compliance_analysis'],
+        rag_sources=result['feedback']['rag_sources'],
+        generation_time_seconds=result['feedback']['generation_time_seconds']
+    )
+    
+    # Update AI agent state
+    ai_state = AIAgentState.objects.get(session=session_obj)
+    ai_state.feedback_generated = True
+    ai_state.rag_queries_used = result['feedback']['rag_sources']
+    ai_state.usage = usage_ledger.session_totals(session_id)
+    ai_state.save()
+    usage_ledger.forget_session(session_id)
+
 @method_decorator(csrf_exempt, name='dispatch')
 @method_decorator(login_required, name='dispatch')
+@method_decorator(admission_controlled('end_session'), name='post')
 class EndSessionView(View):
     """API endpoint to end a session and generate feedback"""
     
@@ -133,42 +545,17 @@ class EndSessionView(View):
             if not session_id:
                 return JsonResponse({'error': 'session_id is required'}, status=400)
             
+            if STATE_TOKENS_ENABLED and data.get('state_token'):
+                _, error_response = _continue_from_state_token(request, session_id, data['state_token'])
+                if error_response:
+                    return error_response
+            
             # End session and generate feedback
-            result = ai_service.end_session(session_id)
+            result = end_session_with_feedback(session_id)
             
             if 'error' in result:
                 return JsonResponse(result, status=404)
             
-            # Save feedback to database
-            try:
-                session_obj = Session.objects.get(session_id=session_id)
-                session_obj.is_active = False
-                session_obj.save()
-                
-                # Create feedback record
-                feedback_obj = Feedback.objects.create(
-                    session=session_obj,
-                    overall_score=result['feedback']['overall_score'],
-                    pass_fail=result['feedback']['pass_fail'],
-                    what_went_well=result['feedback']['what_went_well'],
-                    areas_for_improvement=result['feedback']['areas_for_improvement'],
-                    specific_recommendations=result['feedback']['specific_recommendations'],
-                    key_points_covered=result['feedback']['key_points_covered'],
-                    key_points_missed=result['feedback']['key_points_missed'],
-                    compliance_analysis=result['feedback']['compliance_analysis'],
-                    rag_sources=result['feedback']['rag_sources'],
-                    generation_time_seconds=result['feedback']['generation_time_seconds']
-                )
-                
-                # Update AI agent state
-                ai_state = AIAgentState.objects.get(session=session_obj)
-                ai_state.feedback_generated = True
-                ai_state.rag_queries_used = result['feedback']['rag_sources']
-                ai_state.save()
-                
-            except Session.DoesNotExist:
-                pass  # Continue even if session record not found
-            
             return JsonResponse({
                 'success': True,
                 'session_id': session_id,
@@ -211,15 +598,24 @@ class ResumePatientView(View):
             if not session_id:
                 return JsonResponse({'error': 'session_id is required'}, status=400)
             
+            use_state_token = STATE_TOKENS_ENABLED and bool(data.get('state_token'))
+            if use_state_token:
+                _, error_response = _continue_from_state_token(request, session_id, data['state_token'])
+                if error_response:
+                    return error_response
+            
             success = ai_service.resume_patient(session_id)
             
             if not success:
                 return JsonResponse({'error': 'Session not found'}, status=404)
             
-            return JsonResponse({
+            result = {
                 'success': True,
                 'message': 'Patient agent resumed'
-            })
+            }
+            if use_state_token:
+                result['state_token'] = _issue_state_token(session_id)
+            return JsonResponse(result)
             
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
@@ -300,61 +696,292 @@ class SessionHistoryView(View):
 
 @method_decorator(csrf_exempt, name='dispatch')
 @method_decorator(login_required, name='dispatch')
+@method_decorator(admission_controlled('tts'), name='post')
 class TextToSpeechView(View):
-    """Generate TTS audio from text using OpenAI and return as base64 MP3"""
+    """Generate TTS audio from text (OpenAI by default) and return it base64 encoded"""
     def post(self, request):
         try:
             data = json.loads(request.body)
             text = data.get('text', '').strip()
-            voice = data.get('voice', 'alloy')
-            model = data.get('model', 'gpt-4o-mini-tts')
+            voice = data.get('voice', DEFAULT_VOICE)
+            model = data.get('model', DEFAULT_MODEL)
             if not text:
                 return JsonResponse({'error': 'text is required'}, status=400)
 
-            api_key = ai_config.openai_api_key or os.environ.get('OPENAI_API_KEY')
-            if not api_key:
+            # Synthesis is billed per character
+            budget_response = _budget_exceeded_response(request.user)
+            if budget_response:
+                return budget_response
+
+            synthesizer = get_synthesizer()
+            if not synthesizer.available():
                 return JsonResponse({'error': 'OPENAI_API_KEY not configured'}, status=500)
 
-            client = OpenAI(api_key=api_key)
-            # Prefer streaming when available; fall back to non-streaming
             try:
-                with client.audio.speech.with_streaming_response.create(
-                    model=model,
-                    voice=voice,
-                    input=text
-                ) as response:
-                    audio_bytes = response.read()
-            except Exception:
-                result = client.audio.speech.create(
-                    model=model,
-                    voice=voice,
-                    input=text
-                )
-                audio_bytes = None
-                if hasattr(result, 'read'):
-                    try:
-                        audio_bytes = result.read()
-                    except Exception:
-                        audio_bytes = None
-                if audio_bytes is None and hasattr(result, 'content'):
-                    audio_bytes = result.content
-                if audio_bytes is None and hasattr(result, 'to_bytes'):
-                    try:
-                        audio_bytes = result.to_bytes()
-                    except Exception:
-                        audio_bytes = None
-                if audio_bytes is None and hasattr(result, 'getvalue'):
-                    try:
-                        audio_bytes = result.getvalue()
-                    except Exception:
-                        audio_bytes = None
-                if audio_bytes is None:
-                    return JsonResponse({'error': 'Failed to generate audio bytes (non-streaming path)'}, status=500)
+                # Repeated lines are served from the disk cache; identical concurrent requests share one synthesis
+                with _tts_usage_scope(request.user, data.get('session_id')):
+                    audio_bytes, cache_status = tts_cache.get_or_synthesize(
+                        text, voice, model, synthesizer.format,
+                        lambda: synthesizer.synthesize(text, voice=voice, model=model)
+                    )
+            except CircuitOpenError as e:
+                return _upstream_unavailable_response(e)
+            if audio_bytes is None:
+                return JsonResponse({'error': 'Failed to generate audio bytes (non-streaming path)'}, status=500)
             audio_b64 = base64.b64encode(audio_bytes).decode('utf-8')
 
-            return JsonResponse({'success': True, 'audio_base64': audio_b64, 'mime': 'audio/mpeg'})
+            response = JsonResponse({'success': True, 'audio_base64': audio_b64, 'mime': synthesizer.mime_type})
+            response['X-TTS-Cache'] = 'miss' if cache_status == 'miss' else 'hit'
+            return response
         except Exception as e:
-            import traceback
-            print('TTS ERROR:', e)
-            print(traceback.format_exc())
+            logger.exception('Text-to-speech request failed')
             return JsonResponse({'error': str(e), 'type': e.__class__.__name__}, status=500)
+
+def _tts_usage_scope(user, session_id):
+    """Usage scope for a TTS request; the session is only credited if it is the user's own and loaded here"""
+    session_data = ai_service.active_sessions.get(session_id) if session_id else None
+    if session_data is None or getattr(session_data['user'], 'id', None) != user.id:
+        return usage_ledger.scope(user_id=user.id)
+    return usage_ledger.scope(
+        user_id=user.id, session_id=session_id, case_id=session_data['case_data'].get('case_id')
+    )
+
+def _relay_chunks(first_chunk, chunks):
+    """Yield an already-read first chunk followed by the rest, closing the source when done"""
+    try:
+        yield first_chunk
+        yield from chunks
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+@method_decorator(csrf_exempt, name='dispatch')
+@method_decorator(login_required, name='dispatch')
+@method_decorator(admission_controlled('tts'), name='post')
+class TextToSpeechStreamView(View):
+    """Stream TTS audio as raw binary chunks so playback can start on the first chunk"""
+    
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            text = data.get('text', '').strip()
+            voice = data.get('voice', DEFAULT_VOICE)
+            model = data.get('model', DEFAULT_MODEL)
+            if not text:
+                return JsonResponse({'error': 'text is required'}, status=400)
+            
+            # Synthesis is billed per character
+            budget_response = _budget_exceeded_response(request.user)
+            if budget_response:
+                return budget_response
+            
+            synthesizer = get_synthesizer()
+            if not synthesizer.available():
+                return JsonResponse({'error': 'OPENAI_API_KEY not configured'}, status=500)
+            
+            audio_format = data.get('format', synthesizer.format)
+            if audio_format not in synthesizer.stream_formats:
+                return JsonResponse({
+                    'error': f'format must be one of: {", ".join(synthesizer.stream_formats)}'
+                }, status=400)
+            
+            chunks, cache_status = tts_cache.stream_or_synthesize(
+                text, voice, model, audio_format,
+                lambda: synthesizer.stream(text, voice=voice, model=model, audio_format=audio_format)
+            )
+            # Synthesis is billed as the body is consumed, after this view has returned
+            session_id = data.get('session_id')
+            chunks = _UsageScopedIterator(chunks, lambda: _tts_usage_scope(request.user, session_id))
+            
+            # Pull the first chunk before responding so upstream failures still get a proper status
+            try:
+                first_chunk = next(chunks)
+            except CircuitOpenError as e:
+                return _upstream_unavailable_response(e)
+            except StopIteration:
+                return JsonResponse({'error': 'Failed to generate audio'}, status=500)
+            
+            response = StreamingHttpResponse(
+                _relay_chunks(first_chunk, chunks),
+                content_type=synthesizer.stream_formats[audio_format]
+            )
+            response['X-TTS-Cache'] = cache_status
+            response['Cache-Control'] = 'no-store'
+            return response
+        except Exception as e:
+            logger.exception('Streaming text-to-speech request failed')
+            return JsonResponse({'error': str(e), 'type': e.__class__.__name__}, status=500)
+
+def _parse_range(range_header, size):
+    """Parse a single "bytes=start-end" range; returns (start, end) inclusive, or None if unsatisfiable"""
+    units, _, spec = range_header.partition('=')
+    if units.strip() != 'bytes' or ',' in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition('-')
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(0, size - int(end_text))
+            end = size - 1
+    except ValueError:
+        return None
+    end = min(end, size - 1)
+    if start > end or start >= size:
+        return None
+    return start, end
+
+def ranged_file_response(request, path, content_type, cache_control, etag):
+    """Serve a file with single-range support, an ETag and the given Cache-Control"""
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        size = os.path.getsize(path)
+        range_header = request.headers.get('Range')
+        if range_header:
+            byte_range = _parse_range(range_header, size)
+            if byte_range is None:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+            start, end = byte_range
+            with open(path, 'rb') as f:
+                f.seek(start)
+                response = HttpResponse(f.read(end - start + 1), status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    return response
+
+@method_decorator(login_required, name='dispatch')
+class FindingsAudioView(View):
+    """Serve pre-rendered, content-addressed audio with range support and far-future caching"""
+    
+    def get(self, request, name):
+        path = audio_store.path_for(name)
+        if path is None:
+            raise Http404('Audio not found')
+        # File names are content hashes, so the bytes behind a URL never change
+        return ranged_file_response(
+            request, path, audio_store.mime_type(name),
+            cache_control='private, max-age=31536000, immutable',
+            etag=f'"{name.split(".")[0]}"'
+        )
+
+@method_decorator(login_required, name='dispatch')
+class UsageView(View):
+    """
+    API endpoint reporting model usage and cost
+    
+    Returns the user's month-to-date totals against their limits and the
+    totals of their most recent sessions. Staff may pass ?user_id= to look at
+    another user, and also get per-case totals for the month.
+    """
+    
+    def get(self, request):
+        try:
+            user_id = request.user.id
+            if request.GET.get('user_id'):
+                if not request.user.is_staff:
+                    return JsonResponse({'error': 'Only staff can view other users'}, status=403)
+                try:
+                    user_id = int(request.GET['user_id'])
+                except ValueError:
+                    return JsonResponse({'error': 'user_id must be an integer'}, status=400)
+            
+            month_to_date = usage_ledger.month_to_date(user_id)
+            limits = usage_ledger.get_limits(user_id)
+            tokens = month_to_date['prompt_tokens'] + month_to_date['completion_tokens']
+            remaining = {
+                'cost_usd': None if limits['monthly_cost_limit_usd'] is None
+                    else max(0.0, round(limits['monthly_cost_limit_usd'] - month_to_date['cost_usd'], 6)),
+                'tokens': None if limits['monthly_token_limit'] is None
+                    else max(0, limits['monthly_token_limit'] - tokens)
+            }
+            
+            # Live sessions are read from memory, finished ones from their agent state
+            sessions = []
+            recent = AIAgentState.objects.filter(session__user_id=user_id).select_related(
+                'session', 'session__case'
+            ).order_by('-session__started_at')[:20]
+            for ai_state in recent:
+                session_id = ai_state.session.session_id
+                totals = usage_ledger.session_totals(session_id)
+                sessions.append({
+                    'session_id': session_id,
+                    'case_id': ai_state.session.case.case_id,
+                    'started_at': ai_state.session.started_at.isoformat(),
+                    'usage': totals if totals['calls'] else ai_state.usage
+                })
+            
+            result = {
+                'success': True,
+                'user_id': user_id,
+                'month_to_date': month_to_date,
+                'limits': limits,
+                'remaining': remaining,
+                'sessions': sessions
+            }
+            
+            if request.user.is_staff:
+                month_start = date.today().replace(day=1)
+                result['cases'] = [
+                    {'case_id': row['scope_key'], 'calls': row['calls'], 'cost_usd': float(row['cost_usd'])}
+                    for row in UsageCounter.objects.filter(scope='case', day__gte=month_start)
+                    .values('scope_key').annotate(calls=Sum('calls'), cost_usd=Sum('cost_usd'))
+                    .order_by('-cost_usd')
+                ]
+            
+            return JsonResponse(result)
+            
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+
+class AdmissionMetricsView(View):
+    """API endpoint exposing admission control and queue metrics (staff only)"""
+    
+    def get(self, request):
+        if not request.user.is_staff:
+            return JsonResponse({'error': 'Only staff can view admission metrics'}, status=403)
+        return JsonResponse({
+            'success': True,
+            'admission': admission_controller.get_metrics()
+        })
+
+class MetricsView(View):
+    """Span latency histograms in the Prometheus text exposition format"""
+    
+    def get(self, request):
+        if not telemetry.enabled:
+            return JsonResponse({'error': 'Metrics are disabled'}, status=404)
+        return HttpResponse(telemetry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+class HealthView(View):
+    """
+    API endpoint reporting service health
+    
+    Anyone (e.g. a load balancer) gets the overall status. Staff also get
+    circuit breaker state, admission load, cache, usage-ledger and cassette
+    statistics, which include upstream error messages and file paths.
+    """
+    
+    def get(self, request):
+        breakers = get_breaker_states()
+        degraded = any(state['state'] != 'closed' for state in breakers.values())
+        status = 'degraded' if degraded else 'ok'
+        if not request.user.is_staff:
+            return JsonResponse({'status': status})
+        return JsonResponse({
+            'status': status,
+            'breakers': breakers,
+            'admission': admission_controller.get_metrics(),
+            'examiner_cache': examiner_cache.get_stats(),
+            'tts_cache': tts_cache.get_stats(),
+            'usage_ledger': usage_ledger.get_stats(),
+            'cassette': cassette_store.stats()
+        })
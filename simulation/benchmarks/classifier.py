@@ -0,0 +1,75 @@
+"""
+Accuracy and latency benchmark for the examiner request classifier
+"""
+
+import re
+import time
+from typing import Dict, Any, List, Tuple
+
+from simulation.ai_core.request_classifier import request_classifier, RequestClassifier
+from .examiner_utterances import COMPOUND_UTTERANCES, LABELED_UTTERANCES
+
+_EXAMINER_PREFIX_RE = re.compile(r'^\s*examiner\s*:?\s*', re.IGNORECASE)
+
+
+def run_classifier_benchmark(classifier: RequestClassifier = None,
+                             utterances: List[Tuple[str, str]] = None,
+                             repeat: int = 200) -> Dict[str, Any]:
+    """
+    Measure classifier accuracy on the labeled set and time per request
+
+    Args:
+        classifier: Classifier to benchmark (defaults to the process-wide one)
+        utterances: (utterance, expected request type) pairs
+        repeat: Timing passes over the whole set
+
+    Returns:
+        Dictionary with accuracy, per-type accuracy, misclassifications,
+        compound-request accuracy and timing
+    """
+    classifier = classifier or request_classifier
+    utterances = utterances or LABELED_UTTERANCES
+    requests = [(_EXAMINER_PREFIX_RE.sub('', text).strip(), expected) for text, expected in utterances]
+
+    correct = 0
+    per_type = {}
+    misclassified = []
+    for (text, expected), (original, _) in zip(requests, utterances):
+        predicted = classifier.classify(text)
+        bucket = per_type.setdefault(expected, {'correct': 0, 'total': 0})
+        bucket['total'] += 1
+        if predicted == expected:
+            correct += 1
+            bucket['correct'] += 1
+        else:
+            misclassified.append({'utterance': original, 'expected': expected, 'predicted': predicted})
+
+    compound_correct = 0
+    compound_missplit = []
+    for original, expected in COMPOUND_UTTERANCES:
+        text = _EXAMINER_PREFIX_RE.sub('', original).strip()
+        predicted = [(sub['request_type'], sub['keywords']) for sub in classifier.analyze_compound(text)]
+        if predicted == expected:
+            compound_correct += 1
+        else:
+            compound_missplit.append({'utterance': original, 'expected': expected, 'predicted': predicted})
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text, _ in requests:
+            classifier.analyze(text)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'utterances': len(requests),
+        'accuracy': round(correct / len(requests), 4) if requests else 0.0,
+        'per_type_accuracy': {
+            request_type: round(bucket['correct'] / bucket['total'], 4)
+            for request_type, bucket in sorted(per_type.items())
+        },
+        'misclassified': misclassified,
+        'compound_utterances': len(COMPOUND_UTTERANCES),
+        'compound_accuracy': round(compound_correct / len(COMPOUND_UTTERANCES), 4),
+        'compound_missplit': compound_missplit,
+        'microseconds_per_request': round(elapsed / (repeat * len(requests)) * 1e6, 2) if requests else 0.0,
+    }
@@ -0,0 +1,101 @@
+"""
+Labeled examiner utterances for the request classifier benchmark
+
+Each entry is (utterance, expected request type). Utterances are written the
+way candidates actually address the examiner, including the "Examiner" prefix
+and the speech-recognition habit of dropping punctuation.
+
+COMPOUND_UTTERANCES pairs compound requests with the sub-requests they should
+split into, as (request type, keywords) in the order asked.
+"""
+
+LABELED_UTTERANCES = [
+    # Vital signs
+    ("Examiner, can I have the vital signs please", 'vital_signs'),
+    ("Examiner: what is the blood pressure", 'vital_signs'),
+    ("Examiner I would like to check the blood pressure", 'vital_signs'),
+    ("Examiner, what's her pulse and temperature?", 'vital_signs'),
+    ("Examiner may I have the heart rate", 'vital_signs'),
+    ("Examiner, could I get a set of obs", 'vital_signs'),
+    ("Examiner what are the observations", 'vital_signs'),
+    ("Examiner, can you tell me his BP", 'vital_signs'),
+    ("Examiner what is the respiratory rate and oxygen saturation", 'vital_signs'),
+    ("Examiner can I have her height weight and BMI", 'vital_signs'),
+    ("Examiner, I'd like to check her vitals", 'vital_signs'),
+    ("Examiner, what are the sats on room air", 'vital_signs'),
+
+    # Laboratory results
+    ("Examiner, can I have the blood test results", 'lab_results'),
+    ("Examiner I would like a full blood count", 'lab_results'),
+    ("Examiner, what do the bloods show", 'lab_results'),
+    ("Examiner may I see the lab results", 'lab_results'),
+    ("Examiner, can I have the FBC and CRP", 'lab_results'),
+    ("Examiner what is the urinalysis", 'lab_results'),
+    ("Examiner, I'd like to do a urine dipstick", 'lab_results'),
+    ("Examiner, are there any iron studies", 'lab_results'),
+    ("Examiner what were the liver function tests", 'lab_results'),
+    ("Examiner can I get the thyroid function and HbA1c", 'lab_results'),
+    ("Examiner, what is the blood sugar level", 'lab_results'),
+    ("Examiner, has a pregnancy test been done", 'lab_results'),
+    ("Examiner I would like to order some blood tests", 'lab_results'),
+
+    # Imaging
+    ("Examiner, can I see the chest x-ray", 'imaging'),
+    ("Examiner I would like a CT scan of the head", 'imaging'),
+    ("Examiner, are there any imaging results", 'imaging'),
+    ("Examiner, can I have an ECG", 'imaging'),
+    ("Examiner what does the MRI show", 'imaging'),
+    ("Examiner, is there an ultrasound of the abdomen", 'imaging'),
+    ("Examiner may I see the CXR", 'imaging'),
+    ("Examiner what did the audiometry show", 'imaging'),
+    ("Examiner, I'd like to request an x ray of the knee", 'imaging'),
+    ("Examiner, has an echo been done", 'imaging'),
+
+    # Physical examination
+    ("Examiner, I would like to examine the chest", 'physical_exam'),
+    ("Examiner: I'd like to examine the face", 'physical_exam'),
+    ("Examiner, may I look at the skin", 'physical_exam'),
+    ("Examiner I would like to palpate the abdomen", 'physical_exam'),
+    ("Examiner, can I auscultate the heart", 'physical_exam'),
+    ("Examiner I'd like to listen to the lungs", 'physical_exam'),
+    ("Examiner, I'll inspect the hands", 'physical_exam'),
+    ("Examiner, I would like to do an ear examination with otoscopy", 'physical_exam'),
+    ("Examiner, can I examine the back", 'physical_exam'),
+    ("Examiner I want to percuss the chest", 'physical_exam'),
+    ("Examiner, I'd like to check the reflexes", 'physical_exam'),
+    ("Examiner, I will examine the neck and throat", 'physical_exam'),
+    ("Examiner, I'd like to look in the eyes with fundoscopy", 'physical_exam'),
+    ("Examiner, could I examine the patient", 'physical_exam'),
+
+    # General findings
+    ("Examiner, what are the findings", 'general_findings'),
+    ("Examiner show me what you have", 'general_findings'),
+    ("Examiner, what do you see", 'general_findings'),
+    ("Examiner, is there anything else I should know", 'general_findings'),
+    ("Examiner", 'general_findings'),
+    ("Examiner, what are the results", 'general_findings'),
+    ("Examiner, can you tell me more", 'general_findings'),
+]
+
+COMPOUND_UTTERANCES = [
+    ("Examiner, can I have the vitals, a chest exam and a full blood count",
+     [('vital_signs', []), ('physical_exam', ['chest']), ('lab_results', [])]),
+    ("Examiner I would like to examine the chest and the abdomen",
+     [('physical_exam', ['chest', 'abdomen'])]),
+    ("Examiner, I'll look in the ears and the throat",
+     [('physical_exam', ['ears', 'throat'])]),
+    ("Examiner, can I have the vitals and the chest and abdomen",
+     [('vital_signs', []), ('physical_exam', ['chest', 'abdomen'])]),
+    ("Examiner, what is the heart rate and heart sounds",
+     [('vital_signs', ['heart']), ('physical_exam', ['heart'])]),
+    ("Examiner, can I have the bloods and the ears please",
+     [('lab_results', []), ('physical_exam', ['ears'])]),
+    ("Examiner, I'd like an ECG and the chest",
+     [('imaging', []), ('physical_exam', ['chest'])]),
+    ("Examiner I would like a CT scan of the head and neck",
+     [('imaging', ['head', 'neck'])]),
+    ("Examiner, the BP and then listen to the heart",
+     [('vital_signs', []), ('physical_exam', ['heart'])]),
+    ("Examiner, can I have the FBC and CRP",
+     [('lab_results', [])]),
+]
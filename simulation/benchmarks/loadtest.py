@@ -0,0 +1,417 @@
+"""
+Concurrent load test for the simulation API
+
+Simulates candidates sitting stations at the same time. Each candidate logs
+in, starts a session, replays a transcript of doctor utterances (examiner
+requests included) with think time between turns, optionally fetches TTS for
+patient replies, and ends the session to get feedback. Requests go through
+the real endpoints, either in this process via Django's test client or over
+HTTP against a running server.
+
+The report gives throughput, per-endpoint latency percentiles, error rates and
+status codes, and server RSS sampled over the run.
+"""
+
+import asyncio
+import http.cookiejar
+import json
+import math
+import os
+import random
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Scripted station used when no transcripts are given
+DEFAULT_SCRIPT = [
+    "Hello, I'm Dr. Smith. How are you feeling today?",
+    "Can you tell me what brought you in today?",
+    "How long have you been experiencing these symptoms?",
+    "Have you noticed anything that makes it better or worse?",
+    "Examiner: I would like to examine the patient's vital signs",
+    "Are you taking any medications?",
+    "Do you have any allergies?",
+    "Examiner: I would like to do a general examination",
+    "Is there any family history of similar problems?",
+    "Thank you for coming in today. We'll get you feeling better soon.",
+]
+
+INTERACT_MODES = {
+    'json': '/api/interact/',
+    'sse': '/api/interact/',
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """Resident set size of a process (this one by default), or None if it cannot be read"""
+    try:
+        with open(f"/proc/{pid or os.getpid()}/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if pid in (None, os.getpid()):
+        try:
+            import resource
+            # Peak rather than current RSS, which is all getrusage offers (kilobytes on Linux)
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        except (ImportError, OSError):
+            pass
+    return None
+
+
+def recorded_scripts(limit: int) -> List[List[str]]:
+    """Doctor utterances from the transcripts of the most recent finished sessions"""
+    from simulation.models import Session
+
+    scripts = []
+    sessions = Session.objects.filter(is_active=False).exclude(transcript='').order_by('-started_at')[:limit]
+    for session in sessions:
+        lines = [line[len('Doctor: '):] for line in session.transcript.splitlines() if line.startswith('Doctor: ')]
+        if lines:
+            scripts.append(lines)
+    return scripts
+
+
+def load_scripts(path: str) -> List[List[str]]:
+    """
+    Read transcripts from a JSON file
+
+    Args:
+        path: File holding a list of transcripts, each a list of utterances or
+            an object with a "turns" list
+
+    Returns:
+        List of utterance lists
+    """
+    with open(path) as f:
+        data = json.load(f)
+    scripts = []
+    for item in data:
+        turns = item.get('turns', []) if isinstance(item, dict) else item
+        if turns:
+            scripts.append([str(turn) for turn in turns])
+    return scripts
+
+
+def done_event(body: bytes) -> Optional[Dict[str, Any]]:
+    """Payload of the final `done` event of an SSE turn, or None"""
+    text = body.decode('utf-8', errors='replace')
+    for frame in text.split('\n\n'):
+        if frame.startswith('event: done\n'):
+            return json.loads(frame.split('data: ', 1)[1])
+    return None
+
+
+class InProcessTransport:
+    """Calls the API through Django's test client in this process"""
+
+    def __init__(self, user):
+        from django.test import Client
+
+        self.client = Client(raise_request_exception=False)
+        self.client.force_login(user)
+
+    def post_json(self, path: str, payload: Dict[str, Any]) -> Tuple[int, bytes, Optional[float]]:
+        """POST a JSON body; returns status, full body and seconds to the first streamed chunk"""
+        started_at = time.perf_counter()
+        response = self.client.post(path, data=json.dumps(payload), content_type='application/json')
+        if not getattr(response, 'streaming', False):
+            return response.status_code, response.content, None
+
+        first_byte = None
+        chunks = []
+        try:
+            for chunk in response.streaming_content:
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started_at
+                chunks.append(chunk)
+        finally:
+            response.close()
+        return response.status_code, b''.join(chunks), first_byte
+
+
+class HttpTransport:
+    """Calls the API of a running server over HTTP with its own cookie jar"""
+
+    def __init__(self, base_url: str, email: str, password: str, timeout: float = 120.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self._login(email, password)
+
+    def _cookie(self, name: str) -> str:
+        for cookie in self.cookies:
+            if cookie.name == name:
+                return cookie.value
+        return ''
+
+    def _login(self, email: str, password: str):
+        self.opener.open(self.base_url + '/auth/', timeout=self.timeout).read()
+        status, body, _ = self.post_json('/auth/', {'email': email, 'password': password}, {
+            'X-CSRFToken': self._cookie('csrftoken'),
+            'Referer': self.base_url + '/auth/',
+        })
+        if status != 200 or not json.loads(body or b'{}').get('success'):
+            raise RuntimeError(f"Login failed for {email} (status {status})")
+
+    def post_json(self, path: str, payload: Dict[str, Any],
+                  headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes, Optional[float]]:
+        """POST a JSON body; returns status, full body and seconds to the first byte"""
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(payload).encode('utf-8'),
+            headers=dict({'Content-Type': 'application/json'}, **(headers or {})),
+            method='POST'
+        )
+        started_at = time.perf_counter()
+        try:
+            response = self.opener.open(request, timeout=self.timeout)
+            status = response.status
+        except urllib.error.HTTPError as e:
+            response = e
+            status = e.code
+        with response:
+            first = response.read(1)
+            first_byte = time.perf_counter() - started_at
+            return status, first + response.read(), first_byte
+
+
+class EndpointStats:
+    """Latencies, first-byte times and status codes for one endpoint"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.first_bytes: List[float] = []
+        self.status_codes: Dict[str, int] = {}
+        self.errors = 0
+        self.error_samples: List[str] = []
+
+    def add(self, seconds: float, status: int, first_byte: Optional[float], error: Optional[str]):
+        self.latencies.append(seconds)
+        if first_byte is not None:
+            self.first_bytes.append(first_byte)
+        self.status_codes[str(status)] = self.status_codes.get(str(status), 0) + 1
+        if error:
+            self.errors += 1
+            if len(self.error_samples) < 5 and error not in self.error_samples:
+                self.error_samples.append(error)
+
+    def report(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        first_bytes = sorted(self.first_bytes)
+
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        report = {
+            'count': len(latencies),
+            'errors': self.errors,
+            'error_rate': round(self.errors / len(latencies), 4) if latencies else 0.0,
+            'status_codes': self.status_codes,
+            'latency_ms': {
+                'mean': ms(sum(latencies) / len(latencies)) if latencies else None,
+                'p50': ms(percentile(latencies, 0.50)),
+                'p95': ms(percentile(latencies, 0.95)),
+                'p99': ms(percentile(latencies, 0.99)),
+                'max': ms(latencies[-1]) if latencies else None,
+            },
+            'error_samples': self.error_samples,
+        }
+        if first_bytes:
+            report['first_byte_ms'] = {
+                'p50': ms(percentile(first_bytes, 0.50)),
+                'p95': ms(percentile(first_bytes, 0.95)),
+                'p99': ms(percentile(first_bytes, 0.99)),
+            }
+        return report
+
+
+class LoadTest:
+    """N concurrent candidates replaying transcripts against the API"""
+
+    def __init__(self, make_transport: Callable[[int], Any], case_ids: List[str], scripts: List[List[str]],
+                 candidates: int = 10, interact_mode: str = 'json', tts: bool = False,
+                 think_time: float = 2.0, ramp_up: float = 0.0, max_turns: Optional[int] = None,
+                 seed: Optional[int] = None, rss_pid: Optional[int] = None, rss_interval: float = 1.0):
+        """
+        Initialize the load test
+
+        Args:
+            make_transport: Builds a logged-in transport for candidate i (called on a worker thread)
+            case_ids: Cases to draw from
+            scripts: Transcripts to draw from, each a list of doctor utterances
+            candidates: Concurrent candidates
+            interact_mode: 'json' or 'sse' (see INTERACT_MODES)
+            tts: Fetch /api/tts/ for each patient reply (json mode only; streamed modes carry audio)
+            think_time: Mean seconds between turns (exponentially distributed, 0 for none)
+            ramp_up: Seconds over which candidate start times are spread
+            max_turns: Cap on turns per candidate
+            seed: Seed for case, script and think-time draws
+            rss_pid: Process whose RSS is sampled (None for this process)
+            rss_interval: Seconds between RSS samples
+        """
+        if interact_mode not in INTERACT_MODES:
+            raise ValueError(f"Unknown interact mode: {interact_mode}")
+        if not case_ids or not scripts:
+            raise ValueError("At least one case and one transcript are required")
+        self.make_transport = make_transport
+        self.case_ids = case_ids
+        self.scripts = scripts
+        self.candidates = candidates
+        self.interact_mode = interact_mode
+        self.tts = tts and interact_mode == 'json'
+        self.think_time = think_time
+        self.ramp_up = ramp_up
+        self.max_turns = max_turns
+        self.rng = random.Random(seed)
+        self.rss_pid = rss_pid
+        self.rss_interval = rss_interval
+
+        self.stats: Dict[str, EndpointStats] = {}
+        self.rss_samples: List[Dict[str, Any]] = []
+        self.sessions_completed = 0
+        self.turns_completed = 0
+        self.candidate_failures: List[str] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._started_at = 0.0
+
+    def run(self) -> Dict[str, Any]:
+        """Run every candidate to completion and return the report"""
+        # One thread per candidate, so blocking requests never queue behind each other
+        self._executor = ThreadPoolExecutor(max_workers=self.candidates, thread_name_prefix='loadtest')
+        try:
+            return asyncio.run(self._main())
+        finally:
+            self._executor.shutdown(wait=True)
+
+    async def _main(self) -> Dict[str, Any]:
+        self._started_at = time.perf_counter()
+        sampler = asyncio.ensure_future(self._sample_rss())
+        plans = [
+            (self.rng.choice(self.case_ids), self.rng.choice(self.scripts), random.Random(self.rng.random()))
+            for _ in range(self.candidates)
+        ]
+        await asyncio.gather(*(self._candidate(i, *plan) for i, plan in enumerate(plans)))
+        elapsed = time.perf_counter() - self._started_at
+        sampler.cancel()
+        self._record_rss()
+        return self._report(elapsed)
+
+    async def _call(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _request(self, endpoint: str, transport, path: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Time one request; returns the decoded JSON body for a successful non-streamed response"""
+        started_at = time.perf_counter()
+        try:
+            status, body, first_byte = await self._call(transport.post_json, path, payload)
+        except Exception as e:
+            self.stats.setdefault(endpoint, EndpointStats()).add(time.perf_counter() - started_at, 0, None, str(e))
+            return None
+        elapsed = time.perf_counter() - started_at
+
+        data = None
+        error = None
+        if status >= 400:
+            try:
+                error = f"{status}: {json.loads(body).get('error', '')}"
+            except ValueError:
+                error = f"{status}"
+        elif endpoint != 'interact' or self.interact_mode == 'json':
+            try:
+                data = json.loads(body)
+            except ValueError:
+                error = f"{status}: invalid JSON"
+        else:
+            data = done_event(body)
+            if data is None:
+                error = f"{status}: stream ended without a done event"
+            elif 'error' in data:
+                error = f"{status}: {data['error']}"
+        self.stats.setdefault(endpoint, EndpointStats()).add(elapsed, status, first_byte, error)
+        return data if error is None else None
+
+    async def _candidate(self, index: int, case_id: str, script: List[str], rng: random.Random):
+        if self.ramp_up and self.candidates > 1:
+            await asyncio.sleep(self.ramp_up * index / (self.candidates - 1))
+        try:
+            transport = await self._call(self.make_transport, index)
+        except Exception as e:
+            self.candidate_failures.append(f"candidate {index}: {e}")
+            return
+
+        started = await self._request('start_session', transport, '/api/start-session/', {'case_id': case_id})
+        if not started:
+            return
+        session_id = started['session_id']
+
+        turns = script[:self.max_turns] if self.max_turns else script
+        for turn_index, utterance in enumerate(turns):
+            if self.think_time > 0:
+                await asyncio.sleep(rng.expovariate(1.0 / self.think_time))
+            payload = {'session_id': session_id, 'user_input': utterance, 'turn_id': f"{session_id}-{turn_index}"}
+            if self.interact_mode == 'sse':
+                payload['stream'] = 'sse'
+            data = await self._request('interact', transport, INTERACT_MODES[self.interact_mode], payload)
+            if data is None:
+                continue
+            self.turns_completed += 1
+            if self.tts and data and data.get('type') == 'patient_response':
+                await self._request('tts', transport, '/api/tts/', {'text': data['response']})
+
+        if await self._request('end_session', transport, '/api/end-session/', {'session_id': session_id}):
+            self.sessions_completed += 1
+
+    def _record_rss(self):
+        value = rss_bytes(self.rss_pid)
+        if value is not None:
+            self.rss_samples.append({'t': round(time.perf_counter() - self._started_at, 2), 'bytes': value})
+
+    async def _sample_rss(self):
+        while True:
+            self._record_rss()
+            await asyncio.sleep(self.rss_interval)
+
+    def _report(self, elapsed: float) -> Dict[str, Any]:
+        requests = sum(len(stats.latencies) for stats in self.stats.values())
+        errors = sum(stats.errors for stats in self.stats.values())
+        return {
+            'config': {
+                'candidates': self.candidates,
+                'interact_mode': self.interact_mode,
+                'tts': self.tts,
+                'think_time': self.think_time,
+                'ramp_up': self.ramp_up,
+                'cases': len(self.case_ids),
+                'transcripts': len(self.scripts),
+            },
+            'duration_seconds': round(elapsed, 3),
+            'throughput': {
+                'requests_per_second': round(requests / elapsed, 3) if elapsed else 0.0,
+                'turns_per_second': round(self.turns_completed / elapsed, 3) if elapsed else 0.0,
+                'sessions_per_minute': round(self.sessions_completed * 60 / elapsed, 3) if elapsed else 0.0,
+            },
+            'requests': requests,
+            'errors': errors,
+            'error_rate': round(errors / requests, 4) if requests else 0.0,
+            'sessions_completed': self.sessions_completed,
+            'turns_completed': self.turns_completed,
+            'candidate_failures': self.candidate_failures,
+            'endpoints': {name: stats.report() for name, stats in sorted(self.stats.items())},
+            'rss': {
+                'pid': self.rss_pid or os.getpid(),
+                'peak_bytes': max((sample['bytes'] for sample in self.rss_samples), default=None),
+                'samples': self.rss_samples,
+            },
+        }
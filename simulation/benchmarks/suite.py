@@ -0,0 +1,296 @@
+"""
+Microbenchmark suite for ai_core, db_utils, ingest and view hot paths
+
+Each benchmark builds its inputs once from the deterministic generators in
+synthetic.py (and, for the ingest and query paths, a case corpus of
+--corpus-cases cases from database/generate_synthetic_cases.py), then times a
+single operation. The runner calibrates how many
+operations make up a round (like timeit's autorange), times several rounds
+and reports the median and best time per operation. Results can be saved as
+a baseline and later runs compared against it, flagging regressions beyond a
+threshold.
+
+The AI components are constructed through ai_config, so run the suite with
+the local provider (the benchmark command's default) to avoid needing keys.
+"""
+
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+from . import synthetic
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+DEFAULT_CORPUS_CASES = 1000
+
+
+def load_database_script(name: str):
+    """Import a script from database/ (the directory is not a package)"""
+    path = os.path.join(PROJECT_ROOT, 'database', f"{name}.py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_ingest_module():
+    return load_database_script('create_medical_cases_db')
+
+
+def write_case_corpus(path: str, cases: int, seed: int = 0) -> str:
+    """Write a synthetic case file with the corpus generator; returns the path"""
+    generator = load_database_script('generate_synthetic_cases').SyntheticCaseGenerator(seed=seed)
+    generator.write(path, cases)
+    return path
+
+
+def build_cases_db(path: str, cases: int, seed: int = 0) -> str:
+    """Ingest a synthetic corpus into a fresh medical cases database; returns the source file path"""
+    ingest = load_ingest_module()
+    source_path = write_case_corpus(path + '.txt', cases, seed=seed)
+    db = ingest.MedicalCasesDatabase(path)
+    db.connect()
+    db.create_tables()
+    db.insert_data(db.parse_text_file(source_path))
+    db.close()
+    return source_path
+
+
+# Each setup receives a scratch directory and the corpus size and returns the operation to time
+
+def _feedback_analyze_session(workdir: str, corpus_cases: int) -> Callable[[], Any]:
+    from simulation.ai_core.feedback_agent import FeedbackAgent
+
+    case = synthetic.case_data()
+    # The vector store is not used by the analysis, so a placeholder avoids building one
+    agent = FeedbackAgent(case, vector_store=SimpleNamespace())
+    transcript = synthetic.transcript(400)
+    approach = synthetic.suggested_approach(lines_per_field=12)
+    return lambda: agent._analyze_session(transcript, approach)
+
+
+def _examiner_workflow(warm: bool) -> Callable[[str, int], Callable[[], Any]]:
+    def setup(workdir: str, corpus_cases: int) -> Callable[[], Any]:
+        from simulation.ai_core.examiner_cache import examiner_cache
+        from simulation.ai_core.examiner_workflow import ExaminerWorkflow
+
+        workflow = ExaminerWorkflow(synthetic.case_data(findings_lines=60))
+        request = "Examiner: I would like to check the vital signs and examine the abdomen"
+        if warm:
+            return lambda: workflow.process_examiner_request(request)
+
+        def cold():
+            examiner_cache.clear()
+            return workflow.process_examiner_request(request)
+        return cold
+    return setup
+
+
+def _cases_with_content_by_category(workdir: str, corpus_cases: int) -> Callable[[], Any]:
+    from simulation.db_utils import MedicalCasesQuery
+
+    path = os.path.join(workdir, 'query_bench.db')
+    build_cases_db(path, cases=corpus_cases)
+    query = MedicalCasesQuery(path)
+    # Second largest category, about 14% of the corpus
+    return lambda: query.get_cases_with_content_by_category('Musculoskeletal_medicine')
+
+
+def _parse_text_file(workdir: str, corpus_cases: int) -> Callable[[], Any]:
+    ingest = load_ingest_module()
+    path = write_case_corpus(os.path.join(workdir, 'parse_bench.txt'), corpus_cases)
+    db = ingest.MedicalCasesDatabase(':memory:')
+    return lambda: db.parse_text_file(path)
+
+
+def _insert_data(workdir: str, corpus_cases: int) -> Callable[[], Any]:
+    ingest = load_ingest_module()
+    path = write_case_corpus(os.path.join(workdir, 'insert_bench.txt'), corpus_cases)
+    cases = ingest.MedicalCasesDatabase(':memory:').parse_text_file(path)
+    db_path = os.path.join(workdir, 'insert_bench.db')
+
+    def load():
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        db = ingest.MedicalCasesDatabase(db_path)
+        db.connect()
+        db.create_tables()
+        with db.build_pragmas():
+            db.insert_data(cases)
+        db.close()
+    return load
+
+
+def _patient_clean_response(workdir: str, corpus_cases: int) -> Callable[[], Any]:
+    from simulation.ai_core.patient_agent import PatientAgent
+
+    agent = PatientAgent("You are a 45-year-old accountant with abdominal pain.", 'benchmark')
+    replies = synthetic.patient_replies(200)
+    return lambda: [agent._clean_response(reply) for reply in replies]
+
+
+def _feedback_context(workdir: str, corpus_cases: int) -> Callable[[], Any]:
+    from simulation.views import build_feedback_context
+
+    started_at = datetime(2025, 1, 1, 9, 0)
+    case = SimpleNamespace(case_id='Synthetic_000001', category='Category_01')
+    session = SimpleNamespace(
+        started_at=started_at,
+        ended_at=started_at + timedelta(minutes=7, seconds=40),
+        duration_minutes=8,
+        transcript=synthetic.transcript(60),
+    )
+    feedback = synthetic.feedback_record(points=40)
+    return lambda: build_feedback_context(case, session, feedback, 'Benchmark Candidate')
+
+
+BENCHMARKS: Dict[str, Callable[[str, int], Callable[[], Any]]] = {
+    'feedback_analyze_session_400_turns': _feedback_analyze_session,
+    'examiner_request_warm_cache': _examiner_workflow(warm=True),
+    'examiner_request_cold_cache': _examiner_workflow(warm=False),
+    'cases_with_content_by_category': _cases_with_content_by_category,
+    'parse_text_file': _parse_text_file,
+    'insert_data_fresh_db': _insert_data,
+    'patient_clean_response_200_replies': _patient_clean_response,
+    'feedback_context': _feedback_context,
+}
+
+
+def time_operation(operation: Callable[[], Any], repeat: int = 5, min_round_seconds: float = 0.2) -> Dict[str, Any]:
+    """
+    Time an operation
+
+    Args:
+        operation: Zero-argument callable
+        repeat: Timed rounds
+        min_round_seconds: Minimum duration of one round, used to calibrate operations per round
+
+    Returns:
+        Dictionary with median_us, min_us, ops_per_round and rounds
+    """
+    operation()  # Warm-up (lazy imports, caches, page cache)
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_round_seconds or number >= 1_000_000:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_round_seconds / elapsed) + 1))
+
+    per_op = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        per_op.append((time.perf_counter() - start) / number)
+
+    return {
+        'median_us': round(statistics.median(per_op) * 1e6, 2),
+        'min_us': round(min(per_op) * 1e6, 2),
+        'ops_per_round': number,
+        'rounds': len(per_op),
+    }
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = 5,
+                   min_round_seconds: float = 0.2, corpus_cases: int = DEFAULT_CORPUS_CASES) -> Dict[str, Any]:
+    """
+    Run the suite (or the named benchmarks)
+
+    Args:
+        names: Benchmarks to run (default: all)
+        repeat: Timed rounds per benchmark
+        min_round_seconds: Minimum duration of one round
+        corpus_cases: Size of the synthetic case corpus for the ingest and query benchmarks
+
+    Returns:
+        Dictionary with environment details and per-benchmark timings
+    """
+    names = names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='clinical-bench-') as workdir:
+        for name in names:
+            operation = BENCHMARKS[name](workdir, corpus_cases)
+            results[name] = time_operation(operation, repeat=repeat, min_round_seconds=min_round_seconds)
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'corpus_cases': corpus_cases,
+        'benchmarks': results,
+    }
+
+
+def load_baseline(path: str = DEFAULT_BASELINE_PATH) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(report: Dict[str, Any], path: str = DEFAULT_BASELINE_PATH, merge: bool = True):
+    """Save a report as the baseline, keeping saved benchmarks that were not re-run"""
+    baseline = load_baseline(path) if merge else None
+    if baseline:
+        benchmarks = dict(baseline.get('benchmarks', {}))
+        benchmarks.update(report['benchmarks'])
+        report = dict(report, benchmarks=benchmarks)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.25) -> Dict[str, Any]:
+    """
+    Compare median timings against a baseline
+
+    Args:
+        report: Output of run_benchmarks
+        baseline: A previously saved report
+        threshold: Relative slowdown (0.25 = 25%) counted as a regression
+
+    Returns:
+        Dictionary with per-benchmark ratios and the names of regressions and improvements
+    """
+    comparison = {'threshold': threshold, 'benchmarks': {}, 'regressions': [], 'improvements': []}
+    if baseline.get('corpus_cases', DEFAULT_CORPUS_CASES) != report.get('corpus_cases', DEFAULT_CORPUS_CASES):
+        comparison['warning'] = (f"Baseline corpus has {baseline.get('corpus_cases')} cases, "
+                                 f"this run {report.get('corpus_cases')}")
+    saved = baseline.get('benchmarks', {})
+    for name, result in report['benchmarks'].items():
+        if name not in saved or not saved[name].get('median_us'):
+            comparison['benchmarks'][name] = {'status': 'new'}
+            continue
+        ratio = result['median_us'] / saved[name]['median_us']
+        if ratio > 1 + threshold:
+            status = 'regression'
+            comparison['regressions'].append(name)
+        elif ratio < 1 - threshold:
+            status = 'improvement'
+            comparison['improvements'].append(name)
+        else:
+            status = 'ok'
+        comparison['benchmarks'][name] = {
+            'status': status,
+            'ratio': round(ratio, 3),
+            'baseline_median_us': saved[name]['median_us'],
+            'median_us': result['median_us'],
+        }
+    return comparison
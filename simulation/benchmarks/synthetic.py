@@ -0,0 +1,158 @@
+"""
+Deterministic synthetic inputs for the benchmark suite
+
+Every generator takes a seed, so the same inputs are produced on every run and
+timings stay comparable against saved baselines.
+"""
+
+import random
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+DOCTOR_LINES = (
+    "Hello, I'm Dr. Smith. What brings you in today?",
+    "How long have you had these symptoms?",
+    "Can you describe the pain for me?",
+    "Does anything make it better or worse?",
+    "Are you taking any regular medications?",
+    "Do you have any allergies?",
+    "Is there any family history of heart disease?",
+    "Do you smoke or drink alcohol?",
+    "Have you noticed any weight loss or fevers?",
+    "I'd like to explain what I think is going on.",
+    "Do you have any questions or concerns?",
+    "We will arrange some blood tests and review you next week.",
+)
+
+PATIENT_LINES = (
+    "It started about a week ago.",
+    "It's a dull ache on the right side.",
+    "Lying down makes it a bit better.",
+    "I take a tablet for my blood pressure.",
+    "No allergies that I know of.",
+    "My father had a heart attack at sixty.",
+    "I stopped smoking five years ago.",
+    "I'm worried it might be something serious.",
+)
+
+EXAMINER_LINES = (
+    "Examiner: I would like to check the vital signs",
+    "Examiner: I would like to examine the abdomen",
+    "Examiner: Can I have the blood pressure and pulse?",
+    "Examiner: I would like to perform a cardiovascular examination",
+)
+
+FINDINGS_LINES = (
+    "Blood pressure is 140/90 mm Hg with no postural drop.",
+    "Pulse is 72 and regular.",
+    "Temperature 37.2 degrees, respiratory rate 16.",
+    "Abdomen is soft with mild right upper quadrant tenderness.",
+    "Heart sounds dual with no murmurs.",
+    "Chest is clear on auscultation.",
+    "BMI is 27 kg/m2.",
+    "No peripheral oedema.",
+)
+
+APPROACH_LINES = {
+    'specific_questions': (
+        "Ask about the onset and duration of symptoms?",
+        "Explore the patient's concerns and expectations",
+        "Inquire about medications and allergies",
+        "What does the patient think is causing the problem?",
+    ),
+    'examination_details': (
+        "Examine the abdomen and check for tenderness",
+        "Assess vital signs including blood pressure",
+        "Evaluate for signs of dehydration",
+        "Check peripheral pulses",
+    ),
+    'management_plan': (
+        "Treat the underlying cause and manage pain",
+        "Prescribe simple analgesia",
+        "Refer to a specialist if symptoms persist",
+        "Arrange follow-up in one week",
+    ),
+    'pitfalls': (
+        "Avoid using medical jargon",
+        "Don't forget to address the patient's concerns",
+        "Do not miss red flag symptoms",
+        "Warning: consider pregnancy in women of childbearing age",
+    ),
+}
+
+
+def transcript(turns: int, seed: int = 0) -> str:
+    """Session transcript with doctor, patient and examiner lines, as stored on Session.transcript"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(turns):
+        if i % 8 == 7:
+            lines.append(f"Doctor: {rng.choice(EXAMINER_LINES)}")
+            lines.append(f"Examiner: {rng.choice(FINDINGS_LINES)}")
+        else:
+            lines.append(f"Doctor: {rng.choice(DOCTOR_LINES)}")
+            lines.append(f"Patient: {rng.choice(PATIENT_LINES)}")
+    return "\n".join(lines) + "\n"
+
+
+def suggested_approach(lines_per_field: int = 12, seed: int = 0) -> Dict[str, str]:
+    """Suggested approach dictionary as consumed by FeedbackAgent"""
+    rng = random.Random(seed)
+    return {
+        field: "\n".join(rng.choice(options) for _ in range(lines_per_field))
+        for field, options in APPROACH_LINES.items()
+    }
+
+
+def case_data(case_id: str = 'synthetic_case', findings_lines: int = 30, seed: int = 0) -> Dict[str, Any]:
+    """Case content dictionary shaped like MedicalCasesQuery.get_case_with_content"""
+    rng = random.Random(seed)
+    approach = suggested_approach(seed=seed)
+    return {
+        'case_id': case_id,
+        'category_name': 'Synthetic',
+        'scenario': "A 45-year-old man presents with abdominal pain.",
+        'instructions_for_patient': "You are a 45-year-old accountant with abdominal pain.",
+        'examination_details': approach['examination_details'],
+        'info_for_facilitator_exam_findings': "\n".join(rng.choice(FINDINGS_LINES) for _ in range(findings_lines)),
+        'specific_questions': approach['specific_questions'],
+        'management_plan': approach['management_plan'],
+        'pitfalls': approach['pitfalls'],
+    }
+
+
+def patient_replies(count: int, seed: int = 0) -> List[str]:
+    """Raw model replies with the prefixes, notes and asides that PatientAgent._clean_response strips"""
+    rng = random.Random(seed)
+    replies = []
+    for _ in range(count):
+        reply = " ".join(rng.choice(PATIENT_LINES) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.5:
+            reply = "PATIENT: " + reply
+        if rng.random() < 0.3:
+            reply += " (Note: the patient appears anxious.)"
+        if rng.random() < 0.3:
+            reply += " [looks away]"
+        if rng.random() < 0.3:
+            reply = reply.rstrip('.')
+        replies.append(reply)
+    return replies
+
+
+def feedback_record(points: int = 20, seed: int = 0) -> SimpleNamespace:
+    """Object with the Feedback model's fields, as passed to build_feedback_context"""
+    rng = random.Random(seed)
+    approach = suggested_approach(seed=seed)
+    all_points = [line for text in approach.values() for line in text.split("\n")]
+    return SimpleNamespace(
+        overall_score=rng.randint(40, 95),
+        pass_fail=rng.random() < 0.6,
+        what_went_well="\n".join(rng.choice(DOCTOR_LINES) for _ in range(5)),
+        areas_for_improvement="; ".join(rng.choice(APPROACH_LINES['pitfalls']) for _ in range(4)),
+        specific_recommendations="\n".join(rng.choice(APPROACH_LINES['management_plan']) for _ in range(4)),
+        key_points_covered=[rng.choice(all_points) for _ in range(points)],
+        key_points_missed=[rng.choice(all_points) for _ in range(points // 2)],
+        compliance_analysis={'used_jargon': False, 'maintained_rapport': True,
+                             'followed_protocol': True, 'addressed_concerns': rng.random() < 0.5},
+        rag_sources=[],
+    )
@@ -0,0 +1,101 @@
+"""
+Incremental sync of the Case model from medical_cases.db
+
+Each Case row records the source version and content hash it was copied from, so a
+sync only reads content for cases that are new or changed since the last run.
+"""
+
+import hashlib
+import json
+from typing import Dict, Optional
+
+from django.db import transaction
+
+from .db_utils import CASE_MODEL_FIELDS, MedicalCasesQuery
+from .models import Case
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def record_hash(fields: Dict) -> str:
+    """Hash Case field values, for databases built before ingest stored content hashes"""
+    encoded = json.dumps([fields[name] for name in CASE_MODEL_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def sync_cases(db_path: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+               dry_run: bool = False, force: bool = False) -> Dict:
+    """Create and update Case rows so they match medical_cases.db
+
+    All writes happen in one transaction. Cases missing from the source database are
+    reported but kept, since sessions and feedback reference them.
+
+    Args:
+        db_path: Source database (default: database/medical_cases.db)
+        batch_size: Cases read and written per batch
+        dry_run: Work out the changes and roll them back
+        force: Rewrite every case even if its version and hash match
+
+    Returns:
+        Dict: created, updated, unchanged and missing counts, plus the ids missing from the source
+    """
+    query = MedicalCasesQuery(db_path)
+    try:
+        source = query.get_case_versions()
+        with transaction.atomic():
+            synced = {
+                case_id: (version, content_hash)
+                for case_id, version, content_hash in Case.objects.values_list('case_id', 'source_version', 'source_hash')
+            }
+
+            # Cases without a stored hash (older databases) have to be read and hashed to compare
+            pending = sorted(
+                case_id for case_id, state in source.items()
+                if force or state[1] is None or synced.get(case_id) != state
+            )
+
+            created, updated = [], []
+            unchanged = len(source) - len(pending)
+            for start in range(0, len(pending), batch_size):
+                batch = pending[start:start + batch_size]
+                records = query.get_case_model_fields(batch)
+                new_cases, changed_cases = [], []
+                for case_id in batch:
+                    fields = records[case_id]
+                    version, content_hash = source[case_id]
+                    content_hash = content_hash or record_hash(fields)
+                    case = Case(case_id=case_id, source_version=version, source_hash=content_hash, **fields)
+                    if case_id not in synced:
+                        new_cases.append(case)
+                    elif force or synced[case_id] != (version, content_hash):
+                        changed_cases.append(case)
+                    else:
+                        unchanged += 1
+
+                Case.objects.bulk_create(new_cases, batch_size=batch_size)
+                # Updates go through an upsert on case_id: bulk_update builds a CASE expression
+                # per field and row, which is orders of magnitude slower for 20 text fields
+                Case.objects.bulk_create(
+                    changed_cases,
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=['case_id'],
+                    update_fields=CASE_MODEL_FIELDS + ['source_version', 'source_hash', 'updated_at'],
+                )
+                created.extend(case.case_id for case in new_cases)
+                updated.extend(case.case_id for case in changed_cases)
+
+            if dry_run:
+                transaction.set_rollback(True)
+    finally:
+        query.close()
+
+    missing = sorted(set(synced) - set(source))
+    return {
+        'created': len(created),
+        'updated': len(updated),
+        'unchanged': unchanged,
+        'missing': len(missing),
+        'missing_case_ids': missing,
+        'dry_run': dry_run,
+    }
@@ -4,7 +4,30 @@ Database utilities for the simulation app
 
 import sqlite3
 import os
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+# Case model fields filled from medical_cases.db
+CASE_MODEL_FIELDS = [
+    'category', 'scenario', 'instructions_for_patient', 'gender', 'age', 'occupation',
+    'instruction_for_doc', 'case_type', 'examination_details', 'info_for_facilitator_exam_findings',
+    'specific_questions', 'management_plan', 'case_commentary', 'pitfalls', 'summary',
+]
+
+# Sections whose whole text is copied to a Case field
+CASE_SECTION_FIELDS = {
+    'Instruction_for_doc': 'instruction_for_doc',
+    'Instructions_for_patient': 'instructions_for_patient',
+    'info_for_facilator': 'info_for_facilitator_exam_findings',
+}
+
+# Suggested_approach subsections used by FeedbackAgent
+SUGGESTED_APPROACH_FIELDS = {
+    'SPECIFIC_QUESTIONS': 'specific_questions',
+    'EXAMINATION': 'examination_details',
+    'MANAGEMENT': 'management_plan',
+    'COMMENTARY': 'case_commentary',
+    'PITFALL': 'pitfalls',
+}
 
 class MedicalCasesQuery:
     def __init__(self, db_path=None):
@@ -17,6 +40,9 @@ class MedicalCasesQuery:
         self.db_path = db_path
         self.conn = sqlite3.connect(db_path)
         self.conn.row_factory = sqlite3.Row  # Enable column access by name
+        # Databases built before incremental ingest have no version or content hash
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(cases)")}
+        self._has_versions = {'version', 'content_hash'} <= columns
         
     def get_all_categories(self) -> List[str]:
         """Get all categories"""
@@ -24,6 +50,12 @@ class MedicalCasesQuery:
         cursor.execute("SELECT name FROM categories ORDER BY name")
         return [row[0] for row in cursor.fetchall()]
     
+    def get_all_case_ids(self) -> List[str]:
+        """Get every case id"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT case_id FROM cases ORDER BY case_id")
+        return [row[0] for row in cursor.fetchall()]
+    
     def get_cases_by_category(self, category_name: str) -> List[Dict]:
         """Get all cases for a specific category with basic info"""
         cursor = self.conn.cursor()
@@ -41,8 +73,9 @@ class MedicalCasesQuery:
         cursor = self.conn.cursor()
         
         # Get case basic info
-        cursor.execute("""
-            SELECT c.case_id, cat.name as category_name
+        version_columns = "c.version, c.content_hash" if self._has_versions else "1, NULL"
+        cursor.execute(f"""
+            SELECT c.case_id, cat.name as category_name, {version_columns}
             FROM cases c
             LEFT JOIN categories cat ON c.category_id = cat.id
             WHERE c.case_id = ?
@@ -65,12 +98,16 @@ class MedicalCasesQuery:
         result = {
             'case_id': case_info[0],
             'category_name': case_info[1],
+            'version': case_info[2],  # Bumped on every content change; safe to key caches on
+            'content_hash': case_info[3],
             'scenario': "",
             'instruction_for_doc': "",
             'case_type': "",
             'instruction': "",
             'summary': "",
             'instructions_for_patient': "",
+            'examination_details': "",
+            'info_for_facilitator_exam_findings': "",
             'gender': "",
             'age': "",
             'occupation': ""
@@ -117,6 +154,17 @@ class MedicalCasesQuery:
                         result['scenario'] = sub_content
                     elif sub_type == 'SUMMARY':
                         result['summary'] = sub_content
+            
+            elif section_type == 'Suggested_approach':
+                # Suggested examination, used by the examiner when no facilitator findings exist
+                for sub in subsections:
+                    sub_type, sub_content = sub
+                    if sub_type == 'EXAMINATION':
+                        result['examination_details'] = sub_content
+            
+            elif section_type == 'info_for_facilator':
+                # Findings the facilitator reveals on request (tag lines are dropped when indexed)
+                result['info_for_facilitator_exam_findings'] = content
         
         return result
     
@@ -211,6 +259,79 @@ class MedicalCasesQuery:
                     result['occupation'] = occupation.title()
                     break
     
+    def get_case_versions(self) -> Dict[str, Tuple[int, Optional[str]]]:
+        """Get (version, content_hash) for every case without reading any content
+
+        Returns:
+            Dict: case_id -> (version, content_hash); the hash is None for databases
+            built before incremental ingest
+        """
+        version_columns = "version, content_hash" if self._has_versions else "1, NULL"
+        cursor = self.conn.execute(f"SELECT case_id, {version_columns} FROM cases")
+        return {row[0]: (row[1], row[2]) for row in cursor}
+
+    def get_case_model_fields(self, case_ids: List[str]) -> Dict[str, Dict]:
+        """Get Case model field values for a batch of cases in two queries
+
+        Args:
+            case_ids: Cases to read; keep batches under SQLite's bound-parameter limit
+
+        Returns:
+            Dict: case_id -> field values named as on simulation.models.Case
+        """
+        if not case_ids:
+            return {}
+        placeholders = ', '.join('?' * len(case_ids))
+        records = {}
+        for case_id, category_name in self.conn.execute(f"""
+            SELECT c.case_id, cat.name
+            FROM cases c
+            LEFT JOIN categories cat ON c.category_id = cat.id
+            WHERE c.case_id IN ({placeholders})
+        """, case_ids):
+            records[case_id] = dict.fromkeys(CASE_MODEL_FIELDS, '')
+            records[case_id]['category'] = category_name or 'Unknown'
+
+        # Sections and their subsections in one pass; section rows repeat once per subsection
+        cursor = self.conn.execute(f"""
+            SELECT s.case_id, s.id, s.section_type, s.content, sub.subsection_type, sub.content
+            FROM sections s
+            LEFT JOIN subsections sub ON sub.section_id = s.id
+            WHERE s.case_id IN ({placeholders})
+            ORDER BY s.id, sub.id
+        """, case_ids)
+        previous_section_id = None
+        for case_id, section_id, section_type, content, sub_type, sub_content in cursor:
+            record = records[case_id]
+            if section_id != previous_section_id:
+                previous_section_id = section_id
+                section_field = CASE_SECTION_FIELDS.get(section_type)
+                if section_field:
+                    record[section_field] = content
+            if sub_type is None:
+                continue
+            sub_type = sub_type.upper()
+            if section_type == 'Instruction_for_doc':
+                if sub_type == 'CASE_TYPE':
+                    record['case_type'] = sub_content
+                elif sub_type == 'SCENARIO':
+                    record['scenario'] = sub_content
+                    self._extract_patient_info(sub_content, record)
+                elif sub_type == 'SUMMARY':
+                    record['summary'] = sub_content
+            elif section_type == 'Instructions_for_patient':
+                # The doctor's scenario and summary take precedence
+                if sub_type == 'SCENARIO' and not record['scenario']:
+                    record['scenario'] = sub_content
+                elif sub_type == 'SUMMARY' and not record['summary']:
+                    record['summary'] = sub_content
+            elif section_type == 'Suggested_approach':
+                field = SUGGESTED_APPROACH_FIELDS.get(sub_type)
+                if field:
+                    record[field] = sub_content
+
+        return records
+
     def get_cases_with_content_by_category(self, category_name: str) -> List[Dict]:
         """Get all cases for a category with their content"""
         cases = self.get_cases_by_category(category_name)
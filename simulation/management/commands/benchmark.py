@@ -0,0 +1,156 @@
+"""
+Management command to run the microbenchmark suite
+
+Usage: python manage.py benchmark [--only NAME ...] [--save-baseline] [--fail-on-regression] [--json]
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from simulation.ai_core.config import PROVIDERS, ai_config
+from simulation.benchmarks.suite import (
+    BENCHMARKS,
+    DEFAULT_BASELINE_PATH,
+    DEFAULT_CORPUS_CASES,
+    compare_to_baseline,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = 'Time ai_core, db_utils, ingest and view hot paths and compare against a saved baseline'
+    # The URL checks import ai_service, which builds its model with the environment's provider
+    # before --provider is applied; skipping them lets the local default run without API keys
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            choices=sorted(BENCHMARKS),
+            help='Run only the named benchmarks',
+        )
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List the benchmarks and exit',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed rounds per benchmark (default: 5)',
+        )
+        parser.add_argument(
+            '--min-round-time',
+            type=float,
+            default=0.2,
+            help='Minimum seconds per round; operations per round are calibrated to it (default: 0.2)',
+        )
+        parser.add_argument(
+            '--corpus-cases',
+            type=int,
+            default=DEFAULT_CORPUS_CASES,
+            help=f'Synthetic corpus size for the ingest and query benchmarks (default: {DEFAULT_CORPUS_CASES})',
+        )
+        parser.add_argument(
+            '--provider',
+            choices=PROVIDERS,
+            default='local',
+            help='AI provider the agents are built with; local needs no API keys (default: local)',
+        )
+        parser.add_argument(
+            '--baseline',
+            default=DEFAULT_BASELINE_PATH,
+            help=f'Baseline file (default: {DEFAULT_BASELINE_PATH})',
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Write this run to the baseline file instead of comparing',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.25,
+            help='Relative slowdown of the median counted as a regression (default: 0.25)',
+        )
+        parser.add_argument(
+            '--fail-on-regression',
+            action='store_true',
+            help='Exit with an error if any benchmark regressed',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the raw report as JSON',
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for name in BENCHMARKS:
+                self.stdout.write(name)
+            return
+
+        baseline = None
+        if not options['save_baseline']:
+            baseline = load_baseline(options['baseline'])
+            if baseline is None and options['fail_on_regression']:
+                raise CommandError(
+                    f"No baseline at {options['baseline']}; --fail-on-regression needs one "
+                    f"(record it with --save-baseline on the same machine)"
+                )
+
+        # The suite builds its agents through ai_config, which reads the provider on every call
+        previous_provider = ai_config.provider
+        ai_config.provider = options['provider']
+        try:
+            report = run_benchmarks(
+                names=options['only'],
+                repeat=options['repeat'],
+                min_round_seconds=options['min_round_time'],
+                corpus_cases=options['corpus_cases'],
+            )
+        finally:
+            ai_config.provider = previous_provider
+        report['provider'] = options['provider']
+
+        if options['save_baseline']:
+            save_baseline(report, options['baseline'])
+            comparison = None
+        else:
+            comparison = compare_to_baseline(report, baseline, options['threshold']) if baseline else None
+            report['comparison'] = comparison
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print_report(report, comparison)
+            if options['save_baseline']:
+                self.stdout.write(self.style.SUCCESS(f"Baseline saved to {options['baseline']}"))
+            elif comparison is None:
+                self.stdout.write(self.style.WARNING(
+                    f"No baseline at {options['baseline']}; run with --save-baseline to create one"
+                ))
+
+        if comparison and comparison['regressions'] and options['fail_on_regression']:
+            raise CommandError(f"Regressions: {', '.join(comparison['regressions'])}")
+
+    def _print_report(self, report, comparison):
+        if comparison and comparison.get('warning'):
+            self.stdout.write(self.style.WARNING(comparison['warning']))
+        width = max(len(name) for name in report['benchmarks'])
+        for name, result in report['benchmarks'].items():
+            line = (f"{name:<{width}}  median {result['median_us']:>12.2f} µs  "
+                    f"min {result['min_us']:>12.2f} µs  x{result['ops_per_round']}")
+            entry = (comparison or {}).get('benchmarks', {}).get(name)
+            if entry and entry['status'] != 'new':
+                line += f"  {entry['ratio']:.2f}x baseline"
+                if entry['status'] == 'regression':
+                    line = self.style.ERROR(line + '  REGRESSION')
+                elif entry['status'] == 'improvement':
+                    line = self.style.SUCCESS(line + '  improved')
+            self.stdout.write(line)
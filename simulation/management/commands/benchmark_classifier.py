@@ -0,0 +1,55 @@
+"""
+Management command to benchmark the examiner request classifier
+
+Usage: python manage.py benchmark_classifier [--repeat N] [--json]
+"""
+
+import json
+
+from django.core.management.base import BaseCommand
+
+from simulation.benchmarks.classifier import run_classifier_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Report examiner request classifier accuracy and microseconds per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=200,
+            help='Timing passes over the labeled set (default: 200)',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the raw report as JSON',
+        )
+
+    def handle(self, *args, **options):
+        report = run_classifier_benchmark(repeat=options['repeat'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"Utterances: {report['utterances']}")
+        self.stdout.write(f"Accuracy: {report['accuracy'] * 100:.1f}%")
+        for request_type, accuracy in report['per_type_accuracy'].items():
+            self.stdout.write(f"  {request_type}: {accuracy * 100:.1f}%")
+        self.stdout.write(f"Compound requests split correctly: {report['compound_accuracy'] * 100:.1f}% "
+                          f"of {report['compound_utterances']}")
+        self.stdout.write(f"Time per request: {report['microseconds_per_request']} µs")
+
+        if report['misclassified']:
+            self.stdout.write(self.style.WARNING(f"\nMisclassified ({len(report['misclassified'])}):"))
+            for item in report['misclassified']:
+                self.stdout.write(f"  {item['utterance']!r}: expected {item['expected']}, got {item['predicted']}")
+        else:
+            self.stdout.write(self.style.SUCCESS('All utterances classified correctly'))
+
+        for item in report['compound_missplit']:
+            self.stdout.write(self.style.WARNING(
+                f"  {item['utterance']!r}: expected {item['expected']}, got {item['predicted']}"
+            ))
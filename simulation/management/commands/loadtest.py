@@ -0,0 +1,177 @@
+"""
+Management command to load test the simulation API with concurrent candidates
+
+Usage: python manage.py loadtest [--candidates N] [--mode inprocess|http] [--output report.json]
+"""
+
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from simulation.models import Case
+from simulation.ai_core.cassette import cassette_store
+from simulation.benchmarks.loadtest import (
+    LoadTest, InProcessTransport, HttpTransport, DEFAULT_SCRIPT, INTERACT_MODES,
+    load_scripts, recorded_scripts,
+)
+
+
+class Command(BaseCommand):
+    help = 'Simulate concurrent candidates against the API and report latency percentiles, errors and RSS as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidates', type=int, default=10, help='Concurrent candidates (default: 10)')
+        parser.add_argument(
+            '--mode',
+            choices=['inprocess', 'http'],
+            default='inprocess',
+            help='Call the endpoints in this process or over HTTP (default: inprocess)',
+        )
+        parser.add_argument(
+            '--base-url',
+            type=str,
+            default='http://127.0.0.1:8000',
+            help='Server for --mode http (default: http://127.0.0.1:8000)',
+        )
+        parser.add_argument(
+            '--interact',
+            choices=sorted(INTERACT_MODES),
+            default='json',
+            help='Turn endpoint style: json or sse (default: json)',
+        )
+        parser.add_argument('--tts', action='store_true', help='Fetch /api/tts/ for every patient reply (json mode)')
+        parser.add_argument('--case-id', type=str, help='Use a single case (default: all cases)')
+        parser.add_argument('--transcripts', type=str, help='JSON file of transcripts to replay')
+        parser.add_argument(
+            '--recorded',
+            type=int,
+            default=0,
+            help='Replay doctor turns from the N most recent finished sessions',
+        )
+        parser.add_argument('--turns', type=int, help='Maximum turns per candidate')
+        parser.add_argument(
+            '--think-time',
+            type=float,
+            default=2.0,
+            help='Mean seconds between turns, exponentially distributed (default: 2.0)',
+        )
+        parser.add_argument('--ramp-up', type=float, default=0.0, help='Seconds over which candidates start')
+        parser.add_argument('--seed', type=int, help='Seed for case, transcript and think-time draws')
+        parser.add_argument(
+            '--server-pid',
+            type=int,
+            help='Server process to sample RSS from in http mode (default: none)',
+        )
+        parser.add_argument('--rss-interval', type=float, default=1.0, help='Seconds between RSS samples')
+        parser.add_argument(
+            '--password',
+            type=str,
+            help='Password set on the generated loadtest users; required for --mode http, which logs in with it. '
+                 'Without it the users cannot log in.',
+        )
+        parser.add_argument('--timeout', type=float, default=120.0, help='HTTP request timeout in seconds')
+        parser.add_argument('--output', type=str, help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if options['candidates'] < 1:
+            raise CommandError('--candidates must be at least 1')
+        if options['mode'] == 'http' and not options['password']:
+            raise CommandError('--password is required for --mode http')
+
+        if options['case_id']:
+            if not Case.objects.filter(case_id=options['case_id']).exists():
+                raise CommandError(f"Case {options['case_id']} not found")
+            case_ids = [options['case_id']]
+        else:
+            case_ids = list(Case.objects.values_list('case_id', flat=True))
+            if not case_ids:
+                raise CommandError('No cases found in database')
+
+        scripts = []
+        if options['transcripts']:
+            try:
+                scripts.extend(load_scripts(options['transcripts']))
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read transcripts: {e}")
+        if options['recorded']:
+            scripts.extend(recorded_scripts(options['recorded']))
+        if not scripts:
+            scripts = [DEFAULT_SCRIPT]
+
+        password = options['password'] if options['mode'] == 'http' else None
+        users = self._loadtest_users(options['candidates'], password)
+        if options['mode'] == 'http':
+            def make_transport(index):
+                return HttpTransport(options['base_url'], users[index].username, options['password'], options['timeout'])
+            rss_pid = options['server_pid']
+        else:
+            def make_transport(index):
+                return InProcessTransport(users[index])
+            rss_pid = None
+
+        load_test = LoadTest(
+            make_transport,
+            case_ids,
+            scripts,
+            candidates=options['candidates'],
+            interact_mode=options['interact'],
+            tts=options['tts'],
+            think_time=options['think_time'],
+            ramp_up=options['ramp_up'],
+            max_turns=options['turns'],
+            seed=options['seed'],
+            rss_pid=rss_pid,
+            rss_interval=options['rss_interval'],
+        )
+        report = load_test.run()
+        report['config']['mode'] = options['mode']
+        if options['mode'] == 'http':
+            report['config']['base_url'] = options['base_url']
+            if rss_pid is None:
+                report['rss'] = None
+        elif cassette_store.enabled:
+            # Replayed upstream seconds separate our own overhead from provider latency
+            report['cassette'] = cassette_store.stats()
+
+        output = json.dumps(report, indent=2)
+        if not options['output']:
+            self.stdout.write(output)
+            return
+
+        with open(options['output'], 'w') as f:
+            f.write(output + '\n')
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        self.stdout.write(
+            f"{report['requests']} requests in {report['duration_seconds']}s, "
+            f"{report['throughput']['requests_per_second']} req/s, error rate {report['error_rate'] * 100:.1f}%"
+        )
+        for name, stats in report['endpoints'].items():
+            latency = stats['latency_ms']
+            self.stdout.write(
+                f"  {name}: n={stats['count']} p50={latency['p50']}ms p95={latency['p95']}ms "
+                f"p99={latency['p99']}ms errors={stats['errors']}"
+            )
+
+    def _loadtest_users(self, count, password):
+        """Get or create one user per candidate (username and email loadtest<i>@example.com)
+
+        Args:
+            count: Number of users
+            password: Password to set, or None to leave the accounts unable to log in
+
+        Returns:
+            List[User]: One user per candidate
+        """
+        users = []
+        for i in range(count):
+            email = f'loadtest{i}@example.com'
+            user, created = User.objects.get_or_create(username=email, defaults={'email': email})
+            if password is not None:
+                user.set_password(password)
+                user.save()
+            elif created or user.has_usable_password():
+                user.set_unusable_password()
+                user.save()
+            users.append(user)
+        return users
@@ -0,0 +1,77 @@
+"""
+Management command to pre-render examiner findings audio
+
+Usage: python manage.py prerender_findings_audio [--case-id CASE] [--synthesizer local|openai] [--force]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from simulation.db_utils import MedicalCasesQuery
+from simulation.ai_core.findings_index import get_findings_index
+from simulation.ai_core.findings_audio import prerender_case_audio
+from simulation.ai_core.tts import get_synthesizer, DEFAULT_VOICE, DEFAULT_MODEL
+
+
+class Command(BaseCommand):
+    help = 'Synthesize audio for every examiner findings snippet and store it for static serving'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--case-id',
+            type=str,
+            help='Only render this case (default: all cases)',
+        )
+        parser.add_argument(
+            '--synthesizer',
+            type=str,
+            default=None,
+            help='TTS backend: openai, local or fake (default: TTS_SYNTHESIZER, or fake with AI_PROVIDER=local, else openai)',
+        )
+        parser.add_argument('--voice', type=str, default=DEFAULT_VOICE, help='Voice name')
+        parser.add_argument('--model', type=str, default=DEFAULT_MODEL, help='TTS model name')
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Re-synthesize snippets that already have audio',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            synthesizer = get_synthesizer(options['synthesizer'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not synthesizer.available():
+            raise CommandError(f'TTS synthesizer "{synthesizer.name}" is not configured')
+
+        db_query = MedicalCasesQuery()
+        try:
+            case_ids = [options['case_id']] if options['case_id'] else db_query.get_all_case_ids()
+            totals = {'snippets': 0, 'rendered': 0, 'reused': 0, 'failed': 0}
+
+            for case_id in case_ids:
+                case_data = db_query.get_case_with_content(case_id)
+                if not case_data:
+                    self.stdout.write(self.style.WARNING(f'Case {case_id} not found'))
+                    continue
+
+                index = get_findings_index(
+                    case_id,
+                    case_data.get('info_for_facilitator_exam_findings', ''),
+                    case_data.get('examination_details', ''),
+                )
+                stats = prerender_case_audio(
+                    index, synthesizer,
+                    voice=options['voice'], model=options['model'], force=options['force'],
+                )
+                for key in totals:
+                    totals[key] += stats[key]
+                self.stdout.write(
+                    f"{case_id}: {stats['rendered']} rendered, {stats['reused']} reused, {stats['failed']} failed"
+                )
+        finally:
+            db_query.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {len(case_ids)} cases, {totals['snippets']} snippets "
+            f"({totals['rendered']} rendered, {totals['reused']} reused, {totals['failed']} failed)"
+        ))
@@ -0,0 +1,65 @@
+"""
+Management command to sync the Case model from medical_cases.db
+
+Usage: python manage.py sync_cases [--db PATH] [--batch-size N] [--dry-run] [--force]
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from simulation.case_sync import DEFAULT_BATCH_SIZE, sync_cases
+
+
+class Command(BaseCommand):
+    help = 'Create and update Case rows for cases that are new or changed in medical_cases.db'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--db',
+            help='Source database (default: database/medical_cases.db)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Cases read and written per batch (default: {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change without writing',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rewrite every case even if its version and hash match',
+        )
+
+    def handle(self, *args, **options):
+        if options['db'] and not os.path.exists(options['db']):
+            raise CommandError(f"Database not found: {options['db']}")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        started_at = time.perf_counter()
+        stats = sync_cases(
+            db_path=options['db'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            force=options['force'],
+        )
+        elapsed = time.perf_counter() - started_at
+
+        prefix = 'Dry run, nothing written: ' if stats['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{stats['created']} created, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged in {elapsed:.2f}s"
+        ))
+        if stats['missing']:
+            shown = ', '.join(stats['missing_case_ids'][:10])
+            more = f" and {stats['missing'] - 10} more" if stats['missing'] > 10 else ''
+            self.stdout.write(self.style.WARNING(
+                f"{stats['missing']} cases are no longer in the source database and were kept: {shown}{more}"
+            ))
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.5 on 2026-10-18 09:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulation', '0002_populate_case_model'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiagentstate',
+            name='usage',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.CreateModel(
+            name='UsageCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('turn', 'Turn'), ('session', 'Session'), ('case', 'Case'), ('user', 'User')], max_length=10)),
+                ('scope_key', models.CharField(max_length=150)),
+                ('day', models.DateField()),
+                ('calls', models.PositiveIntegerField(default=0)),
+                ('prompt_tokens', models.PositiveBigIntegerField(default=0)),
+                ('completion_tokens', models.PositiveBigIntegerField(default=0)),
+                ('cached_tokens', models.PositiveBigIntegerField(default=0)),
+                ('audio_characters', models.PositiveBigIntegerField(default=0)),
+                ('latency_ms', models.PositiveBigIntegerField(default=0)),
+                ('cost_usd', models.DecimalField(decimal_places=6, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('scope', 'scope_key', 'day')},
+                'indexes': [models.Index(fields=['scope', 'day'], name='usage_scope_day_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UsageBudget',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('monthly_cost_limit_usd', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('monthly_token_limit', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simulation', '0003_usage_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='source_version',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='source_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -30,6 +30,11 @@ class Case(models.Model):
     
     # Additional fields
     summary = models.TextField(blank=True)
+    
+    # medical_cases.db version and content hash this row was last synced from
+    source_version = models.IntegerField(default=0)
+    source_hash = models.CharField(max_length=64, blank=True)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -140,9 +145,53 @@ class AIAgentState(models.Model):
     feedback_generated = models.BooleanField(default=False)
     rag_queries_used = models.JSONField(default=list)
     
+    # Model usage totals for the session (tokens, audio characters, latency, cost)
+    usage = models.JSONField(default=dict)
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"AI State for {self.session}"
+
+class UsageCounter(models.Model):
+    """Aggregated model usage for one turn, session, case or user on one day"""
+    SCOPE_CHOICES = [
+        ('turn', 'Turn'),
+        ('session', 'Session'),
+        ('case', 'Case'),
+        ('user', 'User'),
+    ]
+    
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    scope_key = models.CharField(max_length=150)  # session_id:turn, session_id, case_id or user id
+    day = models.DateField()
+    
+    # Counters
+    calls = models.PositiveIntegerField(default=0)
+    prompt_tokens = models.PositiveBigIntegerField(default=0)
+    completion_tokens = models.PositiveBigIntegerField(default=0)
+    cached_tokens = models.PositiveBigIntegerField(default=0)
+    audio_characters = models.PositiveBigIntegerField(default=0)
+    latency_ms = models.PositiveBigIntegerField(default=0)
+    cost_usd = models.DecimalField(max_digits=12, decimal_places=6, default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('scope', 'scope_key', 'day')
+        indexes = [models.Index(fields=['scope', 'day'], name='usage_scope_day_idx')]
+    
+    def __str__(self):
+        return f"{self.scope} {self.scope_key} on {self.day}: {self.prompt_tokens + self.completion_tokens} tokens"
+
+class UsageBudget(models.Model):
+    """Per-user monthly usage limits; unset limits fall back to the configured defaults"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE)
+    monthly_cost_limit_usd = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    monthly_token_limit = models.PositiveBigIntegerField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Usage budget for {self.user.username}"
@@ -0,0 +1,58 @@
+from django.test import SimpleTestCase
+
+from simulation.ai_core.admission import AdmissionController, AdmissionRejected
+
+from .utils import start_thread, wait_until
+
+
+class AdmissionControllerTests(SimpleTestCase):
+    """Concurrency limits, bounded queueing and priority admission"""
+
+    def test_full_queue_rejects_immediately(self):
+        controller = AdmissionController(max_concurrent=1, max_queue=0)
+        controller.acquire('interact')
+
+        with self.assertRaises(AdmissionRejected) as raised:
+            controller.acquire('interact')
+        self.assertEqual(raised.exception.reason, 'queue_full')
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+        self.assertEqual(controller.get_metrics()['endpoints']['interact']['rejected_queue_full'], 1)
+
+    def test_waiter_is_rejected_after_the_queue_timeout(self):
+        controller = AdmissionController(max_concurrent=1, queue_timeout=0.05)
+        controller.acquire('interact')
+
+        with self.assertRaises(AdmissionRejected) as raised:
+            controller.acquire('interact')
+        self.assertEqual(raised.exception.reason, 'timeout')
+        self.assertEqual(controller.get_metrics()['queue_depth'], 0)
+
+    def test_endpoint_limit_does_not_block_other_endpoints(self):
+        controller = AdmissionController(max_concurrent=4, limits={'tts': 1}, queue_timeout=0.05)
+        controller.acquire('tts')
+
+        with self.assertRaises(AdmissionRejected):
+            controller.acquire('tts')
+        self.assertEqual(controller.acquire('interact'), 0.0)
+        self.assertEqual(controller.get_metrics()['in_flight'], 2)
+
+    def test_release_admits_higher_priority_waiters_first(self):
+        controller = AdmissionController(max_concurrent=1, queue_timeout=2)
+        controller.acquire('interact')
+        admitted = []
+
+        def wait_for_slot(endpoint):
+            controller.acquire(endpoint)
+            admitted.append(endpoint)
+            controller.release(endpoint)
+
+        threads = [start_thread(wait_for_slot, 'tts')]
+        self.assertTrue(wait_until(lambda: controller.get_metrics()['queue_depth'] == 1))
+        threads.append(start_thread(wait_for_slot, 'interact'))
+        self.assertTrue(wait_until(lambda: controller.get_metrics()['queue_depth'] == 2))
+
+        controller.release('interact')
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(admitted, ['interact', 'tts'])
+        self.assertEqual(controller.get_metrics()['in_flight'], 0)
@@ -0,0 +1,177 @@
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from simulation.benchmarks.suite import load_ingest_module, write_case_corpus
+
+ingest = load_ingest_module()
+
+# Exercises the quirks the streaming parser keeps from the original re.split implementation
+SOURCE = """Preamble text before any case is ignored.
+[CASE_ID: Alice_Able]
+[SECTION_ID: Cardiology]
+[SECTION: Instruction_for_doc]
+[SUMMARY] A 54 year old with chest pain.
+[scenario] You are in the emergency department.
+[CASE_TYPE: Acute]
+[SUMMARY] A second summary line.
+[SECTION_ID: Ignored_Category]
+[SECTION: Instructions_for_patient]
+[INSTRUCTION] Be anxious.
+Mention [brackets] in passing.
+[SECTION:
+Text after a bare section break is dropped.
+[CASE_ID: Bob_Baker]
+[SECTION: Marking_Scheme]
+[PITFALL] Missing the diagnosis.
+[DIAGNOSIS] Angina.
+[CASE_TYPE:   ]
+[SECTION_ID: Respiratory]
+"""
+
+# Output of the original parser for SOURCE
+EXPECTED = [
+    {
+        'case_id': 'Alice_Able',
+        'category': 'Cardiology',
+        'sections': [
+            {
+                'section_type': 'Instruction_for_doc',
+                'content': '[SUMMARY] A 54 year old with chest pain.\n'
+                           '[scenario] You are in the emergency department.\n'
+                           '[CASE_TYPE: Acute]\n'
+                           '[SUMMARY] A second summary line.\n'
+                           '[SECTION_ID: Ignored_Category]',
+                'subsections': [
+                    {'subsection_type': 'scenario', 'content': 'You are in the emergency department.'},
+                    {'subsection_type': 'SUMMARY', 'content': 'A 54 year old with chest pain.'},
+                    {'subsection_type': 'SUMMARY', 'content': 'A second summary line.'},
+                    {'subsection_type': 'CASE_TYPE', 'content': 'Acute'},
+                ],
+            },
+            {
+                'section_type': 'Instructions_for_patient',
+                'content': '[INSTRUCTION] Be anxious.\nMention [brackets] in passing.',
+                'subsections': [{'subsection_type': 'INSTRUCTION', 'content': 'Be anxious.\nMention'}],
+            },
+        ],
+    },
+    {
+        'case_id': 'Bob_Baker',
+        'category': 'Respiratory',
+        'sections': [
+            {
+                'section_type': 'Marking_Scheme',
+                'content': '[PITFALL] Missing the diagnosis.\n'
+                           '[DIAGNOSIS] Angina.\n'
+                           '[CASE_TYPE:   ]\n'
+                           '[SECTION_ID: Respiratory]',
+                'subsections': [
+                    {'subsection_type': 'DIAGNOSIS', 'content': 'Angina.'},
+                    {'subsection_type': 'PITFALL', 'content': 'Missing the diagnosis.'},
+                ],
+            },
+        ],
+    },
+]
+
+
+class CaseParserTests(SimpleTestCase):
+    """The single-pass parser produces the same cases as the original implementation"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.db = ingest.MedicalCasesDatabase(':memory:')
+
+    def write_source(self, text):
+        path = os.path.join(self.directory, 'cases.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_parse_matches_the_original_output(self):
+        self.assertEqual(self.db.parse_text_file(self.write_source(SOURCE)), EXPECTED)
+
+    def test_iter_cases_yields_the_parsed_cases_in_order(self):
+        path = write_case_corpus(os.path.join(self.directory, 'corpus.txt'), 50, seed=3)
+
+        cases = list(self.db.iter_cases(path))
+
+        self.assertEqual(cases, self.db.parse_text_file(path))
+        self.assertEqual(len({case['case_id'] for case in cases}), 50)
+        self.assertTrue(all(case['category'] and case['sections'] for case in cases))
+
+
+class CaseIngestTests(SimpleTestCase):
+    """Re-running the ingest skips unchanged cases and replaces only the ones that changed"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db = ingest.MedicalCasesDatabase(os.path.join(directory.name, 'medical_cases.db'))
+        self.db.connect()
+        self.addCleanup(self.db.close)
+        self.db.create_tables()
+        self.cases = ingest.MedicalCasesDatabase(':memory:').parse_text_file(
+            write_case_corpus(os.path.join(directory.name, 'corpus.txt'), 20, seed=5)
+        )
+
+    def query(self, sql, *params):
+        return self.db.conn.execute(sql, params).fetchall()
+
+    def snapshot(self):
+        return (
+            self.query("SELECT case_id, category_id, content_hash, version FROM cases ORDER BY case_id"),
+            self.query("SELECT case_id, section_type, content FROM sections ORDER BY case_id, id"),
+            self.query("SELECT COUNT(*) FROM subsections"),
+        )
+
+    def edited(self, case, text):
+        sections = [dict(section) for section in case['sections']]
+        sections[0]['content'] += text
+        return dict(case, sections=sections)
+
+    def test_rerun_is_idempotent(self):
+        self.assertEqual(self.db.insert_data(self.cases), {'inserted': 20, 'updated': 0, 'unchanged': 0})
+        before = self.snapshot()
+
+        self.assertEqual(self.db.insert_data(iter(self.cases)), {'inserted': 0, 'updated': 0, 'unchanged': 20})
+        self.assertEqual(self.snapshot(), before)
+
+    def test_changed_case_is_replaced_and_versioned(self):
+        self.db.insert_data(self.cases)
+        before = self.snapshot()
+        target = self.cases[3]
+        cases = list(self.cases)
+        cases[3] = self.edited(target, '\nAn added line.')
+
+        self.assertEqual(self.db.insert_data(cases, batch_size=7), {'inserted': 0, 'updated': 1, 'unchanged': 19})
+
+        version, = self.query("SELECT version FROM cases WHERE case_id = ?", target['case_id'])[0]
+        self.assertEqual(version, 2)
+        sections = self.query("SELECT content FROM sections WHERE case_id = ? ORDER BY id", target['case_id'])
+        self.assertEqual(len(sections), len(target['sections']))
+        self.assertTrue(sections[0][0].endswith('An added line.'))
+        # Every other case keeps its rows
+        after = self.snapshot()
+        for table in (0, 1):
+            self.assertEqual(
+                [row for row in after[table] if row[0] != target['case_id']],
+                [row for row in before[table] if row[0] != target['case_id']]
+            )
+
+    def test_repeated_case_id_keeps_its_last_content(self):
+        first = self.cases[0]
+        last = self.edited(first, '\nThe later copy.')
+
+        stats = self.db.insert_data([first] + self.cases[1:5] + [last], batch_size=2)
+
+        self.assertEqual(stats, {'inserted': 5, 'updated': 0, 'unchanged': 0})
+        rows = self.query("SELECT version, content_hash FROM cases WHERE case_id = ?", first['case_id'])
+        self.assertEqual(rows, [(1, ingest.MedicalCasesDatabase.content_hash(last))])
+        self.assertEqual(
+            len(self.query("SELECT id FROM sections WHERE case_id = ?", first['case_id'])), len(last['sections'])
+        )
@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+from django.test import TestCase
+
+from simulation.benchmarks.suite import build_cases_db, load_ingest_module
+from simulation.case_sync import sync_cases
+from simulation.models import Case
+
+ingest = load_ingest_module()
+
+
+class SyncCasesTests(TestCase):
+    """Case rows are created, updated or left alone according to the source version and hash"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.db_path = os.path.join(directory.name, 'medical_cases.db')
+        source_path = build_cases_db(self.db_path, 12, seed=7)
+        self.cases = ingest.MedicalCasesDatabase(':memory:').parse_text_file(source_path)
+        # Start from an empty table rather than the cases loaded by the data migration
+        Case.objects.all().delete()
+
+    def edit_source(self, index, text):
+        case = self.cases[index]
+        sections = [dict(section) for section in case['sections']]
+        sections[0]['content'] += text
+        db = ingest.MedicalCasesDatabase(self.db_path)
+        db.connect()
+        try:
+            db.insert_data([dict(case, sections=sections)])
+        finally:
+            db.close()
+        return case['case_id']
+
+    def test_first_sync_creates_every_case(self):
+        result = sync_cases(self.db_path)
+
+        self.assertEqual((result['created'], result['updated'], result['unchanged']), (12, 0, 0))
+        self.assertEqual(Case.objects.count(), 12)
+        case = Case.objects.get(case_id=self.cases[0]['case_id'])
+        self.assertEqual(case.category, self.cases[0]['category'])
+        self.assertEqual(case.source_version, 1)
+
+    def test_unchanged_cases_are_skipped(self):
+        sync_cases(self.db_path)
+
+        result = sync_cases(self.db_path, batch_size=5)
+
+        self.assertEqual((result['created'], result['updated'], result['unchanged']), (0, 0, 12))
+
+    def test_changed_case_is_updated_in_place(self):
+        sync_cases(self.db_path)
+        case_id = self.edit_source(4, '\nAn added line.')
+
+        result = sync_cases(self.db_path, batch_size=5)
+
+        self.assertEqual((result['created'], result['updated'], result['unchanged']), (0, 1, 11))
+        self.assertEqual(Case.objects.count(), 12)
+        self.assertEqual(Case.objects.get(case_id=case_id).source_version, 2)
+
+    def test_force_rewrites_every_case(self):
+        sync_cases(self.db_path)
+
+        result = sync_cases(self.db_path, force=True)
+
+        self.assertEqual((result['created'], result['updated'], result['unchanged']), (0, 12, 0))
+
+    def test_dry_run_reports_without_writing(self):
+        result = sync_cases(self.db_path, dry_run=True)
+
+        self.assertEqual(result['created'], 12)
+        self.assertTrue(result['dry_run'])
+        self.assertEqual(Case.objects.count(), 0)
+
+    def test_cases_missing_from_the_source_are_reported_and_kept(self):
+        Case.objects.create(case_id='retired-case', category='General')
+
+        result = sync_cases(self.db_path)
+
+        self.assertEqual(result['missing_case_ids'], ['retired-case'])
+        self.assertTrue(Case.objects.filter(case_id='retired-case').exists())
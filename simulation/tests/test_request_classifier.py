@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+
+from simulation.ai_core.request_classifier import request_classifier
+from simulation.benchmarks.classifier import run_classifier_benchmark
+from simulation.benchmarks.examiner_utterances import COMPOUND_UTTERANCES
+
+
+class CompoundRequestTests(SimpleTestCase):
+    """Splitting compound examiner requests into typed sub-requests"""
+
+    def split(self, text):
+        return [(sub['request_type'], sub['keywords']) for sub in request_classifier.analyze_compound(text)]
+
+    def test_labeled_compound_utterances_split_as_expected(self):
+        report = run_classifier_benchmark(repeat=1)
+        self.assertEqual(report['compound_missplit'], [])
+        self.assertEqual(report['misclassified'], [])
+        self.assertEqual(report['compound_utterances'], len(COMPOUND_UTTERANCES))
+
+    def test_body_part_after_vitals_asks_for_an_examination(self):
+        self.assertEqual(
+            self.split('the vitals and the chest and abdomen'),
+            [('vital_signs', []), ('physical_exam', ['chest', 'abdomen'])],
+        )
+
+    def test_body_part_after_labs_asks_for_an_examination(self):
+        self.assertEqual(self.split('a full blood count and the ears'), [('lab_results', []), ('physical_exam', ['ears'])])
+
+    def test_body_part_extends_imaging_that_names_a_body_part(self):
+        self.assertEqual(self.split('an x-ray of the chest and abdomen'), [('imaging', ['chest', 'abdomen'])])
+        self.assertEqual(self.split('an ECG and the chest'), [('imaging', []), ('physical_exam', ['chest'])])
+
+    def test_parts_of_the_same_type_are_merged_in_the_order_first_asked(self):
+        sub_requests = request_classifier.analyze_compound('examine the chest, the vitals and then palpate the abdomen')
+        self.assertEqual([sub['request_type'] for sub in sub_requests], ['physical_exam', 'vital_signs'])
+        self.assertEqual(sub_requests[0]['cleaned_request'], 'examine the chest, palpate the abdomen')
+
+    def test_filler_only_request_falls_back_to_a_single_analysis(self):
+        self.assertEqual(self.split('please'), [('general_findings', [])])
@@ -0,0 +1,107 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from simulation.ai_core.resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, _dependencies, get_dependency, resilient_call,
+)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    """Breaker state transitions, driven by a fake clock"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('simulation.ai_core.resilience.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def open_breaker(self, **kwargs):
+        breaker = CircuitBreaker('test', consecutive_failures=3, open_seconds=10, **kwargs)
+        for _ in range(3):
+            breaker.allow_request()
+            breaker.record_failure(0.1)
+        return breaker
+
+    def test_consecutive_failures_open_the_circuit(self):
+        breaker = self.open_breaker()
+
+        self.assertEqual(breaker.state, OPEN)
+        self.now += 4
+        with self.assertRaises(CircuitOpenError) as raised:
+            breaker.allow_request()
+        self.assertEqual(raised.exception.retry_after, 6)
+
+    def test_failure_rate_opens_the_circuit_once_minimum_calls_are_seen(self):
+        breaker = CircuitBreaker('test', consecutive_failures=100, minimum_calls=4, failure_rate_threshold=0.5)
+        for failed in (True, False, True):
+            breaker.record_failure(0.1) if failed else breaker.record_success(0.1)
+        self.assertEqual(breaker.state, CLOSED)
+
+        breaker.record_success(0.1)
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_successful_probe_closes_the_circuit(self):
+        breaker = self.open_breaker()
+        self.now += 10
+
+        self.assertEqual(breaker.state, HALF_OPEN)
+        breaker.allow_request()
+        with self.assertRaises(CircuitOpenError):
+            breaker.allow_request()  # Only one probe at a time
+        breaker.record_success(0.1)
+
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.get_state()['consecutive_failures'], 0)
+
+    def test_failed_or_slow_probe_reopens_the_circuit(self):
+        breaker = self.open_breaker(slow_call_seconds=5)
+        self.now += 10
+        breaker.allow_request()
+        breaker.record_failure(0.1)
+        self.assertEqual(breaker.state, OPEN)
+
+        self.now += 10
+        breaker.allow_request()
+        breaker.record_success(6)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.get_state()['times_opened'], 3)
+
+    def test_ignored_probe_frees_the_probe_slot(self):
+        breaker = self.open_breaker()
+        self.now += 10
+        breaker.allow_request()
+        breaker.record_ignored()
+
+        breaker.allow_request()
+        self.assertEqual(breaker.state, HALF_OPEN)
+
+
+class ResilientCallTests(SimpleTestCase):
+    """Which errors count against a dependency's breaker"""
+
+    def setUp(self):
+        self.dependency = get_dependency('test-dependency')
+        self.dependency.max_retries = 0
+        self.dependency.breaker = CircuitBreaker('test-dependency', consecutive_failures=2)
+        self.addCleanup(_dependencies.pop, 'test-dependency', None)
+
+    def test_non_retryable_errors_leave_the_breaker_closed(self):
+        def bad_request():
+            raise ValueError('bad request')
+
+        for _ in range(5):
+            with self.assertRaises(ValueError):
+                resilient_call('test-dependency', bad_request)
+        self.assertEqual(self.dependency.breaker.state, CLOSED)
+        self.assertEqual(self.dependency.breaker.get_state()['calls_in_window'], 0)
+
+    def test_upstream_errors_open_the_breaker(self):
+        def outage():
+            raise ConnectionError('upstream down')
+
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                resilient_call('test-dependency', outage)
+        with self.assertRaises(CircuitOpenError):
+            resilient_call('test-dependency', lambda: 'never called')
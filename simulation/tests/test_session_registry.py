@@ -0,0 +1,149 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from simulation.ai_core.session_registry import SessionNotFound, SessionRegistry, TurnQueue
+
+from .utils import start_thread, wait_until
+
+
+class TurnQueueTests(SimpleTestCase):
+    """Per-session turn serialization and turn_id coalescing"""
+
+    def test_turns_run_one_at_a_time_in_submission_order(self):
+        queue = TurnQueue()
+        release = threading.Event()
+        order = []
+
+        def first():
+            release.wait(2)
+            order.append(1)
+
+        threads = [start_thread(queue.submit, first)]
+        self.assertTrue(wait_until(lambda: queue.depth == 1))
+        for number in (2, 3):
+            threads.append(start_thread(queue.submit, lambda number=number: order.append(number)))
+            self.assertTrue(wait_until(lambda number=number: queue.depth == number))
+
+        self.assertEqual(order, [])
+        release.set()
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(order, [1, 2, 3])
+        self.assertEqual(queue.depth, 0)
+
+    def test_duplicate_turn_id_waits_for_and_shares_the_original_result(self):
+        queue = TurnQueue()
+        release = threading.Event()
+        duplicate_ran = []
+        results = {}
+
+        def original():
+            release.wait(2)
+            return 'reply'
+
+        def submit(name, func):
+            results[name] = queue.submit(func, turn_id='turn-1')
+
+        threads = [start_thread(submit, 'original', original)]
+        self.assertTrue(wait_until(lambda: queue.depth == 1))
+        threads.append(start_thread(submit, 'duplicate', lambda: duplicate_ran.append(True)))
+
+        release.set()
+        for thread in threads:
+            thread.join(2)
+        self.assertEqual(results['original'], ('reply', False))
+        self.assertEqual(results['duplicate'], ('reply', True))
+        self.assertEqual(duplicate_ran, [])
+
+        # A retry after the turn finished is answered from the remembered result
+        self.assertEqual(queue.submit(lambda: 'other', turn_id='turn-1'), ('reply', True))
+
+    def test_retry_of_a_failed_turn_runs_it_again(self):
+        queue = TurnQueue()
+
+        def fail():
+            raise ConnectionError('upstream unavailable')
+
+        with self.assertRaises(ConnectionError):
+            queue.submit(fail, turn_id='turn-1')
+        self.assertEqual(queue.submit(lambda: 'reply', turn_id='turn-1'), ('reply', False))
+        self.assertEqual(queue.submit(lambda: 'other', turn_id='turn-1'), ('reply', True))
+
+    def test_duplicate_waiting_on_a_failed_turn_runs_it_itself(self):
+        queue = TurnQueue()
+        release = threading.Event()
+        results = {}
+
+        def fail():
+            release.wait(2)
+            raise ConnectionError('upstream unavailable')
+
+        def submit(name, func):
+            try:
+                results[name] = queue.submit(func, turn_id='turn-1')
+            except ConnectionError as e:
+                results[name] = e
+
+        threads = [start_thread(submit, 'original', fail)]
+        self.assertTrue(wait_until(lambda: queue.depth == 1))
+        threads.append(start_thread(submit, 'retry', lambda: 'reply'))
+
+        release.set()
+        for thread in threads:
+            thread.join(2)
+        self.assertIsInstance(results['original'], ConnectionError)
+        self.assertEqual(results['retry'], ('reply', False))
+        self.assertEqual(queue.depth, 0)
+
+    def test_remembered_turn_ids_are_bounded(self):
+        queue = TurnQueue(max_remembered_turns=2)
+        for turn_id in ('a', 'b', 'c'):
+            queue.submit(lambda: turn_id, turn_id=turn_id)
+
+        self.assertEqual(queue.submit(lambda: 'rerun', turn_id='a'), ('rerun', False))
+        self.assertEqual(queue.submit(lambda: 'rerun', turn_id='c'), ('c', True))
+
+
+class SessionRegistryTests(SimpleTestCase):
+    """Striped session storage"""
+
+    def test_sessions_on_the_same_stripe_do_not_serialize_each_others_turns(self):
+        registry = SessionRegistry(stripes=1)
+        registry['a'] = {}
+        registry['b'] = {}
+        release = threading.Event()
+
+        thread = start_thread(registry.run_turn, 'a', lambda: release.wait(2))
+        self.assertTrue(wait_until(lambda: registry.queue_depth('a') == 1))
+        self.assertEqual(registry.run_turn('b', lambda: 'done'), ('done', False))
+        self.assertEqual(registry.queue_depth('a'), 1)
+
+        release.set()
+        thread.join(2)
+
+    def test_run_turn_for_unknown_session_raises_session_not_found(self):
+        registry = SessionRegistry()
+        with self.assertRaises(SessionNotFound):
+            registry.run_turn('missing', lambda: None)
+
+    def test_errors_from_the_turn_are_not_reported_as_missing_sessions(self):
+        registry = SessionRegistry()
+        registry['a'] = {}
+
+        def turn():
+            return {}['absent']
+
+        with self.assertRaises(KeyError) as raised:
+            registry.run_turn('a', turn)
+        self.assertNotIsInstance(raised.exception, SessionNotFound)
+
+    def test_pop_removes_the_session_and_its_turn_queue(self):
+        registry = SessionRegistry(stripes=4)
+        registry['a'] = {'case_id': 'c1'}
+
+        self.assertIn('a', registry)
+        self.assertEqual(registry.pop('a'), {'case_id': 'c1'})
+        self.assertNotIn('a', registry)
+        self.assertIsNone(registry.turn_queue('a'))
+        self.assertEqual(len(registry), 0)
@@ -0,0 +1,125 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from simulation import api_views
+from simulation.ai_core.ai_service import ai_service
+from simulation.ai_core.resilience import CircuitOpenError
+from simulation.ai_core.state_token import StateTokenError, decode_state, encode_state
+from simulation.models import AIAgentState, Case, Session
+
+
+class StateTokenRoundTripTests(TestCase):
+    """Signing and compressing session snapshots"""
+
+    state = {
+        'session_id': 'session-1', 'case_id': 'case-1', 'turn': 4,
+        'patient_paused': True, 'messages': [{'type': 'human', 'content': 'Hello'}],
+    }
+
+    def test_decoded_token_matches_the_encoded_state(self):
+        self.assertEqual(decode_state(encode_state(self.state)), self.state)
+
+    def test_tampered_token_is_rejected(self):
+        token = encode_state(self.state)
+
+        with self.assertRaises(StateTokenError):
+            decode_state(token[:-2] + 'xx')
+
+
+class StateTokenTurnTests(TestCase):
+    """Each token serves one turn, after turn_id coalescing and only if the turn succeeds"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='unused')
+        case = Case.objects.create(case_id='case-1', category='General')
+        self.session = Session.objects.create(user=self.user, case=case, session_id='session-1')
+        AIAgentState.objects.create(session=self.session)
+        self.client.force_login(self.user)
+
+        patient_agent = mock.Mock(is_paused=False)
+        patient_agent.memory.export_messages.return_value = []
+        # This worker already holds the session at turn 0, so no token needs a rebuild
+        ai_service.active_sessions['session-1'] = {
+            'user': self.user,
+            'case_data': {'case_id': 'case-1'},
+            'patient_agent': patient_agent,
+            'session_id': 'session-1',
+            'is_active': True,
+            'turn': 0,
+            'turns_processed': 0,
+        }
+        self.addCleanup(ai_service.active_sessions.pop, 'session-1', None)
+
+        self.process_turn = mock.patch.object(ai_service, '_process_turn', return_value={
+            'response': 'It hurts here.', 'type': 'patient_response', 'patient_paused': False, 'sections': [],
+        }).start()
+        self.addCleanup(mock.patch.stopall)
+        mock.patch.object(api_views, 'STATE_TOKENS_ENABLED', True).start()
+
+    def token(self, turn, session_id='session-1'):
+        return encode_state({
+            'session_id': session_id, 'case_id': 'case-1', 'turn': turn,
+            'patient_paused': False, 'messages': [],
+        })
+
+    def interact(self, token, turn_id=None):
+        body = {'session_id': 'session-1', 'user_input': 'Where does it hurt?', 'state_token': token}
+        if turn_id:
+            body['turn_id'] = turn_id
+        return self.client.post('/api/interact/', json.dumps(body), content_type='application/json')
+
+    def current_turn(self):
+        return Session.objects.get(pk=self.session.pk).current_turn
+
+    def test_a_token_serves_exactly_one_turn(self):
+        token = self.token(0)
+
+        response = self.interact(token, 'turn-1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(decode_state(response.json()['state_token'])['turn'], 1)
+        self.assertEqual(self.current_turn(), 1)
+
+        replayed = self.interact(token, 'turn-2')
+        self.assertEqual(replayed.status_code, 409)
+        # This worker holds the latest turn, so the owner can resynchronise
+        self.assertEqual(decode_state(replayed.json()['state_token'])['turn'], 1)
+        self.assertEqual(self.current_turn(), 1)
+        self.assertEqual(self.process_turn.call_count, 1)
+
+    def test_retried_turn_id_is_coalesced_with_a_state_token(self):
+        token = self.token(0)
+        self.interact(token, 'turn-1')
+
+        retried = self.interact(token, 'turn-1')
+
+        self.assertEqual(retried.status_code, 200)
+        self.assertTrue(retried.json()['duplicate'])
+        self.assertEqual(retried.json()['response'], 'It hurts here.')
+        self.assertEqual(decode_state(retried.json()['state_token'])['turn'], 1)
+        self.assertEqual(self.current_turn(), 1)
+        self.assertEqual(self.process_turn.call_count, 1)
+
+    def test_failed_turn_gives_its_token_back(self):
+        token = self.token(0)
+        self.process_turn.side_effect = CircuitOpenError('openai', 5)
+
+        self.assertEqual(self.interact(token, 'turn-1').status_code, 503)
+        self.assertEqual(self.current_turn(), 0)
+        self.assertEqual(ai_service.get_turn('session-1'), 0)
+
+        self.process_turn.side_effect = None
+        self.assertEqual(self.interact(token, 'turn-1').status_code, 200)
+        self.assertEqual(self.current_turn(), 1)
+
+    def test_token_from_a_future_turn_is_rejected(self):
+        self.assertEqual(self.interact(self.token(3)).status_code, 409)
+        self.assertEqual(self.current_turn(), 0)
+        self.process_turn.assert_not_called()
+
+    def test_token_for_another_session_or_tampered_token_is_rejected(self):
+        self.assertEqual(self.interact(self.token(0, session_id='session-2')).status_code, 400)
+        self.assertEqual(self.interact(self.token(0)[:-2] + 'xx').status_code, 400)
+        self.assertEqual(self.current_turn(), 0)
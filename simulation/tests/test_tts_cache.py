@@ -0,0 +1,70 @@
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from simulation.ai_core.tts_cache import TTSAudioCache
+
+from .utils import start_thread, wait_until
+
+
+class TTSAudioCacheTests(SimpleTestCase):
+    """Singleflight synthesis and byte-capped LRU eviction"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+
+    def test_concurrent_identical_requests_synthesize_once(self):
+        cache = TTSAudioCache(self.root)
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def synthesize():
+            calls.append(True)
+            release.wait(2)
+            return b'audio'
+
+        def request():
+            results.append(cache.get_or_synthesize('Hello.', 'alloy', 'tts-1', 'mp3', synthesize))
+
+        threads = [start_thread(request) for _ in range(5)]
+        self.assertTrue(wait_until(lambda: calls))
+        release.set()
+        for thread in threads:
+            thread.join(2)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([data for data, _ in results], [b'audio'] * 5)
+        self.assertEqual([status for _, status in results].count('miss'), 1)
+        self.assertEqual(cache.get_or_synthesize('Hello.', 'alloy', 'tts-1', 'mp3', synthesize), (b'audio', 'hit'))
+        self.assertEqual(len(calls), 1)
+
+    def test_least_recently_used_entries_are_evicted_over_the_byte_cap(self):
+        cache = TTSAudioCache(self.root, max_bytes=250)
+        keys = [cache.make_key(text, 'alloy', 'tts-1', 'mp3') for text in ('a', 'b', 'c')]
+        cache.put(keys[0], b'a' * 100, 'mp3')
+        cache.put(keys[1], b'b' * 100, 'mp3')
+        cache.get(keys[0])  # Now more recently used than b
+        cache.put(keys[2], b'c' * 100, 'mp3')
+
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNone(cache.path_for(f'{keys[1]}.mp3'))
+        self.assertEqual(cache.get(keys[0]), b'a' * 100)
+        self.assertEqual(cache.get(keys[2]), b'c' * 100)
+        self.assertEqual(cache.get_stats()['evictions'], 1)
+
+    def test_cached_stream_opens_the_file_only_when_read(self):
+        cache = TTSAudioCache(self.root)
+        key = cache.make_key('Hello.', 'alloy', 'tts-1', 'mp3')
+        cache.put(key, b'x' * 100, 'mp3')
+
+        with mock.patch('builtins.open', wraps=open) as opened:
+            chunks, status = cache.stream_or_synthesize('Hello.', 'alloy', 'tts-1', 'mp3', stream=None, chunk_size=30)
+            self.assertEqual(status, 'hit')
+            opened.assert_not_called()
+            self.assertEqual(b''.join(chunks), b'x' * 100)
+        opened.assert_called_once()
@@ -0,0 +1,152 @@
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from simulation import api_views
+from simulation.ai_core.tts_cache import TTSAudioCache
+from simulation.ai_core.usage import UsageLedger
+from simulation.models import UsageBudget, UsageCounter
+
+
+class UsageLedgerFlushTests(TestCase):
+    """Counters aggregate in memory and are written in batches"""
+
+    def setUp(self):
+        self.ledger = UsageLedger(flush_interval=3600, prices={'tts-1': {'characters': 15.0}})
+
+    def record(self, characters=1000):
+        with self.ledger.scope(user_id=7, session_id='session-1', case_id='case-1', turn=2):
+            self.ledger.record('tts', 'tts-1', audio_characters=characters)
+
+    def counter(self, scope, key):
+        return UsageCounter.objects.get(scope=scope, scope_key=key, day=date.today())
+
+    def test_flush_writes_one_row_per_scope(self):
+        self.record()
+        self.record()
+
+        self.assertEqual(UsageCounter.objects.count(), 0)
+        self.assertEqual(self.ledger.flush(), 4)
+
+        for scope, key in (('turn', 'session-1:2'), ('session', 'session-1'), ('case', 'case-1'), ('user', '7')):
+            counter = self.counter(scope, key)
+            self.assertEqual(counter.calls, 2)
+            self.assertEqual(counter.audio_characters, 2000)
+        self.assertEqual(float(self.counter('user', '7').cost_usd), 0.03)
+
+    def test_later_flushes_add_to_existing_rows(self):
+        self.record()
+        self.ledger.flush()
+        self.record(characters=500)
+
+        self.assertEqual(self.ledger.flush(), 4)
+        self.assertEqual(self.counter('session', 'session-1').audio_characters, 1500)
+        self.assertEqual(self.ledger.flush(), 0)
+
+    def test_calls_outside_a_scope_are_not_attributed(self):
+        self.ledger.record('tts', 'tts-1', audio_characters=10)
+
+        self.assertEqual(self.ledger.flush(), 0)
+        self.assertEqual(self.ledger.get_stats()['recorded'], 1)
+
+
+class UsageBudgetTests(TestCase):
+    """Month-to-date usage, including unflushed calls, against per-user limits"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='unused')
+        self.ledger = UsageLedger(flush_interval=3600, default_token_budget=1000)
+
+    def record(self, tokens):
+        with self.ledger.scope(user_id=self.user.id):
+            self.ledger.record('llm', 'gpt-4o-mini', prompt_tokens=tokens)
+
+    def test_default_token_budget_is_enforced_before_flushing(self):
+        self.record(999)
+        self.assertIsNone(self.ledger.check_budget(self.user.id))
+
+        self.record(1)
+        exceeded = self.ledger.check_budget(self.user.id)
+        self.assertEqual(exceeded['limit'], 'monthly_token_limit')
+        self.assertEqual(exceeded['used'], 1000)
+
+    def test_usage_budget_overrides_the_default(self):
+        UsageBudget.objects.create(user=self.user, monthly_cost_limit_usd='0.01')
+        self.record(500)
+        self.assertIsNone(self.ledger.check_budget(self.user.id))
+
+        self.record(100000)
+        self.ledger.flush()
+        self.assertEqual(self.ledger.check_budget(self.user.id)['limit'], 'monthly_cost_limit_usd')
+
+    def test_limits_are_cached(self):
+        self.ledger.get_limits(self.user.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.ledger.get_limits(self.user.id)['monthly_token_limit'], 1000)
+
+
+class _RecordingSynthesizer:
+    """Streams two chunks and records the call when the stream ends, like the OpenAI synthesizer"""
+
+    format = 'wav'
+    mime_type = 'audio/wav'
+    stream_formats = {'wav': 'audio/wav'}
+
+    def __init__(self, ledger):
+        self.ledger = ledger
+
+    def available(self):
+        return True
+
+    def stream(self, text, voice=None, model=None, audio_format=None):
+        try:
+            yield b'RIFF'
+            yield b'data'
+        finally:
+            self.ledger.record('tts', 'tts-1', audio_characters=len(text))
+
+
+class TextToSpeechUsageTests(TestCase):
+    """TTS calls are attributed to the requesting user, including while the body streams"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='unused')
+        self.client.force_login(self.user)
+        self.ledger = UsageLedger(flush_interval=3600)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        mock.patch.object(api_views, 'tts_cache', TTSAudioCache(directory.name)).start()
+        mock.patch.object(api_views, 'get_synthesizer', return_value=_RecordingSynthesizer(self.ledger)).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_streamed_synthesis_is_billed_to_the_user(self):
+        response = self.client.post('/api/tts/stream/', {'text': 'Hello.'}, content_type='application/json')
+
+        self.assertEqual(b''.join(response.streaming_content), b'RIFFdata')
+        self.assertEqual(self.ledger.month_to_date(self.user.id)['audio_characters'], 6)
+
+
+class UsageViewTests(TestCase):
+    """Staff lookups of another user's usage"""
+
+    def setUp(self):
+        self.staff = User.objects.create_user('examiner', password='unused', is_staff=True)
+        self.client.force_login(self.staff)
+
+    def test_non_numeric_user_id_is_rejected(self):
+        response = self.client.get('/api/usage/', {'user_id': 'abc'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_staff_can_view_another_user(self):
+        student = User.objects.create_user('student', password='unused')
+
+        response = self.client.get('/api/usage/', {'user_id': str(student.id)})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user_id'], student.id)
@@ -0,0 +1,20 @@
+"""Helpers shared by the simulation tests"""
+
+import threading
+import time
+
+
+def wait_until(predicate, timeout=2.0):
+    """Poll until predicate() is true; False if it is still false after the timeout"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.001)
+    return True
+
+
+def start_thread(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
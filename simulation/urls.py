@@ -3,7 +3,8 @@ from . import views
 from .api_views import (
     StartSessionView, InteractView, EndSessionView, 
     SessionStateView, ResumePatientView, GetFeedbackView, SessionHistoryView,
-    TextToSpeechView
+    TextToSpeechView, TextToSpeechStreamView, AdmissionMetricsView, HealthView, FindingsAudioView,
+    MetricsView, UsageView
 )
 
 urlpatterns = [
@@ -28,4 +29,10 @@ urlpatterns = [
     path('api/feedback/<str:session_id>/', GetFeedbackView.as_view(), name='api_get_feedback'),
     path('api/session-history/', SessionHistoryView.as_view(), name='api_session_history'),
     path('api/tts/', TextToSpeechView.as_view(), name='api_tts'),
+    path('api/tts/stream/', TextToSpeechStreamView.as_view(), name='api_tts_stream'),
+    path('api/audio/<str:name>', FindingsAudioView.as_view(), name='api_findings_audio'),
+    path('api/usage/', UsageView.as_view(), name='api_usage'),
+    path('api/admission-metrics/', AdmissionMetricsView.as_view(), name='api_admission_metrics'),
+    path('api/health/', HealthView.as_view(), name='api_health'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
@@ -225,30 +225,20 @@ def case_simulation(request, case_id):
         return redirect('categories')
 
 
-@login_required
-def session_feedback(request, case_id):
-    """Render personalized AI feedback for the user's latest session of this case"""
-    from .models import Session, Feedback, Case
-
-    # Find the case
-    try:
-        case = Case.objects.get(case_id=case_id)
-    except Case.DoesNotExist:
-        messages.error(request, 'Case not found')
-        return redirect('categories')
-
-    # Allow explicit session selection via query param
-    selected_session_id = request.GET.get('session_id')
-    if selected_session_id:
-        session_obj = Session.objects.filter(user=request.user, case=case, session_id=selected_session_id).first()
-    else:
-        # Get the most recent session for this user and case
-        session_obj = (
-            Session.objects.filter(user=request.user, case=case)
-            .order_by('-ended_at', '-started_at')
-            .first()
-        )
-
+def build_feedback_context(case, session_obj, feedback, candidate_name):
+    """
+    Build the feedback report template context without touching the database
+
+    Args:
+        case: Case the report is for
+        session_obj: The user's session for the case, or None
+        feedback: Feedback for that session, or None
+        candidate_name: Name shown on the marksheet
+
+    Returns:
+        Template context dictionary
+    """
+    case_id = case.case_id
     feedback_data = None
     # Compute time used and expose an 8-minute time limit for the OSCE station
     duration_used = None
@@ -272,8 +262,7 @@ def session_feedback(request, case_id):
     transcript_text = ''
 
     if session_obj:
-        try:
-            feedback = Feedback.objects.get(session=session_obj)
+        if feedback is not None:
             # Map model fields to template-friendly structure
             # Ensure textual fields are normalized to lists for template iteration
             def to_list(value):
@@ -303,8 +292,6 @@ def session_feedback(request, case_id):
                 'compliance_analysis': getattr(feedback, 'compliance_analysis', {}) or {},
                 'rag_sources': getattr(feedback, 'rag_sources', []) or [],
             }
-        except Feedback.DoesNotExist:
-            pass
         # Pull transcript from the session record
         transcript_text = session_obj.transcript or ''
 
@@ -417,7 +404,7 @@ def session_feedback(request, case_id):
 
     marksheet = {
         'topic': case_id.replace('_', ' ').title(),
-        'candidate_name': request.user.get_full_name() or request.user.username,
+        'candidate_name': candidate_name,
         'key_steps': key_steps,
         'ratings': {
             'approach': approach_score,
@@ -438,4 +425,35 @@ def session_feedback(request, case_id):
         'category_slug': getattr(case, 'category', ''),
     }
 
+    return context
+
+
+@login_required
+def session_feedback(request, case_id):
+    """Render personalized AI feedback for the user's latest session of this case"""
+    from .models import Session, Feedback, Case
+
+    # Find the case
+    try:
+        case = Case.objects.get(case_id=case_id)
+    except Case.DoesNotExist:
+        messages.error(request, 'Case not found')
+        return redirect('categories')
+
+    # Allow explicit session selection via query param
+    selected_session_id = request.GET.get('session_id')
+    if selected_session_id:
+        session_obj = Session.objects.filter(user=request.user, case=case, session_id=selected_session_id).first()
+    else:
+        # Get the most recent session for this user and case
+        session_obj = (
+            Session.objects.filter(user=request.user, case=case)
+            .order_by('-ended_at', '-started_at')
+            .first()
+        )
+
+    feedback = Feedback.objects.filter(session=session_obj).first() if session_obj else None
+    context = build_feedback_context(
+        case, session_obj, feedback, request.user.get_full_name() or request.user.username
+    )
     return render(request, 'simulation/feedback/feedback_report.html', context)
\ No newline at end of file
@@ -0,0 +1,335 @@
+"""
+WebSocket session channel for Clinical AI ExamPro
+
+One persistent connection per simulation station, served directly over ASGI
+(see core/asgi.py). The connection is authenticated once from the Django
+session cookie, after which every doctor turn is a single message frame.
+
+Client -> server messages (JSON text frames):
+    {"type": "turn", "user_input": ..., "turn_id": ...}
+    {"type": "resume"}
+    {"type": "end"}
+    {"type": "ping"}
+
+Server -> client messages:
+    {"type": "tick", "elapsed", "remaining"}         once a second
+    {"type": "text", "turn_id", "index", "text"}     each patient sentence
+    {"type": "audio", "turn_id", "index", "mime", "chunk", "final"}
+    {"type": "done", "turn_id", ...}                 turn result (patient or examiner response)
+    {"type": "error", "turn_id", "error"}           also sent when the user's usage budget is exceeded
+    {"type": "busy", "turn_id", "retry_after"}       turn rejected by admission control or an open circuit
+    {"type": "resumed"}
+    {"type": "feedback_ready", "session_id", "overall_score", "pass_fail"}
+    {"type": "pong"}
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from importlib import import_module
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import close_old_connections
+from django.http import parse_cookie
+
+from .models import Session
+from .ai_core.ai_service import ai_service
+from .ai_core.admission import admission_controller, AdmissionRejected
+from .ai_core.telemetry import telemetry
+from .ai_core.usage import usage_ledger
+from .api_views import turn_events, audio_chunk_payloads, end_session_with_feedback
+
+STATION_SECONDS = int(os.getenv("STATION_DURATION_SECONDS", str(8 * 60)))
+
+_PATH_RE = re.compile(r'^/ws/session/(?P<session_id>[^/]+)/$')
+
+# Close codes in the application range (4000-4999)
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_NOT_FOUND = 4404
+
+_DONE = object()
+
+
+def _db_call(func: Callable) -> Callable:
+    """
+    Async wrapper for a blocking call that uses the ORM
+
+    It runs on a pool thread rather than the single thread-sensitive thread, so
+    one connection's handshake or feedback generation never queues behind
+    another's. Stale connections are closed around the call, as for a request.
+    """
+    def call(*args):
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(call, thread_sensitive=False)
+
+
+def _header(scope: Dict[str, Any], name: bytes) -> str:
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value.decode('latin-1')
+    return ''
+
+
+def _same_origin(scope: Dict[str, Any]) -> bool:
+    """Browsers send cookies on cross-site WebSocket handshakes, so require a same-host Origin"""
+    origin = _header(scope, b'origin')
+    if not origin:
+        return True  # Non-browser clients
+    return urlsplit(origin).netloc == _header(scope, b'host')
+
+
+def _authenticate(scope: Dict[str, Any], session_id: str) -> Optional[Session]:
+    """
+    Resolve the logged-in user from the session cookie and load their active session
+
+    Args:
+        scope: ASGI connection scope
+        session_id: Simulation session id from the path
+
+    Returns:
+        Session record, or None if the user is not logged in or does not own the session
+    """
+    cookies = parse_cookie(_header(scope, b'cookie'))
+    session_key = cookies.get(settings.SESSION_COOKIE_NAME)
+    if not session_key:
+        return None
+    store = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    user = get_user(SimpleNamespace(session=store))
+    if not user.is_authenticated:
+        return None
+    try:
+        return Session.objects.get(session_id=session_id, user=user, is_active=True)
+    except Session.DoesNotExist:
+        return None
+
+
+async def _iterate_in_thread(make_iterator: Callable[[], Iterator], stop: threading.Event):
+    """Drive a blocking iterator on a worker thread and yield its items on the event loop"""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            pass  # Event loop already closed
+
+    def pump():
+        iterator = make_iterator()
+        try:
+            for item in iterator:
+                if stop.is_set():
+                    break
+                put(item)
+        except Exception as e:
+            put(e)
+        finally:
+            # Stop reading on disconnect; the turn itself finishes and is recorded on its own worker
+            if hasattr(iterator, 'close'):
+                iterator.close()
+            put(_DONE)
+
+    loop.run_in_executor(None, contextvars.copy_context().run, pump)
+    while True:
+        item = await queue.get()
+        if item is _DONE:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+class SessionChannel:
+    """One WebSocket connection carrying a whole simulation station"""
+
+    def __init__(self, scope: Dict[str, Any], receive, send, session_id: str):
+        self.scope = scope
+        self.receive = receive
+        self._send = send
+        self.session_id = session_id
+        self.session: Optional[Session] = None
+        self._send_lock = asyncio.Lock()
+        self._turn_lock = asyncio.Lock()
+        self._stop = threading.Event()
+        self._tasks = set()
+        self._closed = False
+
+    async def send_json(self, payload: Dict[str, Any]):
+        async with self._send_lock:
+            if not self._closed:
+                await self._send({'type': 'websocket.send', 'text': json.dumps(payload)})
+
+    async def close(self, code: int = 1000):
+        async with self._send_lock:
+            if not self._closed:
+                self._closed = True
+                await self._send({'type': 'websocket.close', 'code': code})
+
+    async def run(self):
+        """Accept the connection and serve messages until the client disconnects"""
+        message = await self.receive()
+        if message['type'] != 'websocket.connect':
+            return
+
+        if _same_origin(self.scope):
+            self.session = await _db_call(_authenticate)(self.scope, self.session_id)
+        if self.session is None:
+            await self._send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+            return
+        if self.session_id not in ai_service.active_sessions:
+            await self._send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+            return
+
+        await self._send({'type': 'websocket.accept'})
+        self._spawn(self._tick())
+        try:
+            while True:
+                message = await self.receive()
+                if message['type'] == 'websocket.disconnect':
+                    self._closed = True
+                    break
+                if message['type'] == 'websocket.receive' and message.get('text'):
+                    try:
+                        data = json.loads(message['text'])
+                    except ValueError:
+                        await self.send_json({'type': 'error', 'error': 'Invalid JSON'})
+                        continue
+                    self._dispatch(data)
+        finally:
+            self._stop.set()
+            for task in list(self._tasks):
+                task.cancel()
+
+    def _spawn(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _dispatch(self, data: Dict[str, Any]):
+        kind = data.get('type')
+        if kind == 'turn':
+            self._spawn(self._turn(data.get('user_input'), data.get('turn_id')))
+        elif kind == 'resume':
+            self._spawn(self._resume())
+        elif kind == 'end':
+            self._spawn(self._end())
+        elif kind == 'ping':
+            self._spawn(self.send_json({'type': 'pong'}))
+        else:
+            self._spawn(self.send_json({'type': 'error', 'error': f'Unknown message type: {kind}'}))
+
+    async def _tick(self):
+        """Server-side station clock, measured from when the session started"""
+        started_at = self.session.started_at.timestamp()
+        while True:
+            elapsed = max(0, int(time.time() - started_at))
+            remaining = max(0, STATION_SECONDS - elapsed)
+            await self.send_json({'type': 'tick', 'elapsed': elapsed, 'remaining': remaining})
+            if remaining == 0:
+                return
+            await asyncio.sleep(1)
+
+    async def _turn(self, user_input: Optional[str], turn_id: Optional[str]):
+        if not user_input:
+            await self.send_json({'type': 'error', 'turn_id': turn_id, 'error': 'user_input is required'})
+            return
+
+        # Turns from one connection are answered in the order they were sent
+        async with self._turn_lock:
+            exceeded = await _db_call(usage_ledger.check_budget)(self.session.user_id)
+            if exceeded:
+                await self.send_json(dict(exceeded, type='error', turn_id=turn_id, error='Usage budget exceeded'))
+                return
+            
+            try:
+                await sync_to_async(admission_controller.acquire, thread_sensitive=False)('interact')
+            except AdmissionRejected as e:
+                await self.send_json({'type': 'busy', 'turn_id': turn_id, 'retry_after': e.retry_after})
+                return
+
+            started_at = time.monotonic()
+            failed = False
+            # Tasks run in their own context, so the binding reaches the worker thread's spans
+            with telemetry.bind(endpoint='ws_turn'):
+                try:
+                    events = _iterate_in_thread(
+                        lambda: turn_events(self.session_id, user_input, turn_id), self._stop
+                    )
+                    async for event in events:
+                        kind = event.pop('event')
+                        if kind == 'sentence':
+                            await self.send_json(dict(event, type='text', turn_id=turn_id))
+                        elif kind == 'audio' and 'data' in event:
+                            for payload in audio_chunk_payloads(event):
+                                await self.send_json(dict(payload, type='audio', turn_id=turn_id))
+                        elif kind == 'error' and 'retry_after' in event:
+                            # Upstream circuit open: the WebSocket counterpart of a 503
+                            await self.send_json({'type': 'busy', 'turn_id': turn_id, 'retry_after': event['retry_after']})
+                        else:
+                            await self.send_json(dict(event, type=kind, turn_id=turn_id))
+                except Exception as e:
+                    failed = True
+                    await self.send_json({'type': 'error', 'turn_id': turn_id, 'error': str(e)})
+                finally:
+                    elapsed = time.monotonic() - started_at
+                    admission_controller.release('interact', elapsed)
+                    telemetry.observe('request', elapsed, error=failed)
+
+    async def _resume(self):
+        success = await sync_to_async(ai_service.resume_patient, thread_sensitive=False)(self.session_id)
+        if success:
+            await self.send_json({'type': 'resumed'})
+        else:
+            await self.send_json({'type': 'error', 'error': 'Session not found'})
+
+    async def _end(self):
+        # Wait for an in-flight turn so it is part of the transcript that gets assessed
+        async with self._turn_lock:
+            try:
+                await sync_to_async(admission_controller.acquire, thread_sensitive=False)('end_session')
+            except AdmissionRejected as e:
+                await self.send_json({'type': 'busy', 'retry_after': e.retry_after})
+                return
+
+            started_at = time.monotonic()
+            try:
+                result = await _db_call(end_session_with_feedback)(self.session_id)
+            except Exception as e:
+                result = {'error': str(e)}
+            finally:
+                admission_controller.release('end_session', time.monotonic() - started_at)
+
+        if 'error' in result:
+            await self.send_json({'type': 'error', 'error': result['error']})
+            return
+
+        await self.send_json({
+            'type': 'feedback_ready',
+            'session_id': self.session_id,
+            'overall_score': result['feedback']['overall_score'],
+            'pass_fail': result['feedback']['pass_fail']
+        })
+        await self.close()
+
+
+async def websocket_application(scope, receive, send):
+    """ASGI application for WebSocket connections"""
+    match = _PATH_RE.match(scope.get('path', ''))
+    if match is None:
+        await receive()  # websocket.connect
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+    await SessionChannel(scope, receive, send, match.group('session_id')).run()